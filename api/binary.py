@@ -0,0 +1,131 @@
+"""
+api/binary.py — Codare binara a frame-urilor (/ws?format=binary, /state?format=binary)
+Un frame binar = antet + partea JSON (tot ce nu e vehicul) + vehiculele ca inregistrari
+de latime fixa (VEHICLE_RECORD, 32 octeti, little-endian):
+
+  offset  tip       camp
+  0       uint16    indexul id-ului in tabela de id-uri ('ids' / 'ids_added' din partea JSON)
+  2       uint8     state      (index in STATES)
+  3       uint8     direction  (index in DIRECTIONS)
+  4       uint8     intent     (index in INTENTS)
+  5       uint8     flags      (bit0 v2x_enabled, bit1 no_stop, bit2 clearance, bit3 emergency)
+  6       uint16    speed_kmh
+  8       float32   x, y, vx, vy, heading, dist_to_intersection
+
+Antet: b'V2X' + versiune (1 octet), uint32 lungimea partii JSON, uint16 numarul de
+inregistrari. Id-urile sunt internate per hub: keyframe-ul are tabela completa ('ids'),
+un delta doar id-urile noi ('ids_added'). Campul 'timestamp' per vehicul nu se transmite
+(frame-ul are propriul 'timestamp'). In delta, inregistrarile sunt vehiculele schimbate.
+"""
+import json
+import struct
+from typing import Dict, List, Optional
+
+from models.vehicle import DIRECTIONS, INTENTS, STATES
+
+MAGIC   = b'V2X\x01'
+HEADER  = struct.Struct('<4sIH')
+VEHICLE_RECORD = struct.Struct('<HBBBBH6f')
+UNKNOWN = 0xFF
+FORMATS = ('json', 'binary')
+
+DIR_CODE    = {d: i for i, d in enumerate(DIRECTIONS)}
+INTENT_CODE = {t: i for i, t in enumerate(INTENTS)}
+STATE_CODE  = {s: i for i, s in enumerate(STATES)}
+
+F_V2X, F_NO_STOP, F_CLEARANCE, F_EMERGENCY = 1, 2, 4, 8
+
+# Precizia din Vehicle.to_dict() — decodorul rotunjeste float32 inapoi la aceleasi valori
+_ROUND = (('x', 1), ('y', 1), ('vx', 2), ('vy', 2), ('heading', 4), ('dist_to_intersection', 1))
+
+
+class IdTable:
+    """Tabela de internare a id-urilor de vehicul (id → index uint16)."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._mark = 0
+
+    def index(self, vehicle_id: str) -> int:
+        i = self._index.get(vehicle_id)
+        if i is None:
+            i = self._index[vehicle_id] = len(self.ids)
+            self.ids.append(vehicle_id)
+        return i
+
+    def take_added(self) -> Dict[int, str]:
+        """Id-urile internate de la apelul anterior — {index: id}."""
+        added = {i: self.ids[i] for i in range(self._mark, len(self.ids))}
+        self._mark = len(self.ids)
+        return added
+
+
+def _record(v: dict, ids: IdTable) -> bytes:
+    flags = ((F_V2X if v['v2x_enabled'] else 0) | (F_NO_STOP if v['no_stop'] else 0)
+             | (F_CLEARANCE if v['clearance'] else 0) | (F_EMERGENCY if v['priority'] == 'emergency' else 0))
+    return VEHICLE_RECORD.pack(
+        ids.index(v['id']), STATE_CODE.get(v['state'], UNKNOWN), DIR_CODE.get(v['direction'], UNKNOWN),
+        INTENT_CODE.get(v['intent'], UNKNOWN), flags, v['speed_kmh'],
+        v['x'], v['y'], v['vx'], v['vy'], v['heading'], v['dist_to_intersection'])
+
+
+def encode(frame: dict, vehicles: list, ids: IdTable) -> bytes:
+    """frame: partea JSON (fara vehicule); vehicles: snapshot-urile de impachetat."""
+    records = b''.join([_record(v, ids) for v in vehicles])
+    body = json.dumps(frame, separators=(',', ':'), ensure_ascii=False).encode()
+    return HEADER.pack(MAGIC, len(body), len(vehicles)) + body + records
+
+
+def encode_state(state: dict, ids: Optional[IdTable] = None, **extra) -> bytes:
+    """Starea completa (keyframe) — tabela de id-uri inclusa in 'ids'."""
+    ids = ids if ids is not None else IdTable()
+    vehicles = state.get('vehicles', [])
+    for v in vehicles:
+        ids.index(v['id'])
+    frame = {k: v for k, v in state.items() if k != 'vehicles'}
+    return encode({**extra, **frame, 'ids': ids.ids}, vehicles, ids)
+
+
+def _enum(values: tuple, code: int):
+    return values[code] if code < len(values) else None
+
+
+def decode(buf: bytes, ids: Optional[List[str]] = None) -> tuple:
+    """
+    Decodorul de referinta. Returneaza (frame, vehicule). Tabela de id-uri e cea din frame
+    ('ids') sau `ids`, completata cu 'ids_added' (lista e actualizata pe loc).
+    """
+    magic, json_len, count = HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError('frame binar invalid')
+    start = HEADER.size
+    frame = json.loads(bytes(buf[start:start + json_len]))
+    if 'ids' in frame:
+        ids = frame['ids']
+    ids = ids if ids is not None else []
+    for key, vid in frame.get('ids_added', {}).items():
+        i = int(key)
+        if i >= len(ids):
+            ids.extend([None] * (i + 1 - len(ids)))
+        ids[i] = vid
+    vehicles = []
+    for (idx, state, direction, intent, flags, speed, *floats) in VEHICLE_RECORD.iter_unpack(
+            buf[start + json_len:start + json_len + count * VEHICLE_RECORD.size]):
+        v = {
+            'id':          ids[idx],
+            'direction':   _enum(DIRECTIONS, direction),
+            'intent':      _enum(INTENTS, intent),
+            'priority':    'emergency' if flags & F_EMERGENCY else 'normal',
+            'v2x_enabled': bool(flags & F_V2X),
+            'no_stop':     bool(flags & F_NO_STOP),
+            'state':       _enum(STATES, state),
+            'clearance':   bool(flags & F_CLEARANCE),
+            'speed_kmh':   speed,
+        }
+        for (name, digits), value in zip(_ROUND, floats):
+            v[name] = round(value, digits)
+        vehicles.append(v)
+    return frame, vehicles
@@ -0,0 +1,428 @@
+"""
+api/broadcast.py — Hub de broadcast WebSocket (o serializare per frame)
+Un BroadcastHub per sesiune: un singur producator construieste frame-ul curent
+(starea + evenimentele noi), il serializeaza O SINGURA DATA si pune acelasi text
+in coada fiecarui abonat. Fiecare abonat are propriul task de trimitere si o coada
+limitata: un client lent pierde frame-urile vechi (ramane doar cel mai recent),
+iar daca pierde `evict_after` frame-uri fara sa reuseasca vreo trimitere e deconectat
+(1013 — try again later) in loc sa franeze ceilalti clienti.
+
+Clientii cu acelasi filtru de abonare (api/subscription.py: campuri, vehicule, rata)
+formeaza un Channel: frame-urile, delta-urile si numerotarea sunt per canal, iar
+sectiunile pe care nu le cere nimeni nu se compara si nu se serializeaza.
+
+Protocol (?stream=delta, implicit): un keyframe ('type': 'key', starea completa) la
+conectare, la fiecare KEYFRAME_EVERY tick-uri si la cerere; intre ele frame-uri
+'type': 'delta' (vezi api/delta.py). Fiecare frame are 'frame' (numar de ordine), 'tick'
+si — delta — 'prev', frame-ul pe care se aplica. Un client care vede prev != ultimul frame
+primit trimite {"type": "resync"} si primeste un keyframe. Unui client lent ii sunt
+inlocuite frame-urile din coada cu un keyframe, deci nu ajunge sa aplice un delta pe o baza gresita.
+Cu ?stream=full fiecare frame e un keyframe (acelasi text pentru toti).
+
+Frame-urile poarta 'events_since': seq-ul dupa care incep 'events'. Un client care a
+pierdut frame-uri vede events_since > ultimul seq primit si recupereaza prin GET /events.
+
+Producatorul nu are ceas propriu: asteapta engine.tick_signal (emis dupa _update_state())
+si publica imediat, deci fiecare tick pleaca o singura data. Latenta tick → trimitere
+(de la notify() pana la terminarea send-ului) e in stats()['latency_ms'].
+
+Cu ?format=binary frame-urile sunt mesaje binare (vezi api/binary.py); fiecare varianta
+(keyframe / delta × json / binary) se serializeaza cel mult o data per frame si canal.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from fastapi import WebSocket
+
+from simulation.profiler import WINDOW, summarize_ms
+from api import binary
+from api.delta import DeltaEncoder
+from api.subscription import ALWAYS, Subscription
+
+QUEUE_SIZE     = 2      # frame-uri in asteptare per client
+EVICT_AFTER    = 90     # frame-uri pierdute fara nicio trimitere reusita (~3s la 30 FPS) → deconectare; 0 = niciodata
+KEYFRAME_EVERY = 90     # tick-uri intre doua keyframe-uri periodice (~3s)
+EVENT_BACKLOG  = 20     # evenimente in GET /state
+STREAMS        = ('delta', 'full')
+CLOSE_SLOW     = 1013   # "try again later"
+CLOSE_NO_SESSION = 4404
+
+_log = logging.getLogger("V2X.broadcast")
+
+
+def _encode(payload: dict) -> str:
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
+
+
+class Subscriber:
+    def __init__(self, ws: WebSocket, queue_size: int = QUEUE_SIZE, stream: str = 'delta',
+                 fmt: str = 'json', latency: Optional[deque] = None):
+        self.ws      = ws
+        self.latency = latency   # esantioane tick → trimitere (comune hub-ului)
+        self.stream  = stream
+        self.fmt     = fmt
+        self.channel: Optional['Channel'] = None
+        self.needs_key = True   # primul frame e mereu un keyframe
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.sent    = 0
+        self.dropped = 0
+        self.consecutive_drops = 0
+        self.closed  = False
+        self.task: Optional[asyncio.Task] = None
+
+    def offer(self, frame, born: float, replace: bool = False) -> None:
+        """
+        Pune frame-ul in coada fara sa astepte; daca e plina, arunca cel mai vechi.
+        born: perf_counter() la care starea din frame a fost gata (pentru latenta).
+        replace=True (keyframe): frame-ul inlocuieste tot ce asteapta in coada.
+        """
+        full = self.queue.full()
+        stale = self.queue.qsize() if replace else int(full)
+        for _ in range(stale):
+            self.queue.get_nowait()
+        self.dropped += stale
+        self.consecutive_drops += stale
+        self.queue.put_nowait((frame, born))
+
+    async def run(self) -> None:
+        try:
+            while True:
+                frame, born = await self.queue.get()
+                if isinstance(frame, bytes):
+                    await self.ws.send_bytes(frame)
+                else:
+                    await self.ws.send_text(frame)
+                if self.latency is not None:
+                    self.latency.append(time.perf_counter() - born)
+                self.sent += 1
+                self.consecutive_drops = 0
+        except Exception:
+            pass   # conexiune inchisa — endpoint-ul face curatenia
+        finally:
+            self.closed = True
+
+
+class Channel:
+    """Clientii cu acelasi filtru: baza delta, tabela de id-uri si cursorul de evenimente comune."""
+    def __init__(self, spec: Subscription, cursor: int):
+        self.spec      = spec
+        self.subs: list[Subscriber] = []
+        self.encoder   = DeltaEncoder()
+        self.ids       = binary.IdTable()
+        self.frame     = 0
+        self.cursor    = cursor   # ultimul seq inclus intr-un frame
+        self.state: Optional[dict] = None   # starea (filtrata) a ultimului frame
+        self.pending   = True     # exista o stare netrimisa (canal nou / schimbare intre doua frame-uri)
+        self.next_due  = 0.0
+        self.last_keyframe_tick = None
+
+    def due(self, now: float) -> bool:
+        return now >= self.next_due
+
+    def advance(self, now: float) -> None:
+        interval = self.spec.interval
+        if interval:
+            # Cadenta fixa; daca am ramas in urma (pauza, tick lent) nu recuperam in rafala
+            self.next_due = max(self.next_due + interval, now)
+
+
+class BroadcastHub:
+    def __init__(self, engine, queue_size: int = QUEUE_SIZE, evict_after: int = EVICT_AFTER,
+                 keyframe_every: int = KEYFRAME_EVERY):
+        self.engine      = engine
+        self.queue_size  = queue_size
+        self.evict_after = evict_after
+        self.keyframe_every = keyframe_every
+        self._signal     = engine.tick_signal
+        self._kick: Optional[asyncio.Future] = None   # asteptarea curenta a producatorului
+        self._channels: Dict[tuple, Channel] = {}
+        self._subs: list[Subscriber] = []
+        self._task: Optional[asyncio.Task] = None
+        self._last_key   = None
+        self.frames      = 0   # frame-uri produse (toate canalele)
+        self.keyframes   = 0   # keyframe-uri serializate
+        self.evictions   = 0
+        self.ticks_published = 0   # tick-uri distincte publicate
+        self.ticks_skipped   = 0   # tick-uri care n-au apucat sa fie publicate (producator in urma)
+        self._last_tick  = None
+        self.latency: deque = deque(maxlen=WINDOW)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    # ── Abonati ────────────────────────────────────────────────────────
+
+    def subscribe(self, ws: WebSocket, stream: str = 'delta', fmt: str = 'json',
+                  spec: Optional[Subscription] = None) -> Subscriber:
+        sub = Subscriber(ws, self.queue_size, stream, fmt, self.latency)
+        self._join(sub, spec or Subscription())
+        sub.task = asyncio.create_task(sub.run())
+        self._subs.append(sub)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._produce())
+        self._wake()
+        return sub
+
+    def update(self, sub: Subscriber, spec: Subscription) -> None:
+        """Filtru nou: clientul trece in alt canal si primeste un keyframe."""
+        if sub.channel is not None and sub.channel.spec.key == spec.key:
+            return
+        self._leave(sub)
+        self._join(sub, spec)
+        sub.needs_key = True
+        self._wake()
+
+    def resync(self, sub: Subscriber) -> None:
+        """Clientul a detectat un gol — primeste un keyframe imediat."""
+        sub.needs_key = True
+        self._wake()
+
+    def _wake(self) -> None:
+        # Keyframe-urile pentru clienti noi / resync nu asteapta urmatorul tick (ex. in pauza)
+        if self._kick is not None and not self._kick.done():
+            self._kick.set_result(None)
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        if sub in self._subs:
+            self._subs.remove(sub)
+        self._leave(sub)
+        if sub.task and not sub.task.done():
+            sub.task.cancel()
+
+    def _join(self, sub: Subscriber, spec: Subscription) -> None:
+        ch = self._channels.get(spec.key)
+        if ch is None:
+            ch = self._channels[spec.key] = Channel(spec, self.engine.log.last_seq)
+        ch.subs.append(sub)
+        sub.channel = ch
+
+    def _leave(self, sub: Subscriber) -> None:
+        ch = sub.channel
+        if ch is None:
+            return
+        if sub in ch.subs:
+            ch.subs.remove(sub)
+        if not ch.subs:
+            self._channels.pop(ch.spec.key, None)
+        sub.channel = None
+
+    async def close(self, code: int = CLOSE_NO_SESSION) -> None:
+        for sub in list(self._subs):
+            await self._close(sub, code)
+        if self._task:
+            self._task.cancel()
+
+    async def _close(self, sub: Subscriber, code: int) -> None:
+        self.unsubscribe(sub)
+        try:
+            await sub.ws.close(code=code)
+        except Exception:
+            pass
+
+    # ── Producator ─────────────────────────────────────────────────────
+
+    def _frame_key(self):
+        # Un frame nou doar daca s-a schimbat ceva: versiune noua a starii (tick, pauza,
+        # cooperare, clearance manual) sau evenimente noi
+        eng = self.engine
+        return (eng.state_version, eng.log.last_seq)
+
+    def publish(self, now: Optional[float] = None) -> bool:
+        """
+        Construieste frame-ul curent al fiecarui canal si il distribuie. Fiecare varianta
+        (keyframe / delta, json / binary) se serializeaza cel mult o data per canal,
+        indiferent de numarul de clienti. False daca nu s-a trimis nimic.
+        """
+        now = time.perf_counter() if now is None else now
+        key = self._frame_key()
+        changed = key != self._last_key
+        self._last_key = key
+        tick = self.engine.tick_count
+        if changed and tick != self._last_tick:
+            if self._last_tick is not None and tick > self._last_tick + 1:
+                self.ticks_skipped += tick - self._last_tick - 1
+            self._last_tick = tick
+            self.ticks_published += 1
+        due = []
+        sent = False
+        for ch in list(self._channels.values()):
+            if changed:
+                ch.pending = True
+            if ch.pending and ch.due(now):
+                due.append(ch)
+            elif any(sub.needs_key for sub in ch.subs):
+                sent |= self._send_pending_keyframes(ch)
+        if not due:
+            return sent
+        # Engine-ul construieste doar sectiunile cerute de canalele scadente
+        sections = set()
+        for ch in due:
+            if ch.spec.fields is None:
+                sections = None
+                break
+            sections |= ch.spec.fields
+        state = self.engine.get_state(sections)
+        for ch in due:
+            # Un canal cu rata limitata trimite o schimbare mai veche abia cand e scadent
+            born = max(self._signal.at, ch.next_due) or now
+            sent |= self._publish_channel(ch, state, born)
+            ch.pending = False
+            ch.advance(now)
+        return sent
+
+    def _publish_channel(self, ch: Channel, full_state: dict, born: float) -> bool:
+        spec = ch.spec
+        state = spec.apply(full_state)
+        head = {'frame': ch.frame + 1}
+        events = None
+        if spec.wants('event_log'):
+            log = self.engine.log
+            since = max(ch.cursor, log.start_seq)
+            events = log.get_since(since)
+            head.update(events=events, events_since=since)
+
+        tick = state.get('tick')
+        periodic = (ch.last_keyframe_tick is None or tick is None
+                    or not 0 <= tick - ch.last_keyframe_tick < self.keyframe_every)
+        if periodic:
+            ch.last_keyframe_tick = tick
+            ch.encoder.rebase(state)
+            ch.ids.reset()
+            delta = None
+        else:
+            diff = ch.encoder.diff(state)
+            if (spec.fields is not None and not events and diff.keys() <= set(ALWAYS)
+                    and not any(sub.needs_key for sub in ch.subs)):
+                # Canal filtrat si nimic din ce a cerut nu s-a schimbat — nu trimitem doar tick-ul
+                return False
+            delta = {'type': 'delta', 'prev': ch.frame, **head, **diff}
+        if events:
+            ch.cursor = events[-1]['seq']
+        ch.frame += 1
+        self.frames += 1
+        for v in state.get('vehicles', ()):
+            ch.ids.index(v['id'])
+        added = ch.ids.take_added()
+        ch.state = state
+
+        cache = {}
+        def frame(kind: str, fmt: str):
+            if (kind, fmt) not in cache:
+                if kind == 'key':
+                    cache[kind, fmt] = self._keyframe(ch, head, state, fmt)
+                else:
+                    cache[kind, fmt] = self._deltaframe(ch, delta, state, added, fmt)
+            return cache[kind, fmt]
+
+        for sub in list(ch.subs):
+            if sub.closed:
+                self.unsubscribe(sub)
+                continue
+            if delta is None or sub.stream == 'full' or sub.needs_key or sub.queue.full():
+                # Keyframe: inlocuieste frame-urile vechi din coada unui client lent
+                sub.offer(frame('key', sub.fmt), born, replace=sub.stream == 'delta')
+                sub.needs_key = False
+            else:
+                sub.offer(frame('delta', sub.fmt), born)
+            if self.evict_after and sub.consecutive_drops >= self.evict_after:
+                self.evictions += 1
+                _log.warning(f"client /ws lent deconectat dupa {sub.consecutive_drops} frame-uri pierdute")
+                self.unsubscribe(sub)
+                asyncio.create_task(self._close(sub, CLOSE_SLOW))
+        return True
+
+    def _keyframe(self, ch: Channel, head: dict, state: dict, fmt: str):
+        self.keyframes += 1
+        if fmt == 'binary':
+            return binary.encode_state(state, ch.ids, type='key', **head)
+        return _encode({'type': 'key', **head, **state})
+
+    def _deltaframe(self, ch: Channel, delta: dict, state: dict, added: dict, fmt: str):
+        if fmt != 'binary':
+            return _encode(delta)
+        # Vehiculele schimbate merg ca inregistrari binare complete, restul ramane JSON
+        items = dict(delta.get('items', {}))
+        changed = items.pop('vehicles', {})
+        frame = {k: v for k, v in delta.items() if k != 'items'}
+        if items:
+            frame['items'] = items
+        if added:
+            frame['ids_added'] = added
+        vehicles = [v for v in state.get('vehicles', ()) if v['id'] in changed]
+        return binary.encode(frame, vehicles, ch.ids)
+
+    def _send_pending_keyframes(self, ch: Channel) -> bool:
+        # Nimic de trimis in canal (pauza / rata limitata), dar clienti noi sau resync:
+        # keyframe-ul ultimului frame al canalului, ca delta-urile urmatoare sa se aplice corect
+        pending = [sub for sub in ch.subs if sub.needs_key and not sub.closed]
+        if not pending or ch.state is None:
+            return False
+        head = {'frame': ch.frame}
+        if ch.spec.wants('event_log'):
+            head.update(events=[], events_since=ch.cursor)
+        cache = {}
+        born = time.perf_counter()
+        for sub in pending:
+            if sub.fmt not in cache:
+                cache[sub.fmt] = self._keyframe(ch, head, ch.state, sub.fmt)
+            sub.offer(cache[sub.fmt], born, replace=True)
+            sub.needs_key = False
+        return True
+
+    async def _produce(self) -> None:
+        while self._subs:
+            seen = self._signal.version
+            self.publish()
+            # Asteptam urmatoarea stare a engine-ului (sau un client nou / resync); daca un
+            # canal cu rata limitata are o schimbare netrimisa, ne trezim cand devine scadent
+            self._kick = self._signal.waiter(seen)
+            try:
+                await asyncio.wait_for(self._kick, self._next_due_in())
+            except asyncio.TimeoutError:
+                pass
+
+    def _next_due_in(self) -> Optional[float]:
+        due = [ch.next_due for ch in self._channels.values() if ch.pending]
+        if not due:
+            return None
+        return max(0.0, min(due) - time.perf_counter())
+
+    def stats(self) -> dict:
+        return {
+            'subscribers': len(self._subs),
+            'channels':    len(self._channels),
+            'frames':      self.frames,
+            'keyframes':   self.keyframes,
+            'evictions':   self.evictions,
+            'ticks_published': self.ticks_published,
+            'ticks_skipped':   self.ticks_skipped,
+            'latency_ms':  summarize_ms(self.latency),
+            'clients': [
+                {'stream': s.stream, 'format': s.fmt, 'sent': s.sent, 'dropped': s.dropped,
+                 'queued': s.queue.qsize(),
+                 'subscription': s.channel.spec.to_dict() if s.channel else None}
+                for s in self._subs
+            ],
+        }
+
+
+_hubs: Dict[str, BroadcastHub] = {}
+
+
+def get_hub(session_id: str, engine) -> BroadcastHub:
+    """Hub-ul sesiunii (creat la primul abonat). Un engine nou sub acelasi id → hub nou."""
+    hub = _hubs.get(session_id)
+    if hub is None or hub.engine is not engine:
+        hub = _hubs[session_id] = BroadcastHub(engine)
+    return hub
+
+
+async def close_hub(session_id: str, code: int = CLOSE_NO_SESSION) -> None:
+    hub = _hubs.pop(session_id, None)
+    if hub is not None:
+        await hub.close(code)
@@ -0,0 +1,127 @@
+"""
+api/delta.py — Codare delta a starii pentru /ws
+Un keyframe e starea completa (ca GET /state). Intre keyframe-uri se trimite doar
+ce s-a schimbat fata de frame-ul anterior:
+  changed  — {sectiune: valoare} sectiuni inlocuite complet (scenario, collisions, custom_scenario, ...)
+  patch    — {sectiune: {cheie: valoare}} cheile modificate din sectiunile dict (semaphore, risk,
+             agents_memory); unset — {sectiune: [chei]} cheile disparute
+  items    — {sectiune: {cheie: {camp: valoare}}} pentru listele de obiecte cu cheie (vehicles
+             dupa id, risk_zones dupa perechea de vehicule): doar campurile schimbate, obiectele
+             noi complete; removed — {sectiune: [chei]} obiectele disparute
+'tick' si 'timestamp' sunt in fiecare frame.
+
+Vehiculele sunt snapshot-uri imutabile (VehicleSnapshot): acelasi obiect → nicio schimbare,
+fara comparatie camp cu camp. Sectiunile dict sunt construite din nou la fiecare tick de
+engine, deci se compara direct; restul se compara dupa textul JSON, pentru ca unele
+(custom_scenario) sunt modificate pe loc de engine.
+"""
+import json
+
+ALWAYS  = ('tick', 'timestamp')
+PATCHED = ('semaphore', 'risk', 'agents_memory')
+KEYED   = {
+    'vehicles':   lambda v: v['id'],
+    'risk_zones': lambda z: '|'.join(z['vehicles']),
+}
+
+
+def _text(value) -> str:
+    return json.dumps(value, separators=(',', ':'), sort_keys=True, default=str)
+
+
+class DeltaEncoder:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._texts: dict = {}   # sectiune -> text JSON trimis ultima data
+        self._dicts: dict = {}   # sectiune PATCHED -> dict trimis ultima data
+        self._items: dict = {}   # sectiune KEYED -> {cheie: obiect trimis ultima data}
+
+    def rebase(self, state: dict) -> None:
+        """Starea tocmai trimisa ca keyframe devine baza pentru urmatorul delta."""
+        self.reset()
+        for key, value in state.items():
+            if key in ALWAYS:
+                continue
+            if key in KEYED:
+                self._items[key] = {KEYED[key](o): o for o in value}
+            elif key in PATCHED and isinstance(value, dict):
+                self._dicts[key] = dict(value)
+            else:
+                self._texts[key] = _text(value)
+
+    def diff(self, state: dict) -> dict:
+        """Schimbarile fata de baza; baza avanseaza la `state`."""
+        out = {k: state[k] for k in ALWAYS if k in state}
+        changed, patch, unset, items, removed = {}, {}, {}, {}, {}
+        for key, value in state.items():
+            if key in ALWAYS:
+                continue
+            if key in KEYED:
+                upd, gone = self._diff_items(key, value)
+                if upd:
+                    items[key] = upd
+                if gone:
+                    removed[key] = gone
+            elif key in PATCHED and isinstance(value, dict) and key in self._dicts:
+                prev = self._dicts[key]
+                upd = {k: v for k, v in value.items() if k not in prev or prev[k] != v}
+                gone = [k for k in prev if k not in value]
+                self._dicts[key] = dict(value)
+                if upd:
+                    patch[key] = upd
+                if gone:
+                    unset[key] = gone
+            else:
+                text = _text(value)
+                if self._texts.get(key) != text:
+                    self._texts[key] = text
+                    changed[key] = value
+        for name, part in (('changed', changed), ('patch', patch), ('unset', unset),
+                           ('items', items), ('removed', removed)):
+            if part:
+                out[name] = part
+        return out
+
+    def _diff_items(self, section: str, objects: list):
+        key_of = KEYED[section]
+        prev_all = self._items.get(section, {})
+        current, upd = {}, {}
+        for obj in objects:
+            k = key_of(obj)
+            current[k] = obj
+            prev = prev_all.get(k)
+            if prev is obj:
+                continue
+            if prev is None:
+                upd[k] = obj
+            else:
+                fields = {f: val for f, val in obj.items() if prev.get(f) != val}
+                if fields:
+                    upd[k] = fields
+        self._items[section] = current
+        return upd, [k for k in prev_all if k not in current]
+
+
+def apply_delta(state: dict, delta: dict) -> dict:
+    """Decodorul de referinta (clientul Python / verificari): starea dupa aplicarea delta-ului."""
+    out = dict(state)
+    for k in ALWAYS:
+        if k in delta:
+            out[k] = delta[k]
+    out.update(delta.get('changed', {}))
+    for section, upd in delta.get('patch', {}).items():
+        out[section] = {**out.get(section, {}), **upd}
+    for section, gone in delta.get('unset', {}).items():
+        out[section] = {k: v for k, v in out[section].items() if k not in gone}
+    items, removed = delta.get('items', {}), delta.get('removed', {})
+    for section in set(items) | set(removed):
+        key_of = KEYED[section]
+        objects = {key_of(o): o for o in out.get(section, ())}
+        for k in removed.get(section, ()):
+            objects.pop(k, None)
+        for k, fields in items.get(section, {}).items():
+            objects[k] = {**objects.get(k, {}), **fields}
+        out[section] = list(objects.values())
+    return out
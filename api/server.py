@@ -3,7 +3,11 @@ api/server.py — FastAPI + WebSocket
 Endpoints:
   POST /start                          — porneste simularea
   POST /stop                           — pauzeaza simularea
-  GET  /state                          — snapshot JSON curent
+  GET  /state?format=json|binary       — snapshot curent (cu ultimele 20 evenimente in event_log);
+                                         binary = vehicule ca inregistrari fixe (api/binary.py)
+         &fields=...&vehicles=...       — doar sectiunile / vehiculele cerute (ca la /ws); engine-ul
+                                         nu construieste sectiunile necerute
+  GET  /events?since=<seq>             — evenimentele cu seq > since (catch-up incremental)
   GET  /scenarios                      — lista scenariilor
   POST /reset                          — resetare (body: {"scenario": "..."})
   POST /toggle-cooperation             — toggle V2X ON/OFF
@@ -13,27 +17,64 @@ Endpoints:
   DELETE /custom/vehicle/{id}          — sterge vehicul custom
   PATCH /custom/vehicle/{id}           — modifica vehicul custom
   DELETE /custom/clear                 — goleste scenariul custom
-  WS   /ws                             — stream live la 30 FPS
+  GET  /sessions                       — lista sesiunilor
+  POST /sessions                       — creeaza o sesiune (body: {"session_id": ..., "scenario": ...})
+  DELETE /sessions/{session_id}        — sterge o sesiune
+  POST /recording/start                — inregistreaza fiecare tick al sesiunii (body: {"name": ...})
+  POST /recording/stop                 — finalizeaza inregistrarea (simulation/recording.py)
+  GET  /recordings                     — lista inregistrarilor
+  POST /replays                        — deschide o inregistrare pentru redare (body: {"recording": ...})
+  GET  /replays/{name}/state?frame=N   — starea redata, frame curent sau N (O(1), fara re-simulare)
+  POST /replays/{name}/control         — {"action": "play"|"pause"|"seek", "frame": N, "speed": 2.0}
+  DELETE /replays/{name}               — inchide redarea
+  GET  /metrics/tick                   — timpi per faza ai tick-ului (p50/p95/p99) + overrun-uri
+  POST /metrics/tick                   — porneste/opreste profilerul (body: {"enabled": true, "log_every": 300})
+  GET  /metrics/llm                    — clientul Ollama (in zbor, expirate, esuate, latenta p50/p95/p99, batch-uri,
+                                         cache-ul de situatii: hits/misses/evictions, breaker: closed/open/half_open)
+  GET  /metrics/ws                     — statistici broadcast /ws (abonati, frame-uri, pierderi, latenta tick → trimitere)
+  WS   /ws?stream=delta|full&format=json|binary
+                                       — stream live la 30 FPS (vezi api/broadcast.py): keyframe-uri
+                                         periodice + delta-uri (implicit) sau stare completa (full);
+                                         fiecare frame e serializat o data pentru toti clientii;
+                                         'events' contine doar evenimentele de dupa 'events_since';
+                                         clientul trimite {"type": "resync"} pentru un keyframe
+         &fields=...&vehicles=...&rate=N — filtre de abonare (api/subscription.py); se pot schimba
+                                         oricand cu {"type": "subscribe", "fields": [...],
+                                         "vehicles": [...], "rate": 10}
+
+Toate rutele de simulare si /ws accepta ?session=<id> (implicit: "default").
 """
 import asyncio
+import json
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, Literal
-from simulation.engine import engine
+from simulation.engine import SimulationEngine
+from simulation.sessions import sessions, DEFAULT_SESSION
+from simulation.recording import Recording, Replay, list_recordings, recording_path
+from api import binary
+from api.broadcast import get_hub, close_hub, EVENT_BACKLOG, STREAMS
+from api.subscription import Subscription
+from services import llm_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    task = asyncio.create_task(engine.run())
+    llm_client.load_cache(llm_client.CACHE_PATH)
+    task = asyncio.create_task(sessions.run())
     yield
-    engine.stop()
+    sessions.stop()
     task.cancel()
     try:
         await task
     except asyncio.CancelledError:
         pass
+    llm_client.client.stop_probe()
+    await llm_client.client.aclose()
+    llm_client.save_cache()
 
 
 app = FastAPI(title="V2X Intersection Safety", version="2.0.0", lifespan=lifespan)
@@ -63,106 +104,298 @@ class CustomVehicleUpdate(BaseModel):
     speed_multiplier: Optional[float] = Field(None, ge=0.2, le=3.0)
     v2x_enabled: Optional[bool] = None
 
+class TickMetricsConfig(BaseModel):
+    enabled: Optional[bool] = None
+    log_every: Optional[int] = Field(None, ge=0, description="Linie de rezumat in log la fiecare N tick-uri (0 = oprit)")
+    reset: bool = False
+
+class SessionCreateRequest(BaseModel):
+    session_id: Optional[str] = Field(None, min_length=1, max_length=64, description="ID sesiune (implicit: generat)")
+    scenario: Optional[str] = None
+
+class RecordingStartRequest(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=64, description="Numele inregistrarii (implicit: sesiune-scenariu-data)")
+
+class ReplayOpenRequest(BaseModel):
+    recording: str = Field(..., description="Numele inregistrarii de redat")
+
+class ReplayControl(BaseModel):
+    action: Literal['play', 'pause', 'seek']
+    frame: Optional[int] = Field(None, ge=0, description="Frame-ul la care sare (seek)")
+    speed: Optional[float] = Field(None, description="Viteza de redare (play); negativa = inapoi")
+
+SessionParam = Query(DEFAULT_SESSION, description="ID-ul sesiunii de simulare")
+
+def _engine(session: str) -> SimulationEngine:
+    eng = sessions.get(session)
+    if eng is None:
+        raise HTTPException(status_code=404, detail=f'sesiunea {session} nu exista')
+    return eng
+
+# ── Sesiuni ──────────────────────────────────────────────────────────────
+
+@app.get("/sessions", summary="Lista sesiunilor de simulare")
+async def list_sessions():
+    return {"sessions": sessions.list()}
+
+@app.post("/sessions", summary="Creeaza o sesiune de simulare noua")
+async def create_session(body: SessionCreateRequest = SessionCreateRequest()):
+    try:
+        eng = sessions.create(body.session_id, scenario=body.scenario)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"session_id": eng.session_id, "scenario": eng.scenario_name}
+
+@app.delete("/sessions/{session_id}", summary="Sterge o sesiune de simulare")
+async def delete_session(session_id: str):
+    if not sessions.remove(session_id):
+        raise HTTPException(status_code=404, detail=f'sesiunea {session_id} nu exista sau nu poate fi stearsa')
+    await close_hub(session_id)
+    return {"removed": session_id}
+
+# ── Metrici ──────────────────────────────────────────────────────────────
+
+@app.get("/metrics/tick", summary="Timpi per faza ai tick-ului (p50/p95/p99) si overrun-uri")
+async def tick_metrics(session: str = SessionParam):
+    return _engine(session).profiler.stats()
+
+@app.post("/metrics/tick", summary="Configureaza profilerul de tick")
+async def configure_tick_metrics(body: TickMetricsConfig, session: str = SessionParam):
+    profiler = _engine(session).profiler
+    profiler.configure(enabled=body.enabled, log_every=body.log_every)
+    if body.reset:
+        profiler.reset()
+    return profiler.stats()
+
 # ── Control simulare ─────────────────────────────────────────────────────
 
 @app.post("/start", summary="Porneste / reia simularea")
-async def start_simulation():
-    engine.start()
+async def start_simulation(session: str = SessionParam):
+    _engine(session).start()
     return {"status": "running", "paused": False}
 
 @app.post("/stop", summary="Pauzeaza simularea")
-async def stop_simulation():
-    engine.stop_sim()
+async def stop_simulation(session: str = SessionParam):
+    _engine(session).stop_sim()
     return {"status": "paused", "paused": True}
 
 # ── State & scenarii ─────────────────────────────────────────────────────
 
 @app.get("/state")
-async def get_state():
-    return engine.get_state()
+async def get_state(format: Literal['json', 'binary'] = 'json', fields: Optional[str] = None,
+                    vehicles: Optional[str] = None, session: str = SessionParam):
+    engine = _engine(session)
+    try:
+        spec = Subscription(fields, vehicles)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # Engine-ul construieste doar sectiunile cerute
+    state = spec.apply(engine.get_state(spec.fields))
+    if spec.wants('event_log'):
+        state['event_log'] = engine.log.get_recent(EVENT_BACKLOG)
+    if format == 'binary':
+        return Response(binary.encode_state(state), media_type='application/octet-stream')
+    return state
+
+@app.get("/events", summary="Evenimentele cu seq > since (catch-up incremental)")
+async def get_events(since: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1, le=1000),
+                     session: str = SessionParam):
+    log = _engine(session).log
+    events = log.get_since(since, limit)
+    return {
+        'events':    events,
+        'last_seq':  events[-1]['seq'] if events else max(since, log.start_seq),
+        'first_seq': log.first_seq,
+        'log_start': log.start_seq,
+        # Clientul a ramas in urma mai mult decat capacitatea ring-ului
+        'missed':    max(since, log.start_seq) + 1 < log.first_seq,
+    }
 
 @app.get("/scenarios")
-async def get_scenarios():
+async def get_scenarios(session: str = SessionParam):
+    engine = _engine(session)
     return {"scenarios": engine.get_scenarios(), "current": engine.scenario_name}
 
 @app.post("/reset")
-async def reset(body: ResetRequest = ResetRequest()):
+async def reset(body: ResetRequest = ResetRequest(), session: str = SessionParam):
+    engine = _engine(session)
     engine.reset(scenario=body.scenario)
     return {"status": "reset", "scenario": engine.scenario_name}
 
 @app.post("/toggle-cooperation")
-async def toggle_cooperation():
-    new_state = engine.toggle_cooperation()
+async def toggle_cooperation(session: str = SessionParam):
+    new_state = _engine(session).toggle_cooperation()
     return {"cooperation": new_state}
 
 @app.post("/grant-clearance/{vehicle_id}")
-async def grant_clearance(vehicle_id: str):
-    return engine.grant_clearance(vehicle_id)
+async def grant_clearance(vehicle_id: str, session: str = SessionParam):
+    return _engine(session).grant_clearance(vehicle_id)
 
 # ── Custom scenario ──────────────────────────────────────────────────────
 
 @app.get("/custom/scenario", summary="Citeste definitia scenariului custom curent")
-async def get_custom_scenario():
-    return {"custom_scenario": engine.get_custom_scenario()}
+async def get_custom_scenario(session: str = SessionParam):
+    return {"custom_scenario": _engine(session).get_custom_scenario()}
 
 @app.post("/custom/vehicle", summary="Adauga un vehicul in scenariul custom")
-async def custom_add_vehicle(body: CustomVehicleRequest):
-    result = engine.custom_add_vehicle(body.model_dump())
+async def custom_add_vehicle(body: CustomVehicleRequest, session: str = SessionParam):
+    result = _engine(session).custom_add_vehicle(body.model_dump())
     if not result['ok']:
-        from fastapi import HTTPException
         raise HTTPException(status_code=400, detail=result['reason'])
     return result
 
 @app.delete("/custom/vehicle/{vehicle_id}", summary="Sterge un vehicul din scenariul custom")
-async def custom_remove_vehicle(vehicle_id: str):
-    result = engine.custom_remove_vehicle(vehicle_id)
+async def custom_remove_vehicle(vehicle_id: str, session: str = SessionParam):
+    result = _engine(session).custom_remove_vehicle(vehicle_id)
     if not result['ok']:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail=result['reason'])
     return result
 
 @app.patch("/custom/vehicle/{vehicle_id}", summary="Modifica parametrii unui vehicul custom")
-async def custom_update_vehicle(vehicle_id: str, body: CustomVehicleUpdate):
+async def custom_update_vehicle(vehicle_id: str, body: CustomVehicleUpdate, session: str = SessionParam):
     updates = {k: v for k, v in body.model_dump().items() if v is not None}
-    result = engine.custom_update_vehicle(vehicle_id, updates)
+    result = _engine(session).custom_update_vehicle(vehicle_id, updates)
     if not result['ok']:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail=result['reason'])
     return result
 
 @app.delete("/custom/clear", summary="Goleste complet scenariul custom")
-async def custom_clear():
-    return engine.custom_clear()
+async def custom_clear(session: str = SessionParam):
+    return _engine(session).custom_clear()
 
 @app.post("/custom/semaphore", summary="Setează dacă scenariul custom are semafor")
-async def custom_set_semaphore(body: dict):
+async def custom_set_semaphore(body: dict, session: str = SessionParam):
     has_sem = body.get('has_semaphore', True)
-    return engine.set_custom_semaphore(bool(has_sem))
+    return _engine(session).set_custom_semaphore(bool(has_sem))
 
-# ── WebSocket ────────────────────────────────────────────────────────────
+# ── Inregistrare & redare ────────────────────────────────────────────────
 
-class _Manager:
-    def __init__(self):
-        self.active: list[WebSocket] = []
+# Redarile deschise, dupa numele inregistrarii (nu ruleaza niciun engine)
+_replays: dict = {}
 
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        self.active.append(ws)
+@app.post("/recording/start", summary="Incepe inregistrarea fiecarui tick al sesiunii")
+async def start_recording(body: RecordingStartRequest = RecordingStartRequest(), session: str = SessionParam):
+    engine = _engine(session)
+    name = body.name or f"{session}-{engine.scenario_name}-{time.strftime('%Y%m%d-%H%M%S')}"
+    try:
+        return engine.start_recording(recording_path(name))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except FileExistsError:
+        raise HTTPException(status_code=409, detail=f'inregistrarea {name} exista deja')
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-    def disconnect(self, ws: WebSocket):
-        if ws in self.active:
-            self.active.remove(ws)
+@app.post("/recording/stop", summary="Opreste si finalizeaza inregistrarea sesiunii")
+async def stop_recording(session: str = SessionParam):
+    info = _engine(session).stop_recording()
+    if info is None:
+        raise HTTPException(status_code=404, detail=f'sesiunea {session} nu inregistreaza')
+    return info
 
-manager = _Manager()
+@app.get("/recordings", summary="Lista inregistrarilor finalizate")
+async def get_recordings():
+    return {"recordings": list_recordings()}
+
+def _replay(name: str) -> Replay:
+    replay = _replays.get(name)
+    if replay is None:
+        raise HTTPException(status_code=404, detail=f'redarea {name} nu e deschisa')
+    return replay
+
+@app.post("/replays", summary="Deschide o inregistrare pentru redare")
+async def open_replay(body: ReplayOpenRequest):
+    try:
+        recording = Recording(recording_path(body.recording))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    replay = _replays[recording.name] = Replay(recording)
+    return replay.status()
+
+@app.get("/replays/{name}/state", summary="Starea redata (frame-ul curent sau ?frame=N)")
+async def replay_state(name: str, frame: Optional[int] = Query(None, ge=0)):
+    try:
+        return _replay(name).state(frame)
+    except IndexError as e:
+        raise HTTPException(status_code=416, detail=str(e))
+
+@app.post("/replays/{name}/control", summary="Play / pause / seek / viteza redarii")
+async def replay_control(name: str, body: ReplayControl):
+    replay = _replay(name)
+    try:
+        if body.action == 'play':
+            replay.play(body.speed)
+        elif body.action == 'pause':
+            replay.pause()
+        else:
+            if body.frame is None:
+                raise HTTPException(status_code=422, detail="seek cere 'frame'")
+            replay.seek(body.frame)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IndexError as e:
+        raise HTTPException(status_code=416, detail=str(e))
+    return replay.status()
+
+@app.delete("/replays/{name}", summary="Inchide o redare")
+async def close_replay(name: str):
+    if _replays.pop(name, None) is None:
+        raise HTTPException(status_code=404, detail=f'redarea {name} nu e deschisa')
+    return {"closed": name}
+
+# ── WebSocket ────────────────────────────────────────────────────────────
 
 @app.websocket("/ws")
-async def ws_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def ws_endpoint(websocket: WebSocket, session: str = DEFAULT_SESSION, stream: str = 'delta',
+                      format: str = 'json', fields: Optional[str] = None,
+                      vehicles: Optional[str] = None, rate: Optional[float] = None):
+    engine = sessions.get(session)
+    if engine is None:
+        await websocket.close(code=4404)
+        return
     try:
+        spec = Subscription(fields, vehicles, rate)
+    except ValueError:
+        spec = None
+    if spec is None or stream not in STREAMS or format not in binary.FORMATS:
+        await websocket.close(code=4400)
+        return
+    await websocket.accept()
+    hub = get_hub(session, engine)
+    sub = hub.subscribe(websocket, stream, format, spec)
+    try:
+        # Trimiterea o face task-ul abonatului; aici citim doar mesajele de control
         while True:
-            await websocket.send_json(engine.get_state())
-            await asyncio.sleep(1 / 30)
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
-    except Exception:
-        manager.disconnect(websocket)
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message.get('text') is None:
+                continue   # frame binar — mesajele de control sunt text (JSON)
+            try:
+                msg = json.loads(message['text'])
+            except ValueError:
+                continue
+            if not isinstance(msg, dict):
+                continue
+            if msg.get('type') == 'resync':
+                hub.resync(sub)
+            elif msg.get('type') == 'subscribe':
+                try:
+                    hub.update(sub, Subscription.from_message(msg))
+                except ValueError as e:
+                    await websocket.send_text(json.dumps({'type': 'error', 'detail': str(e)}))
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        hub.unsubscribe(sub)
+
+@app.get("/metrics/llm", summary="Clientul Ollama: cereri in zbor, expirate, latenta, batch-uri")
+async def llm_metrics():
+    return llm_client.stats()
+
+@app.get("/metrics/ws", summary="Statistici broadcast /ws: abonati, frame-uri, pierderi, latenta tick → trimitere")
+async def ws_metrics(session: str = SessionParam):
+    engine = _engine(session)
+    return get_hub(session, engine).stats()
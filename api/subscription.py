@@ -0,0 +1,83 @@
+"""
+api/subscription.py — Filtrele de abonare pentru /ws
+Un client alege ce primeste, fie la conectare (?fields=vehicles,semaphore&vehicles=A,B&rate=10),
+fie oricand printr-un mesaj:
+  {"type": "subscribe", "fields": ["event_log", "collisions"], "vehicles": ["A"], "rate": 10}
+  fields   — sectiunile de nivel superior ale starii ('event_log' = campul 'events'); null = toate
+  vehicles — id-urile urmarite in 'vehicles' si 'agents_memory'; null = toate
+  rate     — frame-uri pe secunda (cel mult FPS); null = fiecare tick
+'tick' si 'timestamp' sunt trimise mereu.
+"""
+from typing import FrozenSet, Optional
+
+from simulation.engine import FPS
+
+ALWAYS = ('tick', 'timestamp')
+FIELDS = frozenset({
+    'cooperation', 'scenario', 'paused', 'vehicles', 'semaphore', 'custom_scenario',
+    'custom_has_semaphore', 'risk', 'risk_zones', 'event_seq', 'event_log_start',
+    'collisions', 'agents_memory', 'event_log',
+})
+
+
+def _names(value, what: str) -> Optional[FrozenSet[str]]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = [p for p in value.split(',') if p]
+    if not isinstance(value, (list, tuple)) or not all(isinstance(x, str) for x in value):
+        raise ValueError(f"'{what}' trebuie sa fie o lista de siruri")
+    return frozenset(value)
+
+
+class Subscription:
+    def __init__(self, fields=None, vehicles=None, rate=None):
+        self.fields   = _names(fields, 'fields')
+        self.vehicles = _names(vehicles, 'vehicles')
+        if self.fields is not None and self.fields - FIELDS:
+            raise ValueError(f"campuri necunoscute: {', '.join(sorted(self.fields - FIELDS))}")
+        if rate is not None:
+            try:
+                rate = float(rate)
+            except (TypeError, ValueError):
+                raise ValueError("'rate' trebuie sa fie un numar")
+            if rate <= 0:
+                raise ValueError("'rate' trebuie sa fie pozitiv")
+            rate = None if rate >= FPS else rate
+        self.rate = rate
+
+    @classmethod
+    def from_message(cls, msg: dict) -> 'Subscription':
+        return cls(msg.get('fields'), msg.get('vehicles'), msg.get('rate'))
+
+    @property
+    def key(self) -> tuple:
+        """Clientii cu aceeasi cheie impart frame-urile (o singura serializare)."""
+        return (self.fields, self.vehicles, self.rate)
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate if self.rate else 0.0
+
+    def wants(self, field: str) -> bool:
+        return self.fields is None or field in self.fields
+
+    def apply(self, state: dict) -> dict:
+        """Starea filtrata. Fara filtre → acelasi dict (nicio copie)."""
+        if self.fields is None and self.vehicles is None:
+            return state
+        out = {k: v for k, v in state.items() if k in ALWAYS or self.wants(k)}
+        if self.vehicles is not None:
+            ids = self.vehicles
+            if 'vehicles' in out:
+                out['vehicles'] = [v for v in out['vehicles'] if v['id'] in ids]
+            if 'agents_memory' in out:
+                out['agents_memory'] = {vid: m for vid, m in out['agents_memory'].items() if vid in ids}
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            'fields':   sorted(self.fields) if self.fields is not None else None,
+            'vehicles': sorted(self.vehicles) if self.vehicles is not None else None,
+            'rate':     self.rate,
+        }
@@ -0,0 +1,82 @@
+"""
+benchmarks/bench_lazy_state.py — Cost-ul materializarii starii in rularea headless
+Ruleaza fiecare scenariu inclus (fallback determinist) de trei ori, acelasi numar de
+tick-uri: 'eager' citeste starea completa dupa fiecare tick (cum facea _update_state()
+inainte), 'vehicles' cere doar sectiunea vehiculelor, 'lazy' nu cere nimic. Raporteaza
+tick-uri/s si castigul fata de eager. Verifica ca starea construita la cerere la final
+e identica cu cea din rularea eager (fara timestamp-uri si ora din memoria agentilor);
+exit 1 altfel.
+
+Rulare: python -m benchmarks.bench_lazy_state [--ticks N] [--repeat R] [scenariu ...]
+"""
+import argparse
+import json
+import sys
+import time
+
+from scenarios import SCENARIOS
+from services import llm_client
+from simulation.engine import SimulationEngine
+from utils import logger
+
+MODES = {
+    'eager':    lambda eng: eng.get_state(),
+    'vehicles': lambda eng: eng.get_state({'vehicles'}),
+    'lazy':     None,
+}
+
+
+def _comparable(state: dict) -> str:
+    st = {k: v for k, v in state.items() if k != 'timestamp'}
+    st['vehicles'] = [{k: v for k, v in snap.items() if k != 'timestamp'} for snap in st['vehicles']]
+    st['agents_memory'] = {vid: [{k: v for k, v in e.items() if k != 'tick_time'} for e in mem]
+                           for vid, mem in st['agents_memory'].items()}
+    return json.dumps(st, sort_keys=True, default=str)
+
+
+def run(name: str, ticks: int, read) -> tuple:
+    eng = SimulationEngine()
+    eng._load_scenario(name)
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        eng._tick()
+        if read is not None:
+            read(eng)
+    elapsed = time.perf_counter() - t0
+    return elapsed, _comparable(eng.get_state())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_lazy_state')
+    parser.add_argument('scenarios', nargs='*')
+    parser.add_argument('--ticks', type=int, default=600)
+    parser.add_argument('--repeat', type=int, default=3, help='rulari per mod (se pastreaza cea mai rapida)')
+    args = parser.parse_args(argv)
+
+    prev_llm, prev_persist = llm_client.set_enabled(False), logger.set_persist(False)
+    ok = True
+    try:
+        print(f"{'scenariu':<14} | {'eager t/s':>10} {'vehicles t/s':>13} {'lazy t/s':>10} | "
+              f"{'vehicles':>8} {'lazy':>6}")
+        for name in args.scenarios or list(SCENARIOS):
+            rate, final = {}, {}
+            for mode, read in MODES.items():
+                best = None
+                for _ in range(args.repeat):
+                    elapsed, final[mode] = run(name, args.ticks, read)
+                    best = elapsed if best is None else min(best, elapsed)
+                rate[mode] = args.ticks / best
+            print(f"{name:<14} | {rate['eager']:10.0f} {rate['vehicles']:13.0f} {rate['lazy']:10.0f} | "
+                  f"{rate['vehicles'] / rate['eager']:7.2f}x {rate['lazy'] / rate['eager']:5.2f}x")
+            if len(set(final.values())) != 1:
+                print("  ✗ starea la cerere difera de cea eager")
+                ok = False
+    finally:
+        llm_client.set_enabled(prev_llm)
+        logger.set_persist(prev_persist)
+    print('OK — starea construita la cerere e identica' if ok else 'ESEC')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+benchmarks/bench_llm_client.py — Clientul Ollama: requests + 4 thread-uri vs httpx asincron
+Porneste un server local care imita /api/generate (raspunde dupa --delay ms, keep-alive)
+si trimite runde de cereri simultane pentru 1, 10 si 100 de vehicule in zbor:
+  threads — cum era inainte: requests.post (conexiune noua) intr-un ThreadPoolExecutor(4)
+  async   — services/ollama.OllamaClient (pool keep-alive, max_in_flight, termen per cerere)
+Raporteaza latenta per cerere (p50/p95, de la trimitere la raspuns), debitul si cate
+conexiuni TCP a deschis fiecare varianta (dupa o runda de incalzire, nemasurata).
+Exit 1 daca vreo cerere async esueaza.
+
+Rulare: python -m benchmarks.bench_llm_client [--delay MS] [--rounds R] [--in-flight 1 10 100]
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from services.ollama import MAX_IN_FLIGHT, OllamaClient
+from simulation.profiler import summarize_ms
+
+BODY = json.dumps({'response': json.dumps({'action': 'GO', 'reason': 'drum liber'})}).encode()
+PAYLOAD = {'model': 'stand-in', 'prompt': 'x' * 1500, 'stream': False, 'format': 'json'}
+
+
+def answer(payload: dict) -> bytes:
+    """Raspunsul /api/generate: GO pentru un vehicul; la prompt batch primul GO, restul YIELD."""
+    ids = re.findall(r'^Vehicle (\S+):', payload.get('prompt', ''), re.M)
+    if len(ids) < 2:
+        return BODY
+    decisions = [{'id': vid, 'action': 'YIELD' if i else 'GO', 'reason': 'coordonare batch'}
+                 for i, vid in enumerate(ids)]
+    return json.dumps({'response': json.dumps({'decisions': decisions})}).encode()
+
+
+class StandIn:
+    """Server HTTP/1.1 minimal (keep-alive) pe un loop propriu, intr-un thread de fundal."""
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.connections = 0
+        self.requests    = 0   # doar POST /api/generate (fara ping-urile /api/tags)
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        threading.Thread(target=self._run, args=(ready,), daemon=True).start()
+        ready.wait()
+
+    def _run(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self._handle, '127.0.0.1', 0, backlog=512))
+        self.port = self.server.sockets[0].getsockname()[1]
+        ready.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                length, close = 0, False
+                while (header := await reader.readline()) not in (b'\r\n', b''):
+                    name, _, value = header.decode().partition(':')
+                    if name.lower() == 'content-length':
+                        length = int(value)
+                    elif name.lower() == 'connection' and value.strip().lower() == 'close':
+                        close = True
+                body = answer(json.loads(await reader.readexactly(length) or b'{}'))
+                self.requests += line.startswith(b'POST /api/generate')
+                await asyncio.sleep(self.delay)
+                writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                             b'Content-Length: %d\r\n\r\n' % len(body) + body)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+
+def run_threads(url: str, in_flight: int, rounds: int) -> tuple:
+    """Varianta veche: o conexiune noua per cerere, 4 thread-uri."""
+    def one(t_submit):
+        r = requests.post(url + '/api/generate', json=PAYLOAD, timeout=30)
+        r.json()
+        return time.perf_counter() - t_submit
+    lat = []
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(one, [time.perf_counter()] * in_flight))   # incalzire
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            now = time.perf_counter()
+            lat += [f.result() for f in [pool.submit(one, now) for _ in range(in_flight)]]
+        elapsed = time.perf_counter() - t0
+    return lat, elapsed, 0
+
+
+async def _run_async(client: OllamaClient, in_flight: int, rounds: int) -> tuple:
+    async def one(t_submit):
+        await client.generate(PAYLOAD)
+        return time.perf_counter() - t_submit
+    lat, errors = [], 0
+    # Incalzire: clientul si conexiunile se creeaza o data per proces, nu per decizie
+    await asyncio.gather(*[one(time.perf_counter()) for _ in range(in_flight)], return_exceptions=True)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        now = time.perf_counter()
+        for res in await asyncio.gather(*[one(now) for _ in range(in_flight)], return_exceptions=True):
+            if isinstance(res, Exception):
+                errors += 1
+            else:
+                lat.append(res)
+    elapsed = time.perf_counter() - t0
+    await client.aclose()
+    return lat, elapsed, errors
+
+
+def run_async(url: str, in_flight: int, rounds: int, max_in_flight: int) -> tuple:
+    client = OllamaClient(url, max_in_flight=max_in_flight, deadline=30.0)
+    return asyncio.run(_run_async(client, in_flight, rounds))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_llm_client')
+    parser.add_argument('--delay', type=float, default=20.0, help='timpul de "inferenta" al serverului (ms)')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--in-flight', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--max-in-flight', type=int, default=MAX_IN_FLIGHT, help='limita de concurenta a clientului async')
+    args = parser.parse_args(argv)
+
+    server = StandIn(args.delay / 1000)
+    ok = True
+    print(f"server local: {server.url}, delay {args.delay:.0f} ms, {args.rounds} runde, "
+          f"max_in_flight async = {args.max_in_flight}")
+    print(f"{'in zbor':>7} | {'varianta':<8} | {'p50 ms':>8} {'p95 ms':>8} | {'cereri/s':>9} | {'conexiuni':>9}")
+    for n in args.in_flight:
+        for name in ('threads', 'async'):
+            before = server.connections
+            if name == 'threads':
+                lat, elapsed, errors = run_threads(server.url, n, args.rounds)
+            else:
+                lat, elapsed, errors = run_async(server.url, n, args.rounds, args.max_in_flight)
+            st = summarize_ms(lat)
+            print(f"{n:>7} | {name:<8} | {st['p50']:8.1f} {st['p95']:8.1f} | "
+                  f"{len(lat) / elapsed:9.0f} | {server.connections - before:>9}")
+            if errors:
+                print(f"  ✗ {errors} cereri esuate")
+                ok = False
+    print('OK' if ok else 'ESEC')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
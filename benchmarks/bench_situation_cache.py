@@ -0,0 +1,114 @@
+"""
+benchmarks/bench_situation_cache.py — Cache-ul de situatii LLM pe scenarii repetate
+Ruleaza fiecare scenariu de mai multe ori cu deciziile LLM active, contra serverului
+local din bench_llm_client (raspunde dupa --delay ms). Intre treceri cache-ul de
+situatii e salvat pe disc si reincarcat intr-un cache nou (warm start, ca la
+repornirea serverului); cache-ul per vehicul (TTL) se goleste. Raporteaza per trecere
+cererile ajunse la Ollama, hit rate-ul cache-ului de situatii, cate chei distincte au
+fost cautate si cati galeti de TTC distincti apar in ele.
+Exit 1 (doar pentru scenariile in care agentii cer decizii LLM — cele fara conflicte
+V2V nu se verifica) daca:
+  - ultima trecere are hit rate sub --min-hit-rate
+  - toate cheile cautate au un singur galet de TTC (cuantizarea a colapsat cheia la
+    topologie, iar hit rate-ul nu mai masoara reutilizarea reala)
+
+Rulare: python -m benchmarks.bench_situation_cache [--passes P] [--ticks N] [scenariu ...]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_llm_client import StandIn
+from scenarios import SCENARIOS
+from services import llm_client
+from services.situation_cache import SituationCache, situation_key, ttc_buckets
+from simulation.engine import SimulationEngine
+from utils import logger
+
+
+def run_pass(name: str, ticks: int, pace: float) -> None:
+    eng = SimulationEngine()
+    eng._load_scenario(name)
+    for _ in range(ticks):
+        eng._tick()
+        time.sleep(pace)   # raspunsurile sosesc in timp real, tick-urile nu trebuie sa le depaseasca complet
+        if all(v.state == 'done' for v in eng.vehicles):
+            break
+    # Asteapta cererile in zbor — raspunsurile lor intra in cache-ul de situatii
+    deadline = time.perf_counter() + 5
+    while any(not f.done() for f in llm_client._pending.values()) and time.perf_counter() < deadline:
+        time.sleep(0.005)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_situation_cache')
+    parser.add_argument('scenarios', nargs='*')
+    parser.add_argument('--passes', type=int, default=8)
+    parser.add_argument('--ticks', type=int, default=1500)
+    parser.add_argument('--delay', type=float, default=5.0, help='timpul de "inferenta" al serverului (ms)')
+    parser.add_argument('--pace', type=float, default=1.0, help='pauza dupa fiecare tick (ms)')
+    # Seturile simetrice (membri cu aceeasi cheie si actiuni diferite) nu intra in cache,
+    # deci 'multi' ramane la ~80-90% chiar si dupa ce cache-ul s-a stabilizat
+    parser.add_argument('--min-hit-rate', type=float, default=0.75)
+    args = parser.parse_args(argv)
+
+    server = StandIn(args.delay / 1000)
+    llm_client.client.base_url = server.url
+    llm_client.client.breaker.record_success()
+    prev_llm, prev_persist = llm_client.set_enabled(True), logger.set_persist(False)
+    logger_level = llm_client.logger.level
+    llm_client.logger.setLevel('WARNING')
+    prev_cache = llm_client.situations
+    looked_up: set = set()
+
+    def recording_key(context: dict) -> str:
+        key = situation_key(context)
+        looked_up.add(key)
+        return key
+
+    llm_client.situation_key = recording_key
+    ok = True
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"{'scenariu':<14} | {'trecere':>7} | {'cereri Ollama':>13} | {'hits':>6} {'misses':>6} "
+                  f"{'hit rate':>8} | {'intrari':>7} | {'chei':>5} {'galeti TTC':>10}")
+            for name in args.scenarios or list(SCENARIOS):
+                path = Path(tmp) / f'{name}.json'
+                looked_up.clear()
+                llm_client.situations = SituationCache(path=path, tag=prev_cache.tag)
+                for p in range(1, args.passes + 1):
+                    llm_client._llm_cache.clear()
+                    llm_client._pending.clear()
+                    before, cache = server.requests, llm_client.situations
+                    run_pass(name, args.ticks, args.pace / 1000)
+                    st = cache.stats()
+                    buckets = set().union(*(ttc_buckets(k) for k in looked_up))
+                    print(f"{name:<14} | {p:>7} | {server.requests - before:>13} | {st['hits']:>6} "
+                          f"{st['misses']:>6} {st['hit_rate']:>8.1%} | {st['entries']:>7} | "
+                          f"{len(looked_up):>5} {len(buckets):>10}")
+                    # Warm start: salvare pe disc si incarcare intr-un cache nou
+                    cache.save()
+                    llm_client.situations = SituationCache(path=path, tag=cache.tag)
+                    llm_client.situations.load()
+                if not looked_up:
+                    continue
+                if st['hit_rate'] < args.min_hit_rate:
+                    print(f"  ✗ hit rate {st['hit_rate']:.1%} < {args.min_hit_rate:.0%} la ultima trecere")
+                    ok = False
+                if len(buckets) < 2:
+                    print(f"  ✗ un singur galet de TTC ({', '.join(buckets)}) in {len(looked_up)} chei")
+                    ok = False
+    finally:
+        llm_client.situation_key = situation_key
+        llm_client.situations = prev_cache
+        llm_client.set_enabled(prev_llm)
+        logger.set_persist(prev_persist)
+        llm_client.logger.setLevel(logger_level)
+    print('OK' if ok else 'ESEC')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+benchmarks/bench_snapshot_alloc.py — Alocari per tick in SimulationEngine._tick() (tracemalloc)
+Incarca scenariul perpendicular cu N vehicule (coloane pe cele 4 directii, spawn la 30 de
+tick-uri pe banda — dupa incalzire se misca doar capetele coloanelor, restul asteapta cu
+snapshot-ul din cache), ruleaza WARMUP tick-uri cu tracemalloc pornit si masoara TICKS
+tick-uri reale (agenti, V2X, coliziuni, publish pe bus), pe ambele cai ale engine-ului:
+bucla Vehicle.update() si store-ul VehicleArray. Verifica (exit 1 altfel):
+  - varful alocat per vehicul intr-un tick ramane constant cand N creste (GROWTH_LIMIT)
+  - memoria ramasa dupa un tick nu depinde de N (RETAINED_LIMIT octeti, total)
+
+Rulare: python -m benchmarks.bench_snapshot_alloc [N ...]
+"""
+import logging
+import sys
+import tracemalloc
+
+from services import llm_client
+from simulation.engine import SimulationEngine
+from utils import logger
+
+WARMUP         = 60
+TICKS          = 10
+GROWTH_LIMIT   = 1.25   # alocarea per vehicul poate varia cu cel mult 25% intre N-uri
+RETAINED_LIMIT = 2048   # octeti ramasi per tick (medie), independent de N
+PATHS          = {'bucla': False, 'store': True}   # engine.vectorized
+
+
+def make_defs(n: int) -> list:
+    return [{'id': f'v{i}', 'direction': 'NSEV'[i % 4], 'intent': 'straight'} for i in range(n)]
+
+
+def measure(n: int, vectorized: bool) -> tuple:
+    """(varf mediu alocat intr-un tick, octeti ramasi per tick — medie, vehicule in miscare)"""
+    eng = SimulationEngine()
+    eng.vectorized = vectorized
+    eng._load_scenario('perpendicular', defs=make_defs(n))
+    peaks, kept = [], []
+    tracemalloc.start()
+    try:
+        # Incalzirea ruleaza sub tracemalloc: snapshot-urile inlocuite in tick-urile
+        # masurate au fost alocate tot sub urmarire, deci diferenta ramasa e reala
+        for _ in range(WARMUP):
+            eng._tick()
+        for _ in range(TICKS):
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            eng._tick()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+            kept.append(current - base)
+    finally:
+        tracemalloc.stop()
+    moving = sum(1 for v in eng.vehicles if v.state != 'done' and (v.vx or v.vy))
+    return sum(peaks) / TICKS, sum(kept) / TICKS, moving
+
+
+def main(argv=None) -> int:
+    sizes = [int(a) for a in (argv or sys.argv[1:])] or [100, 400, 1600]
+    prev_llm, prev_persist = llm_client.set_enabled(False), logger.set_persist(False)
+    logging.disable(logging.INFO)
+    ok = True
+    try:
+        print(f"{'cale':<6} {'N':>6} | {'in miscare':>10} | {'varf (B/tick)':>14} | "
+              f"{'B/vehicul':>10} | {'ramas (B/tick)':>15}")
+        for path, vectorized in PATHS.items():
+            per_vehicle = []
+            for n in sizes:
+                peak, kept, moving = measure(n, vectorized)
+                per_vehicle.append(peak / n)
+                print(f'{path:<6} {n:>6} | {moving:>10} | {peak:14.0f} | {peak / n:10.1f} | {kept:15.0f}')
+                if kept > RETAINED_LIMIT:
+                    print(f'  ✗ {path}: raman {kept:.0f} B/tick > {RETAINED_LIMIT} B')
+                    ok = False
+            if max(per_vehicle) > GROWTH_LIMIT * min(per_vehicle):
+                print(f'  ✗ {path}: alocarea per vehicul creste cu N: '
+                      f'{min(per_vehicle):.1f} → {max(per_vehicle):.1f} B')
+                ok = False
+    finally:
+        logging.disable(logging.NOTSET)
+        llm_client.set_enabled(prev_llm)
+        logger.set_persist(prev_persist)
+    print('OK — alocari constante per vehicul' if ok else 'ESEC')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+benchmarks/bench_startup.py — Pornire la rece: timpul de import si time-to-first-tick
+Fiecare masuratoare ruleaza intr-un proces Python nou (nimic in cache-ul de module):
+  import   — `python -X importtime -c "import <modul>"`: timpul cumulat al modulelor
+             urmarite (api.server, simulation.engine, services.llm_client, scenarios, ...)
+  first    — de la pornirea interpretorului pana la primul tick terminat:
+             headless (run_scenario, 1 tick) si server (import api.server + sesiunea
+             implicita + _tick())
+Pastreaza mediana din --repeat rulari.
+
+Verifica si ca importul serverului nu face munca blocanta — exit 1 daca:
+  - deschide vreo conexiune de retea (audit hook 'socket.connect')
+  - importa httpx, un modul de scenariu sau construieste engine-ul implicit
+  - time-to-first-tick depaseste --budget-ms (daca e dat)
+
+Rulare: python -m benchmarks.bench_startup [--repeat R] [--budget-ms MS]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT    = Path(__file__).parent.parent
+TRACKED = ('api.server', 'simulation.sessions', 'simulation.engine', 'simulation.headless',
+           'services.llm_client', 'services.ollama', 'scenarios', 'httpx', 'numpy', 'fastapi')
+
+# Rulat intr-un proces nou: importa serverul si raporteaza ce a facut importul
+_IMPORT_CHECK = '''
+import json, sys
+connects = []
+sys.addaudithook(lambda event, args: connects.append(repr(args[1])) if event == 'socket.connect' else None)
+import api.server
+import simulation.engine
+print(json.dumps({
+    'connects':        connects,
+    'httpx':           'httpx' in sys.modules,
+    'scenario_modules': sorted(m for m in sys.modules if m.startswith('scenarios.')),
+    'engine_built':    simulation.engine._default_engine is not None,
+}))
+'''
+
+_FIRST_TICK = {
+    'headless': '''
+import time; t0 = time.perf_counter()
+from simulation.headless import run_scenario
+run_scenario('perpendicular', max_ticks=1, until_done=False)
+print((time.perf_counter() - t0) * 1000)
+''',
+    'server': '''
+import time; t0 = time.perf_counter()
+from api.server import app
+from simulation.sessions import sessions, DEFAULT_SESSION
+sessions.get(DEFAULT_SESSION)._tick()
+print((time.perf_counter() - t0) * 1000)
+''',
+}
+
+
+def _python(args: list) -> subprocess.CompletedProcess:
+    env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def import_times(module: str) -> dict:
+    """{modul: cumulat (ms)} din -X importtime (doar modulele urmarite)."""
+    out = {}
+    for line in _python(['-X', 'importtime', '-c', f'import {module}']).stderr.splitlines():
+        m = re.match(r'import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)', line)
+        if m and m.group(3) in TRACKED and m.group(3) not in out:
+            out[m.group(3)] = int(m.group(1)) / 1000
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_startup')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, help='limita pentru time-to-first-tick (ms)')
+    args = parser.parse_args(argv)
+
+    ok = True
+    runs = [import_times('api.server') for _ in range(args.repeat)]
+    print(f"import api.server (ms cumulat, mediana din {args.repeat}):")
+    for name in TRACKED:
+        values = [r[name] for r in runs if name in r]
+        if values:
+            print(f"  {name:<22} {statistics.median(values):8.1f}")
+        else:
+            print(f"  {name:<22} {'-':>8}   (neimportat)")
+
+    print("time-to-first-tick (ms, mediana):")
+    for mode, code in _FIRST_TICK.items():
+        ms = statistics.median(float(_python(['-c', code]).stdout.strip().splitlines()[-1])
+                               for _ in range(args.repeat))
+        over = args.budget_ms is not None and ms > args.budget_ms
+        print(f"  {mode:<22} {ms:8.1f}" + (f"   ✗ peste bugetul de {args.budget_ms:.0f} ms" if over else ''))
+        ok &= not over
+
+    check = json.loads(_python(['-c', _IMPORT_CHECK]).stdout.strip().splitlines()[-1])
+    problems = []
+    if check['connects']:
+        problems.append(f"conexiuni de retea la import: {', '.join(check['connects'])}")
+    if check['httpx']:
+        problems.append("httpx importat la import")
+    if check['scenario_modules']:
+        problems.append(f"scenarii importate la import: {', '.join(check['scenario_modules'])}")
+    if check['engine_built']:
+        problems.append("engine-ul implicit construit la import")
+    for p in problems:
+        print(f"  ✗ {p}")
+    ok &= not problems
+    print('OK — importul serverului nu face munca blocanta' if ok else 'ESEC')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+benchmarks/bench_vehicle_array.py — Vehicle.update() per obiect vs VehicleArray.step()
+Genereaza N vehicule pe cele 4 directii (coloane de trafic) si masoara timpul unui tick.
+VehicleArray ruleaza in ambele ordini de citire a vecinilor (vezi models/vehicle_array.py):
+'list' (identic cu bucla — un pas complet + frontul trecerii pe benzi) si 'snapshot' (o runda).
+Echivalenta se verifica in bench_vehicle_array_equiv.
+Tinta (exit 1 daca nu e atinsa): TARGET_N vehicule, order='list', sub TARGET_MS ms/tick
+(cel mai bun din TARGET_REPEAT rulari — masina poate fi zgomotoasa).
+
+Rulare: python -m benchmarks.bench_vehicle_array [N ...]
+"""
+import random
+import sys
+import time
+
+from models.vehicle import Vehicle
+from models.vehicle_array import VehicleArray
+from services.v2x_bus import V2XBus
+
+TICKS = 50
+TARGET_N      = 5000
+TARGET_MS     = 10.0
+TARGET_REPEAT = 3
+
+
+def make_vehicles(n: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    counts = {}
+    vehicles = []
+    for i in range(n):
+        d = 'NSEV'[i % 4]
+        c = counts.get(d, 0)
+        counts[d] = c + 1
+        v = Vehicle(f'v{i}', d, intent=rnd.choice(('straight', 'left', 'right')),
+                    speed_multiplier=rnd.choice((0.5, 1.0, 1.5)))
+        off = c * 60
+        if d == 'N':   v.y -= off
+        elif d == 'S': v.y += off
+        elif d == 'E': v.x += off
+        else:          v.x -= off
+        vehicles.append(v)
+    return vehicles
+
+
+def bench_objects(n: int) -> float:
+    vehicles = make_vehicles(n)
+    bus = V2XBus()
+    t0 = time.perf_counter()
+    for tick in range(1, TICKS + 1):
+        active = [v for v in vehicles if v.state != 'done']
+        for v in vehicles:
+            same_dir = [o for o in active if o.id != v.id and o.direction == v.direction]
+            v.update(same_dir, active_vehicles=active, current_tick=tick, bus=bus)
+    return (time.perf_counter() - t0) / TICKS
+
+
+def bench_array(n: int, order: str) -> tuple:
+    """(secunde per tick, runde maxime per tick)"""
+    arr = VehicleArray.from_vehicles(make_vehicles(n))
+    rounds = 0
+    t0 = time.perf_counter()
+    for tick in range(1, TICKS + 1):
+        rounds = max(rounds, arr.step(tick, order=order))
+    return (time.perf_counter() - t0) / TICKS, rounds
+
+
+def main(argv=None) -> int:
+    sizes = [int(a) for a in (argv or sys.argv[1:])] or [50, 200, 1000, 5000, 20000]
+    print(f"{'N':>7} | {'per obiect (ms/tick)':>21} | {'list (ms/tick)':>15} {'runde':>6} | "
+          f"{'snapshot (ms/tick)':>19}")
+    for n in sizes:
+        # Bucla per obiect e O(n²) — o sarim pentru N mare
+        obj = f'{bench_objects(n) * 1000:21.2f}' if n <= 1000 else f"{'-':>21}"
+        exact, rounds = bench_array(n, 'list')
+        snap, _ = bench_array(n, 'snapshot')
+        print(f'{n:>7} | {obj} | {exact * 1000:15.3f} {rounds:>6} | {snap * 1000:19.3f}')
+
+    best = min(bench_array(TARGET_N, 'list')[0] for _ in range(TARGET_REPEAT)) * 1000
+    ok = best < TARGET_MS
+    print(f"tinta: {TARGET_N} vehicule, order='list': {best:.3f} ms/tick "
+          f"({'<' if ok else '>='} {TARGET_MS:g} ms) {'OK' if ok else 'ESEC'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
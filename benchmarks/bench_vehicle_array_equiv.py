@@ -0,0 +1,149 @@
+"""
+benchmarks/bench_vehicle_array_equiv.py — VehicleArray.step() contra buclei Vehicle.update()
+Verificari (exit 1 daca oricare esueaza):
+  coloane  — N vehicule in coloane pe cele 4 directii (intentii, viteze, V2X, no_stop si
+             agent_yield aleatoare; jumatate au clearance, restul il primesc la tick-ul T/2;
+             semaforul pentru cele fara V2X alterneaza), T tick-uri, referinta = bucla per
+             obiect in ordinea listei:
+               order='list'     — la fiecare tick aceleasi stari si pozitii (toleranta TOL px)
+               order='snapshot' — pornind din aceeasi stare, intr-un tick pozitia difera cu cel
+                                  mult viteza de baza a vehiculului; deriva cumulata (fara
+                                  resincronizare) se raporteaza, nu se verifica
+  engine   — fiecare scenariu headless cu engine.vectorized (store persistent, vehiculele sunt
+             VehicleView): acelasi digest ca bucla per obiect
+
+Rulare: python -m benchmarks.bench_vehicle_array_equiv [--vehicles N] [--ticks T] [--seed S]
+"""
+import argparse
+import math
+import random
+import sys
+
+from benchmarks.bench_vehicle_array import make_vehicles
+from models.vehicle_array import VehicleArray
+from scenarios import SCENARIOS
+from services.v2x_bus import V2XBus
+from simulation.headless import run_scenario
+
+TOL          = 1e-9    # px
+LIGHT_PERIOD = 90      # tick-uri per faza a semaforului (vehiculele fara V2X)
+
+
+def make_case(n: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    vehicles = make_vehicles(n, seed)
+    for v in vehicles:
+        v.clearance   = rnd.random() < 0.5
+        v.v2x_enabled = rnd.random() < 0.8
+        v.no_stop     = rnd.random() < 0.1
+        v.agent_yield = rnd.random() < 0.1
+    return vehicles
+
+
+def lights_at(tick: int) -> dict:
+    ns = (tick // LIGHT_PERIOD) % 2 == 0
+    return {d: 'green' if (d in 'NS') == ns else 'red' for d in 'NSEV'}
+
+
+def step_objects(vehicles: list, tick: int, bus: V2XBus) -> None:
+    """Bucla per obiect (ca in bench_vehicle_array): vecinii deja mutati sunt vazuti mutati."""
+    active = [v for v in vehicles if v.state != 'done']
+    for v in vehicles:
+        same_dir = [o for o in active if o.id != v.id and o.direction == v.direction]
+        v.update(same_dir, active_vehicles=active, current_tick=tick, bus=bus)
+
+
+def release(vehicles: list, arr: VehicleArray = None) -> None:
+    """La jumatatea rularii toata lumea primeste clearance, iar agentii renunta la YIELD."""
+    for v in vehicles:
+        v.clearance   = True
+        v.agent_yield = False
+    if arr is not None:
+        arr.clearance[:]   = True
+        arr.agent_yield[:] = False
+        arr.touch()
+
+
+def compare(vehicles: list, arr: VehicleArray) -> tuple:
+    """(diferenta maxima de pozitie in px, cate vehicule au alta stare)."""
+    obj = VehicleArray.from_vehicles(vehicles)
+    dpos = max(max(abs(obj.x - arr.x).max(), abs(obj.y - arr.y).max()), 0.0)
+    return float(dpos), int((obj.state != arr.state).sum())
+
+
+def check_list(n: int, ticks: int, seed: int) -> bool:
+    vehicles = make_case(n, seed)
+    arr      = VehicleArray.from_vehicles(make_case(n, seed))
+    bus      = V2XBus()
+    worst, rounds = 0.0, 0
+    for tick in range(1, ticks + 1):
+        if tick == ticks // 2:
+            release(vehicles, arr)
+        bus.publish('INFRA', {'lights': lights_at(tick)})
+        step_objects(vehicles, tick, bus)
+        rounds = max(rounds, arr.step(tick, lights=lights_at(tick), order='list'))
+        dpos, dstate = compare(vehicles, arr)
+        worst = max(worst, dpos)
+        if dpos > TOL or dstate:
+            print(f"  ✗ order='list': tick {tick} — pozitie {dpos:.3g} px, {dstate} stari diferite")
+            return False
+    print(f"  order='list'     {ticks} tick-uri, {n} vehicule: identic (max {worst:.1e} px, "
+          f"cel mult {rounds} runde/tick)")
+    return True
+
+
+def check_snapshot(n: int, ticks: int, seed: int) -> bool:
+    vehicles = make_case(n, seed)
+    drift    = VehicleArray.from_vehicles(make_case(n, seed))   # fara resincronizare
+    bus      = V2XBus()
+    worst    = 0.0   # cel mai mare raport diferenta / viteza de baza intr-un tick
+    for tick in range(1, ticks + 1):
+        if tick == ticks // 2:
+            release(vehicles, drift)
+        bus.publish('INFRA', {'lights': lights_at(tick)})
+        one = VehicleArray.from_vehicles(vehicles)               # aceeasi stare de start
+        speed = [math.hypot(v._base_vx, v._base_vy) for v in vehicles]
+        one.step(tick, lights=lights_at(tick), order='snapshot')
+        drift.step(tick, lights=lights_at(tick), order='snapshot')
+        step_objects(vehicles, tick, bus)
+        for i, v in enumerate(vehicles):
+            d = max(abs(v.x - one.x[i]), abs(v.y - one.y[i]))
+            if d > speed[i] + TOL:
+                print(f"  ✗ order='snapshot': tick {tick}, {v.id} — {d:.3f} px > viteza de baza {speed[i]:.3f}")
+                return False
+            if speed[i] > 0:
+                worst = max(worst, d / speed[i])
+    dpos, dstate = compare(vehicles, drift)
+    print(f"  order='snapshot' un tick: <= {worst:.2f} x viteza de baza; deriva dupa {ticks} "
+          f"tick-uri: {dpos:.1f} px, {dstate}/{n} stari diferite (informativ)")
+    return True
+
+
+def check_engine() -> bool:
+    ok = True
+    for name in SCENARIOS:
+        ref = run_scenario(name, digest=True, vectorized=False)['digest']
+        vec = run_scenario(name, digest=True, vectorized=True)['digest']
+        print(f"  engine {name:<14} {'identic' if vec == ref else '✗ digest diferit'}")
+        ok &= vec == ref
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_vehicle_array_equiv')
+    parser.add_argument('--vehicles', type=int, default=200)
+    parser.add_argument('--ticks', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"coloane ({args.vehicles} vehicule, seed {args.seed}):")
+    ok  = check_list(args.vehicles, args.ticks, args.seed)
+    ok &= check_snapshot(args.vehicles, args.ticks, args.seed)
+    print("scenarii (digest headless, engine.vectorized):")
+    ok &= check_engine()
+    print('OK' if ok else 'ESEC')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
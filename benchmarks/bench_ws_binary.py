@@ -0,0 +1,98 @@
+"""
+benchmarks/bench_ws_binary.py — Frame JSON vs frame binar (api/binary.py)
+Ruleaza fiecare scenariu inclus (fallback determinist) si colecteaza starea la fiecare
+tick. Pentru fiecare stare: dimensiunea sectiunii 'vehicles' si a frame-ului complet in
+JSON si binar, plus timpul de codare / decodare. Verifica ca decode() reproduce
+vehiculele (fara 'timestamp', care nu se transmite); exit 1 altfel.
+
+Rulare: python -m benchmarks.bench_ws_binary [--ticks N] [scenariu ...]
+"""
+import argparse
+import json
+import sys
+import time
+
+from api import binary
+from scenarios import SCENARIOS
+from services import llm_client
+from simulation.engine import SimulationEngine
+from utils import logger
+
+
+def _dumps(payload) -> bytes:
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def collect(name: str, ticks: int) -> list:
+    eng = SimulationEngine()
+    eng._load_scenario(name)
+    states = []
+    for _ in range(ticks):
+        eng._tick()
+        states.append(dict(eng.get_state()))
+    return states
+
+
+def measure(states: list) -> dict:
+    r = dict.fromkeys(('veh_json', 'veh_bin', 'json', 'bin', 'enc_json', 'enc_bin',
+                       'dec_json', 'dec_bin'), 0.0)
+    r['mismatches'] = 0
+    for state in states:
+        r['veh_json'] += len(_dumps(state['vehicles']))
+        r['veh_bin'] += len(state['vehicles']) * binary.VEHICLE_RECORD.size
+
+        t0 = time.perf_counter()
+        text = _dumps(state)
+        t1 = time.perf_counter()
+        buf = binary.encode_state(state)
+        t2 = time.perf_counter()
+        json.loads(text)
+        t3 = time.perf_counter()
+        _, vehicles = binary.decode(buf)
+        t4 = time.perf_counter()
+        r['enc_json'] += t1 - t0
+        r['enc_bin'] += t2 - t1
+        r['dec_json'] += t3 - t2
+        r['dec_bin'] += t4 - t3
+        r['json'] += len(text)
+        r['bin'] += len(buf)
+
+        expected = [{k: v for k, v in snap.items() if k != 'timestamp'} for snap in state['vehicles']]
+        if vehicles != expected:
+            r['mismatches'] += 1
+    return r
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_ws_binary')
+    parser.add_argument('scenarios', nargs='*')
+    parser.add_argument('--ticks', type=int, default=600)
+    args = parser.parse_args(argv)
+
+    prev_llm, prev_persist = llm_client.set_enabled(False), logger.set_persist(False)
+    ok = True
+    try:
+        print(f"{'scenariu':<14} | {'vehicule B/frame':>17} | {'frame B':>15} | "
+              f"{'codare us':>15} | {'decodare us':>15}")
+        print(f"{'':<14} | {'json':>8} {'bin':>8} | {'json':>7} {'bin':>7} | "
+              f"{'json':>7} {'bin':>7} | {'json':>7} {'bin':>7}")
+        for name in args.scenarios or list(SCENARIOS):
+            states = collect(name, args.ticks)
+            r = measure(states)
+            n = len(states)
+            print(f"{name:<14} | {r['veh_json'] / n:8.0f} {r['veh_bin'] / n:8.0f} | "
+                  f"{r['json'] / n:7.0f} {r['bin'] / n:7.0f} | "
+                  f"{r['enc_json'] / n * 1e6:7.1f} {r['enc_bin'] / n * 1e6:7.1f} | "
+                  f"{r['dec_json'] / n * 1e6:7.1f} {r['dec_bin'] / n * 1e6:7.1f}")
+            if r['mismatches']:
+                print(f"  ✗ {r['mismatches']} frame-uri decodate gresit")
+                ok = False
+    finally:
+        llm_client.set_enabled(prev_llm)
+        logger.set_persist(prev_persist)
+    print('OK — decodarea binara reproduce vehiculele' if ok else 'ESEC')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
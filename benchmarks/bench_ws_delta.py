@@ -0,0 +1,82 @@
+"""
+benchmarks/bench_ws_delta.py — Octeti pe /ws: stare completa vs keyframe + delta
+Ruleaza fiecare scenariu inclus (fallback determinist, fara Ollama) si, la fiecare tick,
+serializeaza starea completa si frame-ul delta (keyframe la fiecare KEYFRAME_EVERY
+tick-uri, ca BroadcastHub). Verifica ca apply_delta() reconstruieste exact starea
+completa la fiecare tick; exit 1 altfel.
+
+Rulare: python -m benchmarks.bench_ws_delta [--ticks N] [scenariu ...]
+"""
+import argparse
+import json
+import sys
+
+from api.broadcast import KEYFRAME_EVERY
+from api.delta import KEYED, DeltaEncoder, apply_delta
+from scenarios import SCENARIOS
+from services import llm_client
+from simulation.engine import SimulationEngine
+from utils import logger
+
+
+def _encode(payload: dict) -> str:
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
+
+
+def _canonical(state: dict) -> str:
+    # Ordinea obiectelor din listele cu cheie nu face parte din protocol
+    st = {k: sorted(v, key=KEYED[k]) if k in KEYED else v for k, v in state.items()}
+    return json.dumps(st, sort_keys=True, default=str)
+
+
+def measure(name: str, ticks: int) -> dict:
+    eng = SimulationEngine()
+    eng._load_scenario(name)
+    enc = DeltaEncoder()
+    full_bytes = delta_bytes = keyframes = mismatches = 0
+    client = None
+    for i in range(ticks):
+        eng._tick()
+        state = eng.get_state()
+        full = _encode(state)
+        full_bytes += len(full)
+        if i % KEYFRAME_EVERY == 0:
+            enc.rebase(state)
+            frame, client = full, json.loads(full)
+            keyframes += 1
+        else:
+            frame = _encode(enc.diff(state))
+            client = apply_delta(client, json.loads(frame))
+            if _canonical(client) != _canonical(json.loads(full)):
+                mismatches += 1
+        delta_bytes += len(frame)
+    return {'scenario': name, 'ticks': ticks, 'keyframes': keyframes, 'full': full_bytes,
+            'delta': delta_bytes, 'mismatches': mismatches}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_ws_delta')
+    parser.add_argument('scenarios', nargs='*')
+    parser.add_argument('--ticks', type=int, default=600)
+    args = parser.parse_args(argv)
+
+    prev_llm, prev_persist = llm_client.set_enabled(False), logger.set_persist(False)
+    ok = True
+    try:
+        print(f"{'scenariu':<14} | {'full (KB)':>10} | {'delta (KB)':>10} | {'raport':>7} | {'B/frame':>8}")
+        for name in args.scenarios or list(SCENARIOS):
+            r = measure(name, args.ticks)
+            print(f"{name:<14} | {r['full'] / 1024:10.1f} | {r['delta'] / 1024:10.1f} | "
+                  f"{r['full'] / r['delta']:6.1f}x | {r['delta'] / r['ticks']:8.0f}")
+            if r['mismatches']:
+                print(f"  ✗ {r['mismatches']} frame-uri reconstruite gresit")
+                ok = False
+    finally:
+        llm_client.set_enabled(prev_llm)
+        logger.set_persist(prev_persist)
+    print('OK — delta reconstruieste starea completa' if ok else 'ESEC')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
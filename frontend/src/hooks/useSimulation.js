@@ -2,12 +2,59 @@ import { useState, useEffect, useRef, useCallback } from 'react';
 import { FAKE_STATE } from '../data/fakeData';
 
 const API_URL = (wsUrl) => wsUrl.replace('ws://', 'http://').replace('/ws', '');
+const EVENT_LOG_SIZE = 20;   // cate evenimente afiseaza EventLog
+
+// Serverul trimite pe /ws doar evenimentele noi ('events', fiecare cu 'seq').
+// Le acumulam local (ordonate dupa seq, fara duplicate); cele cu seq <= event_log_start
+// au fost sterse la reincarcarea scenariului.
+const mergeEvents = (prev, events, start) => {
+  const kept = prev.filter(ev => ev.seq > start);
+  const seen = new Set(kept.map(ev => ev.seq));
+  const fresh = (events || []).filter(ev => ev.seq > start && !seen.has(ev.seq));
+  if (!fresh.length && kept.length === prev.length) return prev;
+  return [...kept, ...fresh].sort((a, b) => a.seq - b.seq).slice(-EVENT_LOG_SIZE);
+};
+
+const lastSeq = (events, start) =>
+  Math.max(events.length ? events[events.length - 1].seq : 0, start);
+
+// Protocolul delta de pe /ws (vezi api/delta.py): 'key' = stare completa,
+// 'delta' = doar ce s-a schimbat fata de frame-ul 'prev'.
+const KEYED = {
+  vehicles:   (v) => v.id,
+  risk_zones: (z) => z.vehicles.join('|'),
+};
+
+const applyDelta = (state, d) => {
+  const out = { ...state, tick: d.tick, timestamp: d.timestamp, ...(d.changed || {}) };
+  for (const [section, upd] of Object.entries(d.patch || {})) {
+    out[section] = { ...(out[section] || {}), ...upd };
+  }
+  for (const [section, gone] of Object.entries(d.unset || {})) {
+    out[section] = { ...out[section] };
+    gone.forEach(k => delete out[section][k]);
+  }
+  const items = d.items || {};
+  const removed = d.removed || {};
+  for (const section of new Set([...Object.keys(items), ...Object.keys(removed)])) {
+    const keyOf = KEYED[section];
+    const objects = new Map((out[section] || []).map(o => [keyOf(o), o]));
+    (removed[section] || []).forEach(k => objects.delete(k));
+    for (const [k, fields] of Object.entries(items[section] || {})) {
+      objects.set(k, { ...(objects.get(k) || {}), ...fields });
+    }
+    out[section] = [...objects.values()];
+  }
+  return out;
+};
 
 export default function useSimulation(wsUrl = 'ws://localhost:8000/ws') {
   const [state,       setState]       = useState(FAKE_STATE);
   const [isConnected, setIsConnected] = useState(false);
   const [error,       setError]       = useState(null);
   const wsRef  = useRef(null);
+  const eventsRef = useRef([]);
+  const baseRef   = useRef(null);   // ultima stare completa reconstruita + numarul frame-ului
   const apiUrl = API_URL(wsUrl);
 
   // ── WebSocket ────────────────────────────────────────────────────
@@ -19,8 +66,40 @@ export default function useSimulation(wsUrl = 'ws://localhost:8000/ws') {
       ws = new WebSocket(wsUrl);
       wsRef.current = ws;
 
-      ws.onopen    = () => { setIsConnected(true); setError(null); };
-      ws.onmessage = (e) => { try { setState(JSON.parse(e.data)); } catch {} };
+      ws.onopen    = () => { setIsConnected(true); setError(null); baseRef.current = null; };
+      ws.onmessage = (e) => {
+        try {
+          const msg = JSON.parse(e.data);
+          const start = (msg.type === 'delta'
+            ? msg.changed?.event_log_start ?? baseRef.current?.state.event_log_start
+            : msg.event_log_start) ?? 0;
+          const known = lastSeq(eventsRef.current, start);
+          if ((msg.events_since ?? known) > known) {
+            // Frame-uri pierdute (client lent) — recuperam prin HTTP evenimentele lipsa
+            const since = Math.max(known, msg.events_since - EVENT_LOG_SIZE);
+            fetch(`${API_URL(wsUrl)}/events?since=${since}&limit=${msg.events_since - since}`)
+              .then(res => res.json())
+              .then(res => { eventsRef.current = mergeEvents(eventsRef.current, res.events, start); })
+              .catch(() => {});
+          }
+          eventsRef.current = mergeEvents(eventsRef.current, msg.events, start);
+          let next;
+          if (msg.type === 'delta') {
+            const base = baseRef.current;
+            if (!base || base.frame !== msg.prev) {
+              // Gol in secventa — cerem un keyframe si ignoram delta-urile pana vine
+              if (base) ws.send(JSON.stringify({ type: 'resync' }));
+              baseRef.current = null;
+              return;
+            }
+            next = applyDelta(base.state, msg);
+          } else {
+            next = msg;
+          }
+          baseRef.current = { frame: msg.frame, state: next };
+          setState({ ...next, event_log: eventsRef.current });
+        } catch {}
+      };
       ws.onerror   = ()  => setError('WebSocket eroare');
       ws.onclose   = ()  => {
         setIsConnected(false);
@@ -24,16 +24,16 @@ AXIS = {
 }
 
 
-def _get_my_light(vehicle) -> str:
+def _get_my_light(vehicle, bus=v2x_bus) -> str:
     """Citeste culoarea semaforului pentru vehiculul dat, la intersectia sa."""
     ikey      = getattr(vehicle, 'intersection_key', 'NV')
     direction = vehicle.direction
     # Incearca INFRA_{key}
-    infra = v2x_bus.get_all().get(f"INFRA_{ikey}", {})
+    infra = bus.get(f"INFRA_{ikey}") or {}
     if infra:
         return infra.get("lights", {}).get(direction, "green")
     # Fallback INFRA global
-    infra_g = v2x_bus.get_all().get("INFRA", {})
+    infra_g = bus.get("INFRA") or {}
     all_l   = infra_g.get("all_lights", {})
     if ikey in all_l:
         return all_l[ikey].get(direction, "green")
@@ -71,9 +71,19 @@ def _is_ahead_on_same_lane(me: dict, other: dict) -> bool:
 
 
 class Agent:
-    def __init__(self, vehicle, cooperation: bool = True):
+    def __init__(self, vehicle, cooperation: bool = True, bus=None, log=None, scope: str = None,
+                 clock=None):
+        """
+        bus / log: V2XBus-ul si DecisionLogger-ul sesiunii (implicit cele globale).
+        scope: prefixul cheii de cache LLM — separa vehicule cu acelasi id din sesiuni diferite.
+        clock: ceasul simularii (implicit cel al vehiculului).
+        """
         self.vehicle          = vehicle
         self.cooperation      = cooperation
+        self._bus             = bus if bus is not None else v2x_bus
+        self._logger          = log if log is not None else logger
+        self._scope           = scope
+        self._clock           = clock if clock is not None else vehicle.clock
         self.last_action: str = "go"
         self.memory: deque    = deque(maxlen=MEMORY_SIZE)
         self._last_state: str = ""   # ultima stare inregistrata (pentru deduplicare)
@@ -86,9 +96,8 @@ class Agent:
         return list(self.memory)
 
     def _record(self, action: str, ttc: float, reason: str, target_id: str = None) -> None:
-        import time as _t
         entry = {
-            "tick_time": _t.strftime("%H:%M:%S"),
+            "tick_time": self._clock.strftime(),
             "action":    action,
             "ttc":       round(ttc, 3),
             "reason":    reason,
@@ -161,7 +170,7 @@ class Agent:
             self.last_action = "go"
             return "go"
 
-        all_bus = v2x_bus.get_all()
+        all_bus = self._bus.get_all()
         ikey    = getattr(v, 'intersection_key', 'NV')
 
         relevant = {}
@@ -219,7 +228,7 @@ class Agent:
             "memory": list(self.memory)[-3:],  # ultimele 3 decizii ale agentului
         }
 
-        llm_result = request_llm_decision(v.id, context)
+        llm_result = request_llm_decision(v.id, context, scope=self._scope, now=self._clock.time())
         action_raw = llm_result.get("action", "GO").upper()
         reason     = llm_result.get("reason", "decizie agent")
 
@@ -294,4 +303,4 @@ class Agent:
         self.last_action = action
         self._record(action.upper(), ttc, reason or f"TTC={ttc:.2f}s")
         if action != prev and action not in ("go",):
-            logger.log_decision(v.id, action.upper(), ttc, reason or "")
+            self._logger.log_decision(v.id, action.upper(), ttc, reason or "")
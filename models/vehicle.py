@@ -9,8 +9,8 @@ Benzi (offset fata de centrul drumului, latimea benzii = 30px):
   E/V drum orizontal (y=400): banda_in y=415, banda_out y=385
 Intent: 'straight' | 'left' | 'right'
 """
-import time
 import math
+from utils import clock as sim_clock
 # Geometrie intersectie
 INTERSECTION_X = 400
 INTERSECTION_Y = 400
@@ -64,6 +64,11 @@ EXIT_DIRECTION = {
     ('V', 'right'):    'N',   # dreapta din V → spre Sud (N, vy>0)
 }
 
+# Coduri numerice (index in tuplu) — pentru stocarea vectorizata (models/vehicle_array.py)
+DIRECTIONS = ('N', 'S', 'E', 'V')
+INTENTS    = ('straight', 'left', 'right')
+STATES     = ('moving', 'braking', 'waiting', 'crossing', 'crashed', 'done')
+
 # Conversie km/h ↔ speed_multiplier
 # 3 px/tick × 30 FPS = 90 px/s = viteza de baza
 # Definim: speed_multiplier=1.0 ↔ 50 km/h
@@ -76,15 +81,83 @@ def kmh_to_multiplier(kmh: float) -> float:
 def multiplier_to_kmh(mult: float) -> int:
     return max(1, round(mult * KMH_BASE))
 
+# Campurile din care se construieste to_dict() — o scriere marcheaza snapshot-ul ca invalid
+SNAPSHOT_FIELDS = frozenset({
+    'id', 'direction', 'intent', 'priority', 'v2x_enabled', 'no_stop', 'state',
+    'clearance', 'x', 'y', 'vx', 'vy', '_base_vx', '_base_vy',
+})
+
+
+class VehicleSnapshot(dict):
+    """Starea publicata a unui vehicul — imutabila, partajata de toti consumatorii."""
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('VehicleSnapshot este imutabil — foloseste dict(snapshot) pentru o copie')
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (VehicleSnapshot, (dict(self),))
+
+
+def _heading(direction: str, base_vx: float, base_vy: float) -> float:
+    if base_vx == 0 and base_vy == 0:
+        # Stationat — pastreaza directia de intrare
+        vx0, vy0 = VELOCITY[direction]
+        return math.atan2(vx0, -vy0)
+    return math.atan2(base_vx, -base_vy)
+
+
+def make_snapshot(vid: str, direction: str, intent: str, priority: str, v2x_enabled: bool,
+                  no_stop: bool, state: str, clearance: bool, x: float, y: float, vx: float,
+                  vy: float, base_vx: float, base_vy: float, timestamp: float) -> VehicleSnapshot:
+    """Snapshot-ul publicat al unui vehicul (Vehicle.to_dict, VehicleArray.refresh_snapshots)."""
+    speed_px_s = math.sqrt(vx**2 + vy**2) * 30  # px/s
+    speed_kmh  = round(speed_px_s / 90 * KMH_BASE)  # km/h
+    dx = INTERSECTION_X - x
+    dy = INTERSECTION_Y - y
+    return VehicleSnapshot({
+        'id':         vid,
+        'direction':  direction,
+        'intent':     intent,
+        'priority':   priority,
+        'v2x_enabled': v2x_enabled,
+        'no_stop':    no_stop,
+        'state':      state,
+        'clearance':  clearance,
+        'x':          round(x, 1),
+        'y':          round(y, 1),
+        'vx':         round(vx, 2),
+        'vy':         round(vy, 2),
+        'speed_kmh':  speed_kmh,
+        'heading':    round(_heading(direction, base_vx, base_vy), 4),
+        'dist_to_intersection': round(math.sqrt(dx*dx + dy*dy), 1),
+        'timestamp':  timestamp,
+    })
+
+
 class Vehicle:
+    __slots__ = (
+        'id', 'direction', 'intent', 'priority', 'v2x_enabled', 'spawn_tick', 'no_stop',
+        'agent_yield', 'state', 'speed_multiplier', 'x', 'y', 'vx', 'vy',
+        '_base_vx', '_base_vy', '_init', '_exit_dir', '_turned', 'clearance', 'wait_line',
+        '_yielded_logged',   # setat de CentralSystem (log YIELD o singura data)
+        '_snapshot',         # cache to_dict() — None = invalid
+        'clock',             # utils/clock.SimClock — timestamp-ul snapshot-ului
+    )
+
     def __init__(self, id: str, direction: str, intent: str = 'straight',
                  priority: str = 'normal', speed_multiplier: float = 1.0,
                  v2x_enabled: bool = True, spawn_tick: int = 0,
-                 no_stop: bool = False):
+                 no_stop: bool = False, clock: sim_clock.SimClock = None):
         """
         no_stop: True = vehiculul NU se opreste la linia de stop (merge cu viteza constant).
                  Folosit pentru vehicule cu viteza mare care au prioritate prin TTC.
+        clock:   ceasul simularii (implicit utils.clock.default).
         """
+        self.clock     = clock if clock is not None else sim_clock.default
         self.id        = id
         self.direction = direction
         self.intent    = intent
@@ -110,6 +183,13 @@ class Vehicle:
         # Decizie sistem central
         self.clearance = False   # True = sistemul i-a dat voie sa treaca
         self.wait_line = self._calc_wait_line()
+        self._yielded_logged = False
+        self._snapshot = None
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in SNAPSHOT_FIELDS:
+            object.__setattr__(self, '_snapshot', None)
 
     def _calc_wait_line(self) -> float:
         """Pozitia unde masina se opreste — cu STOP_MARGIN px inainte de linia alba."""
@@ -201,12 +281,7 @@ class Vehicle:
 
     def heading_angle(self) -> float:
         """Unghi de orientare (radiani) bazat pe viteza curenta, pentru randare."""
-        if self._base_vx == 0 and self._base_vy == 0:
-            # Stationat — pastreaza directia de intrare
-            import math as _m
-            vx0, vy0 = VELOCITY[self.direction]
-            return _m.atan2(vx0, -vy0)
-        return math.atan2(self._base_vx, -self._base_vy)
+        return _heading(self.direction, self._base_vx, self._base_vy)
 
     def _dist_to_wait_line(self) -> float:
         """Distanta ramasa pana la linia de stop (pozitiva = inca n-a ajuns)."""
@@ -237,13 +312,15 @@ class Vehicle:
             d = other.x - self.x
         return d if d > 0 else 9999.0
 
-    def _desired_speed_factor(self, vehicles_same_dir: list, all_vehicles: list = None) -> float:
+    def _desired_speed_factor(self, vehicles_same_dir: list, all_vehicles: list = None,
+                              occupancy=None) -> float:
         """
         Calculeaza factorul de viteza dorit (0..1) tinand cont de:
         - distanta fata de vehiculul din fata (following)
         - distanta fata de linia de stop (daca nu are clearance)
         Vehiculele FARA V2X respecta semaforul si following-ul,
         dar nu primesc clearance de la sistemul central.
+        occupancy: OccupancyIndex-ul engine-ului — inlocuieste scanarea all_vehicles.
         """
         # Decizia LLM: agentul a decis YIELD — opreste inainte de intersectie
         if self.agent_yield and not self._is_inside_intersection():
@@ -293,18 +370,20 @@ class Vehicle:
 
         # Senzor intersectie: daca cineva e deja in mijloc, incetineste inainte sa intre
         # NUMAI pentru vehicule cu V2X — cele fara V2X nu au senzori
-        if all_vehicles and not self._is_inside_intersection() and self.v2x_enabled:
-            for other in all_vehicles:
-                if other.id == self.id: continue
-                if other.state != 'done' and other._is_inside_intersection():
-                    d_wait = self._dist_to_wait_line()
-                    # Dacă e aproape de intrare și cineva e deja în careu, frânează sau oprește
-                    if 0 < d_wait < 150:
-                        t = d_wait / 150
-                        # Opreste la linie daca distanta e mica
-                        f_inter = MIN_SPEED_FACTOR + (1.0 - MIN_SPEED_FACTOR) * t
-                        factor = min(factor, f_inter)
-                        break # Opreste cautarea, e deja ocupata intersecția
+        if (occupancy is not None or all_vehicles) and self.v2x_enabled and not self._is_inside_intersection():
+            if occupancy is not None:
+                occupied = occupancy.is_occupied(exclude=self.id)
+            else:
+                occupied = any(other.id != self.id and other.state != 'done' and other._is_inside_intersection()
+                               for other in all_vehicles)
+            if occupied:
+                d_wait = self._dist_to_wait_line()
+                # Dacă e aproape de intrare și cineva e deja în careu, frânează sau oprește
+                if 0 < d_wait < 150:
+                    t = d_wait / 150
+                    # Opreste la linie daca distanta e mica
+                    f_inter = MIN_SPEED_FACTOR + (1.0 - MIN_SPEED_FACTOR) * t
+                    factor = min(factor, f_inter)
 
         # Stop la linia de semafoare (numai daca nu are clearance si nu e no_stop)
         # Semaforul conteaza DOAR cand masina e inainte de linia de stop
@@ -326,6 +405,10 @@ class Vehicle:
         """
         Misca vehiculul un tick.
         vehicles_same_dir: lista cu celelalte vehicule pe aceeasi directie (pentru following).
+        kwargs: current_tick, active_vehicles, bus (V2XBus-ul sesiunii; implicit cel global),
+                leader (vehiculul din fata, din cozile per banda ale engine-ului — inlocuieste
+                scanarea lui vehicles_same_dir; None = banda libera),
+                occupancy (OccupancyIndex — cutia intersectiei, in loc de scanarea active_vehicles).
         """
         if self.state in ('done', 'crashed'):
             return
@@ -342,8 +425,10 @@ class Vehicle:
             dist_to_stop = self._dist_to_wait_line()
             # Doar daca e inainte de linia de stop (dist > 0) verifica semaforul
             if dist_to_stop > 0:
-                from services import v2x_bus as _bus
-                infra = _bus.get_all().get('INFRA', {})
+                _bus = kwargs.get('bus')
+                if _bus is None:
+                    from services import v2x_bus as _bus
+                infra = _bus.get('INFRA') or {}
                 lights = infra.get('lights', {})
                 my_light = lights.get(self.direction, 'green')
                 if my_light == 'green':
@@ -364,9 +449,15 @@ class Vehicle:
             self.vy = 0.0
             return
 
+        # Liderul deja cunoscut (coada benzii) → following-ul nu mai scaneaza toata directia
+        if 'leader' in kwargs:
+            leader = kwargs['leader']
+            vehicles_same_dir = [leader] if leader is not None else []
+
         # Calculam viteza dorita (following logic + cross-traffic check)
         # Factor se aplica pentru moving, braking SI crossing
-        factor = self._desired_speed_factor(vehicles_same_dir or [], all_vehicles=kwargs.get('active_vehicles'))
+        factor = self._desired_speed_factor(vehicles_same_dir or [], all_vehicles=kwargs.get('active_vehicles'),
+                                            occupancy=kwargs.get('occupancy'))
 
         # Daca traversam si trebuie sa viram
         if self.state == 'crossing' and not self._turned and self.intent != 'straight' and self._has_reached_turn_point():
@@ -415,27 +506,20 @@ class Vehicle:
         # v2x_enabled, no_stop raman nemodificate la reset
 
     def to_dict(self) -> dict:
-        import math as _math
-        speed_px_s = _math.sqrt(self.vx**2 + self.vy**2) * 30  # px/s
-        speed_kmh  = round(speed_px_s / 90 * KMH_BASE)         # km/h
-        return {
-            'id':         self.id,
-            'direction':  self.direction,
-            'intent':     self.intent,
-            'priority':   self.priority,
-            'v2x_enabled': self.v2x_enabled,
-            'no_stop':    self.no_stop,
-            'state':      self.state,
-            'clearance':  self.clearance,
-            'x':          round(self.x, 1),
-            'y':          round(self.y, 1),
-            'vx':         round(self.vx, 2),
-            'vy':         round(self.vy, 2),
-            'speed_kmh':  speed_kmh,
-            'heading':    round(self.heading_angle(), 4),
-            'dist_to_intersection': round(self.dist_to_intersection(), 1),
-            'timestamp':  time.time(),
-        }
+        """
+        Snapshot-ul curent (VehicleSnapshot, imutabil). Se reconstruieste doar dupa
+        o schimbare a unui camp din SNAPSHOT_FIELDS — toti consumatorii din acelasi
+        tick (bus V2X, agent, coliziuni, starea API) primesc acelasi obiect.
+        'timestamp' = momentul ultimei schimbari.
+        """
+        snap = self._snapshot
+        if snap is not None:
+            return snap
+        snap = make_snapshot(self.id, self.direction, self.intent, self.priority, self.v2x_enabled,
+                             self.no_stop, self.state, self.clearance, self.x, self.y, self.vx,
+                             self.vy, self._base_vx, self._base_vy, self.clock.time())
+        object.__setattr__(self, '_snapshot', snap)
+        return snap
 
     def __repr__(self):
         return (f"Vehicle({self.id} dir={self.direction} intent={self.intent} "
@@ -0,0 +1,725 @@
+"""
+models/vehicle_array.py — Stare vehicule struct-of-arrays (NumPy) + pas cinematic vectorizat
+Aceeasi semantica ca Vehicle.update() / Vehicle._desired_speed_factor(), dar pentru
+toate vehiculele deodata:
+  - following (lider = cel mai apropiat vehicul din fata pe aceeasi directie)
+  - senzor intersectie (cineva e deja in careu → incetineste inainte de linie)
+  - franare / oprire la linia de stop (fara clearance)
+  - aplicarea virajului in centrul intersectiei
+  - retragerea vehiculelor iesite din canvas (state = done)
+
+Ordinea citirilor (step(order=...)):
+  'list'     — ca bucla per obiect din engine: un vehicul vede starea deja actualizata
+               a celor dinaintea lui in lista si starea de la inceputul tick-ului a celor
+               de dupa — rezultatul e identic cu bucla. Un pas complet cu vecinii de la
+               inceputul tick-ului, apoi o singura trecere pe benzi (_sweep): se recalculeaza
+               doar urmaritorii liderilor care s-au miscat altfel si doar cat timp citirea
+               lor chiar se schimba, deci frontul scade de la o runda la alta. Daca cineva
+               a depasit pe cineva in acest tick (_overtakes), pasul se reia complet.
+  'snapshot' — toti vecinii din starea de la inceputul tick-ului, o singura runda.
+               Diferenta fata de bucla e limitata la un tick de miscare: un urmaritor vede
+               liderul cu cel mult |v_lider| px mai in spate, iar senzorul de intersectie
+               vede ocuparea de la inceputul tick-ului. Intr-un tick, pornind din aceeasi
+               stare, pozitia unui vehicul difera cu cel mult viteza lui de baza (px/tick);
+               de la un tick la altul diferentele se acumuleaza.
+
+Store persistent (bind): engine-ul tine starea vehiculelor direct in VehicleArray, iar
+lista lui de vehicule devine VehicleView — obiecte Vehicle ale caror campuri citesc si
+scriu randul lor din vectori. step() nu copiaza nimic in obiecte; snapshot-ul (to_dict)
+se reconstruieste doar cand cineva il citeste.
+
+Directiile sunt tratate prin "progres" pe axa de mers, fara ramificari per directie:
+  progres = ux * x + uy * y   cu (ux, uy) = vectorul unitate al directiei
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models.vehicle import (
+    Vehicle, make_snapshot, DIRECTIONS, INTENTS, STATES, SPAWN, VELOCITY,
+    INTERSECTION_X, INTERSECTION_Y, ROAD_WIDTH, BRAKE_ZONE_DIST, MIN_SPEED_FACTOR, MARGIN,
+)
+
+# Coduri
+DIR_CODE    = {d: i for i, d in enumerate(DIRECTIONS)}
+INTENT_CODE = {t: i for i, t in enumerate(INTENTS)}
+STATE_CODE  = {s: i for i, s in enumerate(STATES)}
+MOVING, BRAKING, WAITING, CROSSING, CRASHED, DONE = (STATE_CODE[s] for s in
+    ('moving', 'braking', 'waiting', 'crossing', 'crashed', 'done'))
+STRAIGHT = INTENT_CODE['straight']
+
+# Tabele per directie (indexate cu codul directiei)
+_UX   = np.array([VELOCITY[d][0] / 3.0 for d in DIRECTIONS])
+_UY   = np.array([VELOCITY[d][1] / 3.0 for d in DIRECTIONS])
+_SIGN = _UX + _UY                                            # +1 pentru N/V, -1 pentru S/E
+_SPAWN_X = np.array([float(SPAWN[d][0]) for d in DIRECTIONS])
+_SPAWN_Y = np.array([float(SPAWN[d][1]) for d in DIRECTIONS])
+_HORIZONTAL = np.array([d in ('E', 'V') for d in DIRECTIONS])
+# Centrul intersectiei exprimat ca progres pe axa fiecarei directii
+_CENTER_P = np.where(_HORIZONTAL, _SIGN * INTERSECTION_X, _SIGN * INTERSECTION_Y)
+
+_HALF_BOX      = ROAD_WIDTH / 2 + 5     # _is_inside_intersection
+_PAST_OFFSET   = ROAD_WIDTH // 2 + 5    # is_past_intersection
+_OFFSCREEN_OFF = 400 + MARGIN           # is_off_screen (canvas 800px, centru 400)
+_SENSOR_DIST   = 150                    # senzor intersectie (px inainte de linie)
+
+# Campurile pe care step() le modifica (restul sunt constante pe durata unui tick)
+_STEP_FIELDS  = ('x', 'y', 'vx', 'vy', 'base_vx', 'base_vy', 'state', 'clearance', 'turned')
+_MOVE_FIELDS  = ('x', 'y', 'vx', 'vy', 'state')     # subsetul care depinde de vecini (_finish)
+ORDERS        = ('list', 'snapshot')
+# Toate coloanele unui rand (compact / append / remove)
+_COLUMNS = ('x', 'y', 'vx', 'vy', 'base_vx', 'base_vy', 'wait_line', 'state', 'direction',
+            'exit_dir', 'intent', 'spawn_tick', 'clearance', 'agent_yield', 'no_stop',
+            'v2x_enabled', 'turned', 'version', 'snap_version')
+
+
+def _progress(x: np.ndarray, y: np.ndarray, dir_codes: np.ndarray) -> np.ndarray:
+    return _UX[dir_codes] * x + _UY[dir_codes] * y
+
+
+def _inside(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return (np.abs(x - INTERSECTION_X) <= _HALF_BOX) & (np.abs(y - INTERSECTION_Y) <= _HALF_BOX)
+
+
+def _canon(gap: np.ndarray, v_front: np.ndarray) -> tuple:
+    """
+    Citirile despre lider aduse la forma cu acelasi efect in _desired_speed_factor: peste
+    FOLLOW_BRAKE_DIST = fara lider, pana la FOLLOW_MIN_DIST = oprire (viteza nu conteaza),
+    v_front <= 0.1 = fara potrivire de viteza. Doua citiri cu aceeasi forma dau acelasi pas.
+    """
+    far  = gap > Vehicle.FOLLOW_BRAKE_DIST
+    stop = gap <= Vehicle.FOLLOW_MIN_DIST
+    gap  = np.where(far, np.inf, np.where(stop, float(Vehicle.FOLLOW_MIN_DIST), gap))
+    v_front = np.where(far | stop | (v_front <= 0.1), 0.0, v_front)
+    return gap, v_front
+
+
+class VehicleArray:
+    """Starea unui set de vehicule, cate un vector NumPy per camp."""
+
+    def __init__(self, n: int = 0):
+        self.ids: List[str] = [''] * n
+        self.x          = np.zeros(n)
+        self.y          = np.zeros(n)
+        self.vx         = np.zeros(n)
+        self.vy         = np.zeros(n)
+        self.base_vx    = np.zeros(n)
+        self.base_vy    = np.zeros(n)
+        self.wait_line  = np.zeros(n)
+        self.state      = np.zeros(n, dtype=np.int8)
+        self.direction  = np.zeros(n, dtype=np.int8)
+        self.exit_dir   = np.zeros(n, dtype=np.int8)
+        self.intent     = np.zeros(n, dtype=np.int8)
+        self.spawn_tick = np.zeros(n, dtype=np.int32)
+        self.clearance   = np.zeros(n, dtype=bool)
+        self.agent_yield = np.zeros(n, dtype=bool)
+        self.no_stop     = np.zeros(n, dtype=bool)
+        self.v2x_enabled = np.ones(n, dtype=bool)
+        self.turned      = np.zeros(n, dtype=bool)
+        self.version     = np.zeros(n, dtype=np.int64)   # creste la fiecare step() care misca randul
+        self.snap_version = np.zeros(n, dtype=np.int64)  # version la ultimul refresh_snapshots()
+        self.views: List['VehicleView'] = []              # bind(): randul i ↔ views[i]
+        self._lists: Dict[str, list] = {}                 # column(): tolist() pana la urmatorul step()
+        self.stale_snapshots = False                      # step() a mutat randuri dupa refresh_snapshots()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ── Conversie obiecte ↔ vectori ────────────────────────────────────
+
+    @classmethod
+    def from_vehicles(cls, vehicles: List[Vehicle]) -> 'VehicleArray':
+        arr = cls(len(vehicles))
+        arr.ids = [v.id for v in vehicles]
+        for i, v in enumerate(vehicles):
+            arr.x[i], arr.y[i]             = v.x, v.y
+            arr.vx[i], arr.vy[i]           = v.vx, v.vy
+            arr.base_vx[i], arr.base_vy[i] = v._base_vx, v._base_vy
+            arr.wait_line[i]  = v.wait_line
+            arr.state[i]      = STATE_CODE[v.state]
+            arr.direction[i]  = DIR_CODE[v.direction]
+            arr.exit_dir[i]   = DIR_CODE[v._exit_dir]
+            arr.intent[i]     = INTENT_CODE[v.intent]
+            arr.spawn_tick[i] = v.spawn_tick
+            arr.clearance[i]   = v.clearance
+            arr.agent_yield[i] = v.agent_yield
+            arr.no_stop[i]     = v.no_stop
+            arr.v2x_enabled[i] = v.v2x_enabled
+            arr.turned[i]      = v._turned
+        return arr
+
+    def apply_to(self, vehicles: List[Vehicle], rows: Optional[np.ndarray] = None) -> None:
+        """
+        Scrie starea cinematica inapoi in obiectele Vehicle (aceeasi ordine ca la from_vehicles).
+        rows: masca randurilor de scris (implicit toate). Orice scriere invalideaza snapshot-ul
+        vehiculului — engine-ul scrie doar vehiculele pe care Vehicle.update() le-ar fi atins.
+        """
+        for i, v in enumerate(vehicles):
+            if rows is not None and not rows[i]:
+                continue
+            v.x, v.y               = float(self.x[i]), float(self.y[i])
+            v.vx, v.vy             = float(self.vx[i]), float(self.vy[i])
+            v._base_vx, v._base_vy = float(self.base_vx[i]), float(self.base_vy[i])
+            v.state     = STATES[self.state[i]]
+            v.clearance = bool(self.clearance[i])
+            v._turned   = bool(self.turned[i])
+
+    def bind(self, vehicles: List[Vehicle]) -> List['VehicleView']:
+        """
+        Store persistent: cate un VehicleView per rand (vehicles = obiectele din care s-a
+        facut from_vehicles, aceeasi ordine). De aici starea lor traieste doar in vectori.
+        """
+        self.views = [VehicleView.of(self, i, v) for i, v in enumerate(vehicles)]
+        return list(self.views)
+
+    def column(self, name: str) -> list:
+        """
+        Coloana ca lista Python (citirile view-urilor — un index de lista in loc de un scalar
+        NumPy). Se reface dupa step() / append / remove; view-urile scriu in ambele.
+        Scrierile directe in vectori (fara view) trebuie urmate de touch().
+        """
+        col = self._lists.get(name)
+        if col is None:
+            col = self._lists[name] = getattr(self, name).tolist()
+        return col
+
+    def touch(self) -> None:
+        """Invalideaza coloanele din column() dupa o scriere directa in vectori."""
+        self._lists.clear()
+
+    def append(self, vehicle: Vehicle) -> 'VehicleView':
+        """Adauga un rand la final (dupa bind) si returneaza view-ul lui."""
+        self.touch()
+        row = VehicleArray.from_vehicles([vehicle])
+        for name in _COLUMNS:
+            setattr(self, name, np.concatenate((getattr(self, name), getattr(row, name))))
+        self.ids.append(vehicle.id)
+        view = VehicleView.of(self, len(self) - 1, vehicle)
+        self.views.append(view)
+        return view
+
+    def remove(self, vehicle_id: str) -> None:
+        """Sterge randul vehiculului; view-urile de dupa el se muta un rand mai sus."""
+        self.touch()
+        row  = self.ids.index(vehicle_id)
+        keep = np.arange(len(self)) != row
+        for name in _COLUMNS:
+            setattr(self, name, getattr(self, name)[keep])
+        del self.ids[row]
+        if self.views:
+            del self.views[row]
+            for i in range(row, len(self.views)):
+                self.views[i]._row = i
+
+    def refresh_snapshots(self) -> None:
+        """
+        Snapshot-urile (to_dict) view-urilor mutate de step() de la ultima citire, reconstruite
+        toate deodata din coloane — prima citire dupa un tick plateste pentru toate, celelalte
+        gasesc snapshot-ul gata. O scriere printr-un view il invalideaza ca pe orice Vehicle.
+        """
+        self.stale_snapshots = False
+        stale = np.flatnonzero(self.version != self.snap_version)
+        if stale.size == 0 or not self.views:
+            return
+        x, y, vx, vy = (self.column(name) for name in ('x', 'y', 'vx', 'vy'))
+        base_vx, base_vy = self.column('base_vx'), self.column('base_vy')
+        state, clearance = self.column('state'), self.column('clearance')
+        v2x, no_stop     = self.column('v2x_enabled'), self.column('no_stop')
+        direction, intent = self.column('direction'), self.column('intent')
+        clock, now = None, None
+        for i in stale.tolist():
+            view = self.views[i]
+            if view.clock is not clock:
+                clock, now = view.clock, view.clock.time()
+            snap = make_snapshot(view.id, DIRECTIONS[direction[i]], INTENTS[intent[i]],
+                                 view.priority, v2x[i], no_stop[i], STATES[state[i]],
+                                 clearance[i], x[i], y[i], vx[i], vy[i], base_vx[i], base_vy[i], now)
+            object.__setattr__(view, '_snapshot', snap)
+        self.snap_version[stale] = self.version[stale]
+        self._lists.pop('snap_version', None)
+
+    def live(self) -> np.ndarray:
+        """Vehiculele pe care step() le misca (nici done, nici crashed)."""
+        return (self.state != DONE) & (self.state != CRASHED)
+
+    def in_box(self) -> np.ndarray:
+        """Vehiculele numarate de OccupancyIndex (in cutia intersectiei, nu done)."""
+        return _inside(self.x, self.y) & (self.state != DONE)
+
+    def on_grid(self, tick: int) -> np.ndarray:
+        """Vehiculele din grila de coliziuni (ca engine._sync_grid): spawnate, nici done, nici crashed."""
+        return self.live() & (self.spawn_tick <= tick)
+
+    def compact(self) -> None:
+        """Elimina randurile vehiculelor retrase (state = done)."""
+        keep = self.state != DONE
+        if keep.all():
+            return
+        self.touch()
+        self.ids = [vid for vid, k in zip(self.ids, keep) if k]
+        for name in _COLUMNS:
+            setattr(self, name, getattr(self, name)[keep])
+        if self.views:
+            self.views = [view for view, k in zip(self.views, keep) if k]
+            for i, view in enumerate(self.views):
+                view._row = i
+
+    # ── Geometrie ──────────────────────────────────────────────────────
+
+    def progress(self, dir_codes: np.ndarray) -> np.ndarray:
+        """Pozitia fiecarui vehicul proiectata pe axa directiei date."""
+        return _progress(self.x, self.y, dir_codes)
+
+    def inside_intersection(self) -> np.ndarray:
+        return _inside(self.x, self.y)
+
+    def dist_to_wait_line(self) -> np.ndarray:
+        """Distanta pana la linia de stop (pozitiva = inca n-a ajuns)."""
+        return _SIGN[self.direction] * self.wait_line - self.progress(self.direction)
+
+    def _neighbours(self, start: dict, new: Optional[dict] = None) -> tuple:
+        """
+        Ce citeste fiecare vehicul despre ceilalti: ((gap, v_front, occupied), lead)
+          gap      — distanta pana la lider (inf = fara lider)
+          v_front  — viteza liderului (px/tick)
+          occupied — altcineva (nu done) e in cutia intersectiei
+          lead     — indexul liderului (-1 = fara lider)
+        new=None: toti vecinii din `start`. Altfel, ca in bucla per obiect: vehiculele
+        dinaintea lui i in lista din `new`, cele de dupa din `start`.
+        Lider = cel mai apropiat candidat (nevirat, nici done/crashed) cu progres STRICT
+        mai mare pe aceeasi directie (Vehicle.dist_ahead cere d > 0); la egalitate — primul
+        din lista, ca scanarea din _desired_speed_factor.
+        """
+        n = len(self)
+        p = _progress(start['x'], start['y'], self.direction)
+
+        # Intrarile candidat: (directie, progres, index, vedere, viteza); vedere 0 = start, 1 = new
+        ent_d, ent_p, ent_j, ent_view, ent_v = [], [], [], [], []
+        for view, s in enumerate((start,) if new is None else (start, new)):
+            j = np.flatnonzero(~s['turned'] & (s['state'] != DONE) & (s['state'] != CRASHED))
+            ent_d.append(self.direction[j])
+            ent_p.append(_progress(s['x'][j], s['y'][j], self.direction[j]))
+            ent_j.append(j)
+            ent_view.append(np.full(j.size, view, dtype=np.int8))
+            ent_v.append(np.hypot(s['vx'][j], s['vy'][j]))
+        ent_d, ent_p, ent_j, ent_view, ent_v = map(np.concatenate, (ent_d, ent_p, ent_j, ent_view, ent_v))
+        order = np.lexsort((ent_j, ent_p, ent_d))
+        ent_d, ent_p, ent_j, ent_view, ent_v = (a[order] for a in (ent_d, ent_p, ent_j, ent_view, ent_v))
+
+        gap     = np.full(n, np.inf)
+        v_front = np.zeros(n)
+        lead    = np.full(n, -1, dtype=np.int64)
+        for d in range(len(DIRECTIONS)):
+            mine = np.flatnonzero(self.direction == d)
+            lo, hi = np.searchsorted(ent_d, (d, d + 1))
+            if mine.size == 0 or lo == hi:
+                continue
+            pos = lo + np.searchsorted(ent_p[lo:hi], p[mine], side='right')
+            if new is not None:
+                # Sari peste intrarile pe care i nu le vede: starea de start a celor dinaintea
+                # lui in lista, starea noua a celor de dupa el (si a lui insusi)
+                while True:
+                    at   = np.minimum(pos, hi - 1)
+                    j    = ent_j[at]
+                    seen = np.where(ent_view[at] == 0, j > mine, j < mine)
+                    skip = (pos < hi) & ~seen
+                    if not skip.any():
+                        break
+                    pos[skip] += 1
+            has = pos < hi
+            gap[mine[has]]     = ent_p[pos[has]] - p[mine[has]]
+            v_front[mine[has]] = ent_v[pos[has]]
+            lead[mine[has]]    = ent_j[pos[has]]
+
+        gap, v_front = _canon(gap, v_front)
+        busy = _inside(start['x'], start['y']) & (start['state'] != DONE)
+        if new is None:
+            occupied = busy.sum() - busy > 0
+        else:
+            busy_new = _inside(new['x'], new['y']) & (new['state'] != DONE)
+            before   = np.cumsum(busy_new) - busy_new             # j < i, starea noua
+            after    = np.cumsum(busy[::-1])[::-1] - busy         # j > i, starea de start
+            occupied = before + after > 0
+        return (gap, v_front, occupied), lead
+
+    # ── Pas cinematic ──────────────────────────────────────────────────
+
+    def step(self, tick: int, lights: Optional[Dict[str, str]] = None, order: str = 'list') -> int:
+        """
+        Avanseaza toate vehiculele un tick (echivalentul Vehicle.update() apelat in ordinea listei).
+        lights: culoarea semaforului per directie (pentru vehiculele fara V2X); implicit verde.
+        order:  'list' (identic cu bucla per obiect) sau 'snapshot' (vecinii de la inceputul
+                tick-ului, o singura runda) — vezi docstring-ul modulului.
+        Returneaza numarul de runde (1 = doar pasul cu vecinii de la inceputul tick-ului,
+        plus cate o runda pentru fiecare front al trecerii de pe benzi).
+        """
+        if order not in ORDERS:
+            raise ValueError(f"order necunoscut: {order!r} (valori: {', '.join(ORDERS)})")
+        if len(self) == 0:
+            return 0
+        live       = self.live()
+        start      = {name: getattr(self, name) for name in _STEP_FIELDS}
+        seen, lead = self._neighbours(start)
+        prep       = self._prepare(start, tick, lights)
+        new        = self._finish(prep, seen)
+        rounds     = 1
+        if order == 'list':
+            rounds += self._sweep(start, prep, seen, lead, new)
+            if self._overtakes(start, new):
+                rounds += self._fixed_point(start, prep, new)
+        for name in _STEP_FIELDS:
+            setattr(self, name, new[name])
+        self.version[live] += 1
+        self.touch()
+        self.stale_snapshots = True
+        return rounds
+
+    def _sweep(self, start: dict, prep: dict, seen: tuple, lead: np.ndarray, new: dict) -> int:
+        """
+        Ordinea listei pornind de la pasul cu vecinii de la inceputul tick-ului: se recalculeaza
+        doar vehiculele care citesc ceva schimbat — urmaritorul unui lider aflat inaintea lui in
+        lista care s-a miscat altfel, si cele din raza senzorului cand ocuparea cutiei difera.
+        Schimbarile coboara pe fiecare banda, lider → urmaritor; o runda atinge doar frontul
+        lor. Liderul vazut in ordinea listei = liderul de la inceputul tick-ului, sarind peste
+        cei dinaintea vehiculului in lista care au iesit de pe banda (viraj / done) — valabil
+        cat timp nimeni nu depaseste pe nimeni (verificat dupa, in _overtakes). `new` se
+        actualizeaza pe loc. Returneaza numarul de runde.
+        """
+        n = len(self)
+        gap, v_front, occupied = (a.copy() for a in seen)
+        p0     = _progress(start['x'], start['y'], self.direction)
+        speed0 = np.hypot(start['vx'], start['vy'])
+        busy0  = _inside(start['x'], start['y']) & (start['state'] != DONE)
+        after  = np.cumsum(busy0[::-1])[::-1] - busy0            # j > i, starea de start
+        sensor = np.flatnonzero(prep['sensor'])
+        # Urmaritorii aflati in lista dupa liderul lor (doar ei citesc starea lui noua)
+        follows = np.flatnonzero((lead >= 0) & (lead < np.arange(n)))
+        by_lead = lead[follows]
+        eff     = lead.copy()                                    # liderul vazut acum
+        walked  = np.zeros(0, dtype=np.int64)                    # randurile cu eff != lead
+        busy    = _inside(new['x'], new['y']) & (new['state'] != DONE)
+        p_new   = _progress(new['x'], new['y'], self.direction)
+        speed   = np.hypot(new['vx'], new['vy'])
+        gone    = new['turned'] | (new['state'] == DONE) | (new['state'] == CRASHED)   # iesiti de pe banda
+        changed = np.zeros(n, dtype=bool)                        # randurile mutate in runda trecuta
+        for name in ('x', 'y', 'vx', 'vy', 'state', 'turned'):
+            changed |= new[name] != start[name]
+        moved_rows = np.flatnonzero(changed)
+        left_lane  = True                                        # runda 0: viraje / done fata de start
+        busy_dirty = True
+        rounds = 0
+        while True:
+            dep = [follows[changed[by_lead]]]
+            if walked.size:
+                dep.append(walked if left_lane else walked[changed[eff[walked]]])
+            if busy_dirty:
+                occ = np.cumsum(busy) - busy + after > 0
+                dep.append(sensor[occ[sensor] != occupied[sensor]])
+            if len(dep) == 1:
+                idx = dep[0]                                     # fiecare urmaritor are un singur lider
+            else:
+                mark = np.zeros(n, dtype=bool)
+                for part in dep:
+                    mark[part] = True
+                idx = np.flatnonzero(mark)
+            if idx.size == 0:
+                return rounds
+            # Liderul vazut: cel de la inceputul tick-ului, sarind peste cei iesiti de pe banda
+            k = lead[idx]
+            while True:
+                skip = (k >= 0) & (k < idx)
+                skip[skip] = gone[k[skip]]
+                if not skip.any():
+                    break
+                k[skip] = lead[k[skip]]
+            eff[idx] = k
+            walked   = np.flatnonzero(eff != lead) if (k != lead[idx]).any() or walked.size else walked
+            has     = k >= 0
+            ks      = np.where(has, k, 0)
+            earlier = has & (ks < idx)
+            p_lead  = np.where(earlier, p_new[ks], p0[ks])
+            v_lead  = np.where(earlier, speed[ks], speed0[ks])
+            g, vf = _canon(np.where(has, p_lead - p0[idx], np.inf), np.where(has, v_lead, 0.0))
+            o  = occ[idx]
+            diff = (g != gap[idx]) | (vf != v_front[idx]) | (o != occupied[idx])
+            idx, g, vf, o = idx[diff], g[diff], vf[diff], o[diff]
+            changed[moved_rows] = False
+            if idx.size == 0:
+                moved_rows, left_lane, busy_dirty = idx, False, False
+                continue
+            gap[idx], v_front[idx], occupied[idx] = g, vf, o
+            sub = self._finish(prep, (g, vf, o), rows=idx)
+            moved = np.zeros(idx.size, dtype=bool)
+            for name in _MOVE_FIELDS:
+                moved |= sub[name] != new[name][idx]
+                new[name][idx] = sub[name]
+            out       = new['turned'][idx] | (sub['state'] == DONE) | (sub['state'] == CRASHED)
+            left_lane = bool((out != gone[idx]).any())
+            gone[idx] = out
+            moved_rows = idx[moved]
+            changed[moved_rows] = True
+            p_new[idx] = _progress(sub['x'], sub['y'], self.direction[idx])
+            speed[idx] = np.hypot(sub['vx'], sub['vy'])
+            b = _inside(sub['x'], sub['y']) & (sub['state'] != DONE)
+            busy_dirty = bool((b != busy[idx]).any())
+            busy[idx] = b
+            rounds += 1
+
+    def _overtakes(self, start: dict, new: dict) -> bool:
+        """
+        True daca _sweep() poate gresi liderul: un vehicul ramas pe banda a ajuns in acest tick
+        la sau peste progresul altui vehicul de pe aceeasi directie (depasire), sau doi candidati
+        la lider pornesc de la acelasi progres. Cu following-ul activ (oprire sub
+        FOLLOW_MIN_DIST) nu se intampla; conservator — poate raporta si cazuri inofensive.
+        """
+        d    = self.direction
+        p0   = _progress(start['x'], start['y'], d)
+        cand = ~start['turned'] & (start['state'] != DONE) & (start['state'] != CRASHED)
+        keep = ~new['turned'] & (new['state'] != DONE) & (new['state'] != CRASHED)
+        p1   = _progress(new['x'], new['y'], d)
+        order = np.lexsort((p0, d))
+        ds, ps, cs = d[order], p0[order], cand[order]
+        bounds = np.searchsorted(ds, np.arange(len(DIRECTIONS) + 1))
+        # Doi candidati consecutivi (pe banda, in ordinea progresului) cu acelasi progres
+        c_d, c_p = ds[cs], ps[cs]
+        if ((c_d[1:] == c_d[:-1]) & (c_p[1:] == c_p[:-1])).any():
+            return True
+        mv = np.flatnonzero(cand & keep & (p1 > p0))
+        for k in range(len(DIRECTIONS)):
+            lo, hi = bounds[k], bounds[k + 1]
+            rows = mv[d[mv] == k]
+            if rows.size and lo < hi:
+                lane = ps[lo:hi]
+                inside = np.searchsorted(lane, p1[rows], side='right') - np.searchsorted(lane, p0[rows], side='left')
+                if (inside > 1).any():
+                    return True
+        return False
+
+    def _fixed_point(self, start: dict, prep: dict, new: dict) -> int:
+        """
+        Rezerva pentru _overtakes(): runde complete pana cand ce citeste fiecare vehicul nu se
+        mai schimba (runda k are corecte primele k vehicule din lista). `new` se actualizeaza pe loc.
+        """
+        rounds = 0
+        seen = None
+        for _ in range(len(self) + 1):
+            again, _ = self._neighbours(start, new)
+            if seen is not None and all(np.array_equal(a, b) for a, b in zip(again, seen)):
+                break
+            seen = again
+            new.update(self._finish(prep, seen))
+            rounds += 1
+        return rounds
+
+    def _prepare(self, start: dict, tick: int, lights: Optional[Dict[str, str]]) -> dict:
+        """
+        Partea din Vehicle.update() care nu depinde de vecini — o data pe tick, toate randurile:
+        spawn, semafor (fara V2X), waiting → crossing, virajul si limitele proprii ale factorului
+        (YIELD, linia de stop). Pozitiile / vitezele sunt cele de dinaintea miscarii.
+        """
+        p = {name: a.copy() for name, a in start.items()}
+        x, y, vx, vy = p['x'], p['y'], p['vx'], p['vy']
+        state, clearance = p['state'], p['clearance']
+        live = (state != DONE) & (state != CRASHED)
+
+        inside    = _inside(x, y)
+        dist_stop = _SIGN[self.direction] * self.wait_line - _progress(x, y, self.direction)
+
+        # Neinca spawnate → stau pe loc
+        unspawned = live & (self.spawn_tick > 0) & (tick < self.spawn_tick)
+        vx[unspawned] = 0.0
+        vy[unspawned] = 0.0
+        upd = live & ~unspawned
+
+        # Fara V2X: clearance din culoarea semaforului (doar inainte de linia de stop)
+        no_v2x = upd & ~self.v2x_enabled
+        if no_v2x.any():
+            light_code = np.array([
+                {'green': 1, 'red': 0, 'yellow': 0}.get((lights or {}).get(d, 'green'), -1)
+                for d in DIRECTIONS
+            ], dtype=np.int8)
+            my_light = light_code[self.direction]
+            before   = dist_stop > 0
+            clearance[no_v2x & ~before] = True
+            clearance[no_v2x & before & (my_light == 1)] = True
+            clearance[no_v2x & before & (my_light == 0)] = False
+
+        # waiting + clearance → crossing; waiting fara clearance → sta pe loc
+        state[upd & (state == WAITING) & clearance] = CROSSING
+        hold = upd & (state == WAITING) & ~self.no_stop
+        vx[hold] = 0.0
+        vy[hold] = 0.0
+        p['mov'] = mov = upd & ~hold
+
+        # ── Factor de viteza: partea proprie (_desired_speed_factor) ──
+        p['base_speed'] = base_speed = np.hypot(p['base_vx'], p['base_vy'])
+        zero = self.agent_yield & ~inside
+        # Senzor intersectie (doar cu V2X) — se aplica daca altcineva e in careu
+        p['sensor']  = ~inside & self.v2x_enabled & (dist_stop > 0) & (dist_stop < _SENSOR_DIST)
+        p['f_inter'] = MIN_SPEED_FACTOR + (1.0 - MIN_SPEED_FACTOR) * (dist_stop / _SENSOR_DIST)
+        # Linia de stop (fara clearance si fara no_stop)
+        stop_rule  = ~clearance & ~self.no_stop & (dist_stop > 0)
+        brake_zone = stop_rule & (dist_stop <= BRAKE_ZONE_DIST)
+        f_stop   = MIN_SPEED_FACTOR + (1.0 - MIN_SPEED_FACTOR) * (dist_stop / BRAKE_ZONE_DIST)
+        p['cap']  = np.where(brake_zone, np.minimum(1.0, f_stop), 1.0)
+        p['zero'] = zero | (stop_rule & (dist_stop <= 1.0))
+        p['at_line'] = ~clearance & (dist_stop <= 1.0)
+
+        # ── Viraj in centrul intersectiei ──
+        turn = (mov & (state == CROSSING) & ~p['turned'] & (self.intent != STRAIGHT) &
+                (_progress(x, y, self.direction) >= _CENTER_P[self.direction] - 5))
+        if turn.any():
+            ex  = self.exit_dir[turn]
+            spd = base_speed[turn]
+            p['base_vx'][turn] = _UX[ex] * spd
+            p['base_vy'][turn] = _UY[ex] * spd
+            horiz = _HORIZONTAL[ex]
+            y[turn] = np.where(horiz, _SPAWN_Y[ex], y[turn])
+            x[turn] = np.where(horiz, x[turn], _SPAWN_X[ex])
+            p['turned'][turn] = True
+        return p
+
+    def _finish(self, p: dict, seen: tuple, rows: Optional[np.ndarray] = None) -> dict:
+        """
+        Restul tick-ului, cu ce citeste fiecare vehicul despre vecini (`seen`): following,
+        senzorul de intersectie, aplicarea factorului, miscarea, crossing / done.
+        rows: doar aceste randuri (seen si rezultatul sunt atunci restranse la ele, iar rezultatul
+              are doar campurile _MOVE_FIELDS — restul raman cele din `p`).
+        """
+        if rows is None:
+            new = {name: p[name].copy() for name in _STEP_FIELDS}
+            get = p.__getitem__
+            no_stop, exit_dir = self.no_stop, self.exit_dir
+        else:
+            new = {name: p[name][rows] for name in _MOVE_FIELDS}
+            get = lambda name: p[name][rows]
+            no_stop, exit_dir = self.no_stop[rows], self.exit_dir[rows]
+        x, y, vx, vy = new['x'], new['y'], new['vx'], new['vy']
+        state = new['state']
+        base_vx, base_vy = get('base_vx'), get('base_vy')
+        gap, v_front, occupied = seen
+        mov, base_speed = get('mov'), get('base_speed')
+
+        # ── Factor de viteza: following + senzor, peste limitele proprii ──
+        factor   = get('cap')
+        has_lead = np.isfinite(gap)
+        zero     = get('zero') | (has_lead & (gap <= Vehicle.FOLLOW_MIN_DIST))
+        braking_zone = has_lead & (gap > Vehicle.FOLLOW_MIN_DIST) & (gap <= Vehicle.FOLLOW_BRAKE_DIST)
+        t = (gap - Vehicle.FOLLOW_MIN_DIST) / (Vehicle.FOLLOW_BRAKE_DIST - Vehicle.FOLLOW_MIN_DIST)
+        d_factor = MIN_SPEED_FACTOR + (1.0 - MIN_SPEED_FACTOR) * t
+        factor = np.where(braking_zone, np.minimum(factor, d_factor), factor)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v_factor = np.where(base_speed > 0, v_front / base_speed, 1.0)
+        match = braking_zone & (v_front > 0.1)
+        factor = np.where(match, np.minimum(factor, np.maximum(MIN_SPEED_FACTOR, v_factor)), factor)
+        factor = np.where(get('sensor') & occupied, np.minimum(factor, get('f_inter')), factor)
+        factor[zero] = 0.0
+
+        # ── Aplicare factor ──
+        stopped  = mov & (factor <= 0.0)
+        going    = mov & ~stopped
+        crossing = state == CROSSING
+        vx[stopped] = 0.0
+        vy[stopped] = 0.0
+        halting = stopped & ~crossing & ~no_stop
+        to_wait = halting & get('at_line')
+        state[to_wait] = WAITING
+        state[halting & ~to_wait] = BRAKING
+        state[stopped & ~crossing & no_stop] = MOVING
+        vx[going] = base_vx[going] * factor[going]
+        vy[going] = base_vy[going] * factor[going]
+        state[going & ~crossing] = MOVING
+
+        # ── Update pozitie ──
+        x[mov] += vx[mov]
+        y[mov] += vy[mov]
+
+        # Dupa intersectie → crossing; iesit din canvas → done (retras)
+        p_exit   = _progress(x, y, exit_dir)
+        center_e = _CENTER_P[exit_dir]
+        state[mov & (p_exit > center_e + _PAST_OFFSET)] = CROSSING
+        state[mov & (p_exit > center_e + _OFFSCREEN_OFF)] = DONE
+        return new
+
+
+# ── View-uri Vehicle peste store ───────────────────────────────────────
+
+def _write(store: VehicleArray, field: str, row: int, value) -> None:
+    col = store._lists.get(field)
+    if col is not None:
+        if col[row] == value:
+            return
+        col[row] = value
+    getattr(store, field)[row] = value
+
+
+def _column(field: str, cast):
+    """Atribut Vehicle citit / scris direct in coloana `field` a store-ului."""
+    def get(self):
+        try:
+            return self._store._lists[field][self._row]
+        except KeyError:
+            return self._store.column(field)[self._row]
+
+    def put(self, value):
+        _write(self._store, field, self._row, cast(value))
+    return property(get, put)
+
+
+def _coded(field: str, names: tuple, codes: dict):
+    """Atribut Vehicle text, stocat ca cod (index in `names`)."""
+    def get(self):
+        try:
+            return names[self._store._lists[field][self._row]]
+        except KeyError:
+            return names[self._store.column(field)[self._row]]
+
+    def put(self, value):
+        _write(self._store, field, self._row, codes[value])
+    return property(get, put)
+
+
+class VehicleView(Vehicle):
+    """
+    Vehicle a carui stare traieste intr-un VehicleArray (randul `_row` din `_store`): citirile
+    si scrierile merg direct in vectori, deci step() nu mai copiaza nimic inapoi. to_dict()
+    reconstruieste snapshot-ul si cand step() a mutat randul (VehicleArray.refresh_snapshots).
+    """
+    __slots__ = ('_store', '_row')
+
+    x           = _column('x', float)
+    y           = _column('y', float)
+    vx          = _column('vx', float)
+    vy          = _column('vy', float)
+    _base_vx    = _column('base_vx', float)
+    _base_vy    = _column('base_vy', float)
+    wait_line   = _column('wait_line', float)
+    spawn_tick  = _column('spawn_tick', int)
+    clearance   = _column('clearance', bool)
+    agent_yield = _column('agent_yield', bool)
+    no_stop     = _column('no_stop', bool)
+    v2x_enabled = _column('v2x_enabled', bool)
+    _turned     = _column('turned', bool)
+    state       = _coded('state', STATES, STATE_CODE)
+    direction   = _coded('direction', DIRECTIONS, DIR_CODE)
+    intent      = _coded('intent', INTENTS, INTENT_CODE)
+    _exit_dir   = _coded('exit_dir', DIRECTIONS, DIR_CODE)
+
+    @classmethod
+    def of(cls, store: VehicleArray, row: int, vehicle: Vehicle) -> 'VehicleView':
+        """View pe randul `row`; campurile care nu sunt in store (id, _init, clock, ...) vin din `vehicle`."""
+        view = cls.__new__(cls)
+        for name in _OWN_SLOTS:
+            object.__setattr__(view, name, getattr(vehicle, name))
+        object.__setattr__(view, '_store', store)
+        object.__setattr__(view, '_row', row)
+        return view
+
+    def to_dict(self) -> dict:
+        if self._store.stale_snapshots:
+            self._store.refresh_snapshots()
+        return self._snapshot or Vehicle.to_dict(self)
+
+
+# Sloturile Vehicle care raman in obiect (restul sunt proprietati peste store)
+_OWN_SLOTS = tuple(name for name in Vehicle.__slots__ if not isinstance(getattr(VehicleView, name), property))
@@ -7,37 +7,54 @@ Each scenario module must define:
   NO_SEMAPHORE: bool  — True if the scenario runs without a semaphore
   VEHICLES    : list  — list of vehicle definition dicts
 
-Exported:
+Exported (built on first access — PEP 562 module __getattr__, so importing the
+package does not import any scenario module):
   SCENARIOS             : dict[str, list]  — NAME → VEHICLES
   NO_SEMAPHORE_SCENARIOS: set[str]         — set of scenario names without semaphore
   SCENARIO_DESCRIPTIONS : dict[str, str]   — NAME → DESCRIPTION
+  AEB_DISABLED_SCENARIOS: set[str]         — set of scenario names with AEB disabled
 """
 
 import importlib
 import pkgutil
 from pathlib import Path
 
-SCENARIOS: dict = {}
-NO_SEMAPHORE_SCENARIOS: set = set()
-SCENARIO_DESCRIPTIONS: dict = {}
-AEB_DISABLED_SCENARIOS: set = set()
-
 _package_dir = Path(__file__).parent
+_REGISTRY = ('SCENARIOS', 'NO_SEMAPHORE_SCENARIOS', 'SCENARIO_DESCRIPTIONS', 'AEB_DISABLED_SCENARIOS')
+
+
+def _discover() -> None:
+    scenarios: dict = {}
+    no_semaphore: set = set()
+    descriptions: dict = {}
+    aeb_disabled: set = set()
+    for _module_info in pkgutil.iter_modules([str(_package_dir)]):
+        _name = _module_info.name
+        if _name.startswith('_') or _name in ('scenario_base',):
+            continue
+        try:
+            _mod = importlib.import_module(f'scenarios.{_name}')
+            if hasattr(_mod, 'NAME') and hasattr(_mod, 'VEHICLES'):
+                scenarios[_mod.NAME] = _mod.VEHICLES
+                descriptions[_mod.NAME] = getattr(_mod, 'DESCRIPTION', '')
+                if getattr(_mod, 'NO_SEMAPHORE', False):
+                    no_semaphore.add(_mod.NAME)
+                if getattr(_mod, 'AEB_DISABLED', False):
+                    aeb_disabled.add(_mod.NAME)
+        except Exception as e:
+            import warnings
+            warnings.warn(f'Could not load scenario module "{_name}": {e}')
+    # Set as module globals: later lookups no longer go through __getattr__
+    globals().update(SCENARIOS=scenarios, NO_SEMAPHORE_SCENARIOS=no_semaphore,
+                     SCENARIO_DESCRIPTIONS=descriptions, AEB_DISABLED_SCENARIOS=aeb_disabled)
+
+
+def __getattr__(name: str):
+    if name in _REGISTRY:
+        _discover()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-for _module_info in pkgutil.iter_modules([str(_package_dir)]):
-    _name = _module_info.name
-    if _name.startswith('_') or _name in ('scenario_base',):
-        continue
-    try:
-        _mod = importlib.import_module(f'scenarios.{_name}')
-        if hasattr(_mod, 'NAME') and hasattr(_mod, 'VEHICLES'):
-            SCENARIOS[_mod.NAME] = _mod.VEHICLES
-            SCENARIO_DESCRIPTIONS[_mod.NAME] = getattr(_mod, 'DESCRIPTION', '')
-            if getattr(_mod, 'NO_SEMAPHORE', False):
-                NO_SEMAPHORE_SCENARIOS.add(_mod.NAME)
-            if getattr(_mod, 'AEB_DISABLED', False):
-                AEB_DISABLED_SCENARIOS.add(_mod.NAME)
-    except Exception as e:
-        import warnings
-        warnings.warn(f'Could not load scenario module "{_name}": {e}')
 
+def __dir__():
+    return sorted(list(globals()) + list(_REGISTRY))
@@ -6,8 +6,8 @@ Reguli prioritate (Codul Rutier Romania):
   3. Regula dreptei — vehiculul din dreapta are prioritate
   4. Viraj stanga cedeaza vehiculelor din fata si din dreapta
 """
-import time
 from services import v2x_bus as _bus
+from utils import clock as sim_clock
 from utils import logger
 
 # Directia care vine din dreapta fata de fiecare directie
@@ -24,14 +24,17 @@ RIGHT_OF = {
 SAME_ROAD = {frozenset({'N', 'S'}), frozenset({'E', 'V'})}
 
 
-def _get_semaphore_lights() -> dict:
+def _get_semaphore_lights(bus=_bus) -> dict:
     """Citeste starea semaforului din V2X Bus. Returneaza dict {directie: culoare}."""
-    infra = _bus.get_all().get("INFRA", {})
+    infra = bus.get("INFRA") or {}
     return infra.get("lights", {})
 
 
 class CentralSystem:
-    def __init__(self):
+    def __init__(self, bus=None, log=None, clock=None):
+        self._bus       = bus if bus is not None else _bus
+        self._logger    = log if log is not None else logger
+        self._clock     = clock if clock is not None else sim_clock.default
         self._decisions = []
         self._crossing  = set()
         self._has_semaphore = True  # set by engine per scenario
@@ -56,9 +59,13 @@ class CentralSystem:
         # Strazi diferite — traiectoriile se intersecteaza in centrul intersectiei
         return True
 
-    def decide(self, vehicles):
-        """Acorda clearance respectand regulile de prioritate si semaforul."""
-        lights = _get_semaphore_lights()
+    def decide(self, vehicles, occupancy=None):
+        """
+        Acorda clearance respectand regulile de prioritate si semaforul.
+        occupancy: OccupancyIndex-ul engine-ului (cine e in cutia intersectiei);
+                   fara el, cutia se recalculeaza din lista de vehicule.
+        """
+        lights = _get_semaphore_lights(self._bus)
 
         for v in vehicles:
             if not v.v2x_enabled and v.state not in ('done',):
@@ -67,7 +74,10 @@ class CentralSystem:
         waiting  = [v for v in vehicles if v.state == 'waiting' and v.v2x_enabled]
         # Doar vehiculele crossing care sunt INCA in cutia intersectiei blocheaza altii
         # Odata ce au iesit fizic din intersectie, nu mai blocheaza clearance-ul
-        crossing = [v for v in vehicles if v.state == 'crossing' and v._is_inside_intersection()]
+        if occupancy is not None:
+            crossing = occupancy.inside(state='crossing')
+        else:
+            crossing = [v for v in vehicles if v.state == 'crossing' and v._is_inside_intersection()]
         self._crossing = {v.id for v in crossing}
 
         if not waiting:
@@ -92,7 +102,7 @@ class CentralSystem:
             # Vehiculele moving/no_stop nu se opresc si nu au nevoie de clearance
             waiting_at_line = [v for v in vehicles if v.v2x_enabled
                                and v.state == 'waiting']
-            self._decide_by_ttc(waiting_at_line, crossing)
+            self._decide_by_ttc(waiting_at_line, crossing, occupancy)
             return
 
         # ── Cu semafor: logica normala ───────────────────────────────────
@@ -110,7 +120,7 @@ class CentralSystem:
         if not eligible:
             return
 
-        can_go = [v for v in eligible if not any(self._paths_conflict(v, c) for c in crossing)]
+        can_go = [v for v in eligible if not self._blocked_by_crossing(v, crossing, occupancy)]
         if not can_go:
             return
 
@@ -157,7 +167,13 @@ class CentralSystem:
 
 
 
-    def _decide_by_ttc(self, waiting, crossing):
+    def _blocked_by_crossing(self, v, crossing, occupancy=None) -> bool:
+        """Un vehicul aflat in traversare (in cutie) are traiectorie in conflict cu `v`."""
+        if occupancy is not None:
+            return occupancy.conflicts_with(v, state='crossing')
+        return any(self._paths_conflict(v, c) for c in crossing)
+
+    def _decide_by_ttc(self, waiting, crossing, occupancy=None):
         """
         Fara semafor — prioritate prin regula dreptei + TTC.
         Reguli aplicate in ordine:
@@ -226,7 +242,7 @@ class CentralSystem:
 
         # Filtreaza can_go: nu acorda clearance daca cineva din crossing conflictueaza
         can_go = [v for v in can_go
-                  if not any(self._paths_conflict(v, c) for c in crossing)]
+                  if not self._blocked_by_crossing(v, crossing, occupancy)]
 
         # Chiar din can_go, trebuie sa treaca doar UNUL (cel mai rapid / cel ales), 
         # si ceilalti doar daca au traiectorii paralele neconflictuale cu el.
@@ -336,7 +352,7 @@ class CentralSystem:
 
     def _log(self, vehicle_id, action, reason=''):
         entry = {
-            'time':   time.strftime('%H:%M:%S'),
+            'time':   self._clock.strftime(),
             'agent':  vehicle_id,
             'action': action,
             'reason': reason,
@@ -344,7 +360,7 @@ class CentralSystem:
         }
         self._decisions.append(entry)
         # Scrie si in buffer-ul logger — vizibil in EventLog frontend
-        logger.log_decision(vehicle_id, action, 0.0, reason)
+        self._logger.log_decision(vehicle_id, action, 0.0, reason)
 
     def reset(self):
         self._decisions = []
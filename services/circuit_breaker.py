@@ -0,0 +1,124 @@
+"""
+services/circuit_breaker.py — Circuit breaker pentru disponibilitatea Ollama
+Stari:
+  closed    — Ollama raspunde; cererile pleaca normal. FAILURE_THRESHOLD esecuri
+              consecutive (cereri sau ping-uri) → open
+  open      — Ollama considerat cazut; apelantii folosesc fallback-ul. Dupa `backoff`
+              secunde urmeaza o sonda → half_open
+  half_open — sonda in curs: reusita → closed (backoff resetat), esec → open cu
+              backoff dublat (pana la BACKOFF_MAX)
+
+Tick-ul doar citeste `available`; tranzitiile le fac clientul (rezultatul cererilor)
+si sonda de fundal (services/ollama.OllamaClient.start_probe). Timpul e cel monoton
+al procesului — sanatatea serviciului nu tine de ceasul simularii.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+CLOSED    = 'closed'
+OPEN      = 'open'
+HALF_OPEN = 'half_open'
+
+FAILURE_THRESHOLD = 3
+BACKOFF_BASE      = 1.0    # s — prima pauza dupa deschidere
+BACKOFF_MAX       = 30.0   # s
+PROBE_INTERVAL    = 5.0    # s — ping periodic cat timp e closed
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, backoff_base: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX, probe_interval: float = PROBE_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic,
+                 on_change: Optional[Callable[[str, str], None]] = None, state: str = CLOSED):
+        """
+        on_change(vechi, nou): apelat la fiecare schimbare de stare (log).
+        state=OPEN: serviciu necunoscut la pornire — prima sonda e scadenta imediat.
+        """
+        self.failure_threshold = failure_threshold
+        self.backoff_base      = backoff_base
+        self.backoff_max       = backoff_max
+        self.probe_interval    = probe_interval
+        self.on_change         = on_change
+        self._clock            = clock
+        self._lock             = threading.Lock()
+        self.state             = state
+        self.failures          = 0       # esecuri consecutive
+        self.backoff           = backoff_base
+        self.opens             = 0       # de cate ori s-a deschis
+        self.probes            = 0
+        self.probe_failures    = 0
+        self._changed_at       = clock()
+        self._next_probe_at    = clock()
+
+    @property
+    def available(self) -> bool:
+        return self.state == CLOSED
+
+    def _set(self, state: str) -> None:
+        prev, self.state = self.state, state
+        self._changed_at = self._clock()
+        if prev != state and self.on_change is not None:
+            self.on_change(prev, state)
+
+    def _open(self) -> None:
+        now = self._clock()
+        if self.state == HALF_OPEN:
+            self.backoff = min(self.backoff * 2, self.backoff_max)
+        else:
+            self.backoff = self.backoff_base
+            self.opens  += 1
+        self._next_probe_at = now + self.backoff
+        self._set(OPEN)
+
+    # ── Rezultatele cererilor / sondelor ────────────────────────────────
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self.backoff        = self.backoff_base
+                self._next_probe_at = self._clock() + self.probe_interval
+                self._set(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self._open()
+
+    # ── Sonda ─────────────────────────────────────────────────────────
+
+    def probe_in(self) -> float:
+        """Secunde pana la urmatoarea sonda (<= 0 = acum)."""
+        return self._next_probe_at - self._clock()
+
+    def begin_probe(self) -> None:
+        with self._lock:
+            self.probes += 1
+            if self.state == OPEN:
+                self._set(HALF_OPEN)
+
+    def end_probe(self, ok: bool) -> None:
+        if ok:
+            self.record_success()
+        else:
+            with self._lock:
+                self.probe_failures += 1
+            self.record_failure()
+        with self._lock:
+            if self.state == CLOSED:
+                self._next_probe_at = self._clock() + self.probe_interval
+
+    def stats(self) -> dict:
+        now = self._clock()
+        return {
+            'state':            self.state,
+            'failures':         self.failures,
+            'opens':            self.opens,
+            'backoff_s':        self.backoff,
+            'probes':           self.probes,
+            'probe_failures':   self.probe_failures,
+            'in_state_s':       round(now - self._changed_at, 3),
+            'next_probe_in_s':  round(max(self._next_probe_at - now, 0.0), 3),
+        }
@@ -7,6 +7,7 @@ Regula prioritatii: vehiculul din dreapta are prioritate.
 """
 import math
 from typing import Dict
+import numpy as np
 INTERSECTION = (400, 400)   # centrul intersectiei in pixeli
 TTC_BRAKE = 3.0             # secunde → frana
 TTC_YIELD = 1.5             # secunde → stop complet
@@ -27,45 +28,158 @@ def is_right_of(v1: dict, v2: dict) -> bool:
     d2 = norm(v2)
     cross = d1[0] * d2[1] - d1[1] * d2[0]
     return cross > 0
-def assess_risk(vehicles: Dict[str, dict]) -> dict:
+_NO_PAIRS = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp))
+class PairwiseRisk:
     """
-    Evalueaza riscul pentru toate perechile.
+    Kernel vectorizat pentru evaluarea riscului pe perechi.
+    Distanta fata de intersectie, viteza si TTC se calculeaza o singura data per
+    tick (NumPy); assess_risk() si zonele de risc din engine deriva din aceleasi
+    vectori in loc sa refaca fiecare dubla bucla Python.
+    """
+    def __init__(self, vehicles: Dict[str, dict]):
+        self.vehicles = vehicles
+        self.ids = list(vehicles.keys())
+        data = list(vehicles.values())
+        # O singura conversie Python → NumPy: coloanele x, y, vx, vy
+        cols = np.array([(v.get("x", 0), v.get("y", 0), v.get("vx", 0), v.get("vy", 0)) for v in data],
+                        dtype=float).reshape(-1, 4)
+        self.x, self.y = cols[:, 0], cols[:, 1]
+        dx = INTERSECTION[0] - self.x
+        dy = INTERSECTION[1] - self.y
+        self.dist  = np.sqrt(dx * dx + dy * dy)
+        self.speed = np.sqrt(cols[:, 2] ** 2 + cols[:, 3] ** 2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = self.dist / self.speed
+        self.ttc = np.where(self.speed > 0, ratio, 999.0)            # = time_to_intersection
+        self.ttc_display = np.where(self.speed > 0.1, ratio, 999.0)  # prag de afisaj (zone)
+        self.emergency = np.array([v.get("priority") == "emergency" for v in data], dtype=bool)
+        self.active = np.array([v.get("state") not in ("done", None) for v in data], dtype=bool)
+    def __len__(self) -> int:
+        return len(self.ids)
+    def pairs(self, mask) -> tuple:
+        """Indicii (i, j), i < j, ai perechilor dintre vehiculele din `mask`, in ordinea buclei i/j."""
+        idx = np.flatnonzero(mask)
+        if len(idx) < 2:
+            return _NO_PAIRS
+        ii, jj = np.triu_indices(len(idx), 1)
+        return idx[ii], idx[jj]
+    def assess(self) -> dict:
+        result = {
+            "risk": False,
+            "ttc": 999.0,
+            "action": "go",
+            "pair": None,
+            "ttc_per_vehicle": dict(zip(self.ids, self.ttc.tolist())),
+        }
+        # Doar perechile cu ambele TTC < TTC_BRAKE sunt la risc → raportam cea mai grava
+        i, j = self.pairs(self.ttc < TTC_BRAKE)
+        if len(i) == 0:
+            return result
+        pair_ttc = np.minimum(self.ttc[i], self.ttc[j])
+        k = int(np.argmin(pair_ttc))
+        min_ttc = float(pair_ttc[k])
+        a, b = int(i[k]), int(j[k])
+        result["risk"] = True
+        result["ttc"] = round(min_ttc, 3)
+        result["pair"] = (self.ids[a], self.ids[b])
+        if self.emergency[a] or self.emergency[b]:
+            result["action"] = "yield"
+        elif min_ttc < TTC_YIELD:
+            result["action"] = "yield"
+        else:
+            result["action"] = "brake"
+        return result
+def assess_risk(vehicles: Dict[str, dict], risk: PairwiseRisk = None) -> dict:
+    """
+    Evalueaza riscul pentru toate perechile si raporteaza perechea cea mai grava (TTC minim).
     Returneaza: { risk, ttc, action, pair, ttc_per_vehicle }
+    `risk` — kernel deja calculat pentru acelasi tick (evita recalcularea).
+    """
+    if risk is None:
+        risk = PairwiseRisk(vehicles)
+    return risk.assess()
+class SpatialHash:
+    """
+    Grila uniforma pentru broad-phase la coliziuni fizice.
+    Celula >= COLLISION_DIST → doua vehicule in coliziune sunt mereu in celule vecine,
+    deci narrow-phase verifica doar cele 9 celule din jur, nu toate perechile.
+    Pozitiile se actualizeaza incremental: un vehicul se muta intre celule doar
+    cand trece granita unei celule.
     """
-    ids = list(vehicles.keys())
-    ttc_map = {vid: time_to_intersection(vehicles[vid]) for vid in ids}
-    result = {
-        "risk": False,
-        "ttc": 999.0,
-        "action": "go",
-        "pair": None,
-        "ttc_per_vehicle": ttc_map,
-    }
-    for i in range(len(ids)):
-        for j in range(i + 1, len(ids)):
-            id1, id2 = ids[i], ids[j]
-            v1, v2 = vehicles[id1], vehicles[id2]
-            t1, t2 = ttc_map[id1], ttc_map[id2]
-            if t1 < TTC_BRAKE and t2 < TTC_BRAKE:
-                min_ttc = min(t1, t2)
-                result["risk"] = True
-                result["ttc"] = round(min_ttc, 3)
-                result["pair"] = (id1, id2)
-                if v1.get("priority") == "emergency" or v2.get("priority") == "emergency":
-                    result["action"] = "yield"
-                elif min_ttc < TTC_YIELD:
-                    result["action"] = "yield"
-                else:
-                    result["action"] = "brake"
-    return result
+    def __init__(self, cell_size: float = COLLISION_DIST):
+        if cell_size < COLLISION_DIST:
+            raise ValueError(f"cell_size ({cell_size}) trebuie sa fie >= COLLISION_DIST ({COLLISION_DIST})")
+        self.cell_size = float(cell_size)
+        self._cells: Dict[tuple, set] = {}
+        self._cell_of: Dict[str, tuple] = {}
+        self._pos: Dict[str, tuple] = {}
+        self._order: Dict[str, int] = {}   # ordinea de inserare — perechi deterministe
+        self._seq = 0
+    def __len__(self) -> int:
+        return len(self._pos)
+    def __contains__(self, vid: str) -> bool:
+        return vid in self._pos
+    def update(self, vid: str, x: float, y: float) -> None:
+        """Insereaza sau muta vehiculul la pozitia (x, y)."""
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        old = self._cell_of.get(vid)
+        if old != cell:
+            if old is not None:
+                bucket = self._cells[old]
+                bucket.discard(vid)
+                if not bucket:
+                    del self._cells[old]
+            else:
+                self._order[vid] = self._seq
+                self._seq += 1
+            self._cells.setdefault(cell, set()).add(vid)
+            self._cell_of[vid] = cell
+        self._pos[vid] = (x, y)
+    def remove(self, vid: str) -> None:
+        cell = self._cell_of.pop(vid, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        bucket.discard(vid)
+        if not bucket:
+            del self._cells[cell]
+        del self._pos[vid]
+        del self._order[vid]
+    def clear(self) -> None:
+        self._cells.clear()
+        self._cell_of.clear()
+        self._pos.clear()
+        self._order.clear()
+        self._seq = 0
+    def collisions(self, dist: float = COLLISION_DIST) -> list:
+        """Perechi (id1, id2) la distanta < dist, in ordinea de inserare."""
+        if dist > self.cell_size:
+            raise ValueError("dist nu poate depasi cell_size")
+        d2 = dist * dist
+        order = self._order
+        pairs = []
+        cells = self._cells
+        for (cx, cy), bucket in cells.items():
+            for vid in bucket:
+                x1, y1 = self._pos[vid]
+                o1 = order[vid]
+                for nx in (cx - 1, cx, cx + 1):
+                    for ny in (cy - 1, cy, cy + 1):
+                        other_bucket = cells.get((nx, ny))
+                        if not other_bucket:
+                            continue
+                        for oid in other_bucket:
+                            o2 = order[oid]
+                            if o2 <= o1:
+                                continue   # fiecare pereche o singura data
+                            x2, y2 = self._pos[oid]
+                            if (x1 - x2) ** 2 + (y1 - y2) ** 2 < d2:
+                                pairs.append((o1, o2, vid, oid))
+        pairs.sort()
+        return [(a, b) for _, _, a, b in pairs]
 def check_physical_collision(vehicles: Dict[str, dict]) -> list:
     """Detecteaza coliziuni fizice (distanta < COLLISION_DIST). Returneaza perechi."""
-    ids = list(vehicles.keys())
-    collisions = []
-    for i in range(len(ids)):
-        for j in range(i + 1, len(ids)):
-            v1, v2 = vehicles[ids[i]], vehicles[ids[j]]
-            dist = math.sqrt((v1["x"] - v2["x"]) ** 2 + (v1["y"] - v2["y"]) ** 2)
-            if dist < COLLISION_DIST:
-                collisions.append((ids[i], ids[j]))
-    return collisions
+    grid = SpatialHash()
+    for vid, v in vehicles.items():
+        grid.update(vid, v["x"], v["y"])
+    return grid.collisions()
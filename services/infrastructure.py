@@ -6,8 +6,8 @@ Semafoare per directie:
   Intre faze: yellow pentru directia care tocmai a avut verde
 """
 import math
-import time as _time
 from services import v2x_bus as _bus
+from utils import clock as sim_clock
 from utils import logger
 
 GREEN_TICKS  = 150   # 5s la 30 FPS
@@ -49,7 +49,10 @@ def light_for_direction(phase: str, direction: str) -> str:
 
 
 class InfrastructureAgent:
-    def __init__(self, intersection_x=400, intersection_y=400):
+    def __init__(self, intersection_x=400, intersection_y=400, bus=None, log=None, clock=None):
+        self._bus             = bus if bus is not None else _bus
+        self._logger          = log if log is not None else logger
+        self._clock           = clock if clock is not None else sim_clock.default
         self.intersection_x   = intersection_x
         self.intersection_y   = intersection_y
         self.timer            = 0
@@ -92,7 +95,7 @@ class InfrastructureAgent:
     # ------------------------------------------------------------------
     def update(self) -> dict:
         vehicles = {
-            k: v for k, v in _bus.get_all().items()
+            k: v for k, v in self._bus.get_all().items()
             if k != "INFRA" and isinstance(v, dict) and "x" in v
         }
 
@@ -112,11 +115,11 @@ class InfrastructureAgent:
                 "green_for":         list("NSEV"),
                 "red_for":           [],
             }
-            _bus.publish("INFRA", {
+            self._bus.publish("INFRA", {
                 "id": "INFRA", **state,
                 "x": self.intersection_x, "y": self.intersection_y,
                 "vx": 0, "vy": 0, "state": "normal",
-                "priority": "infrastructure", "timestamp": _time.time(),
+                "priority": "infrastructure", "timestamp": self._clock.time(),
             })
             return state
 
@@ -150,7 +153,7 @@ class InfrastructureAgent:
             "green_for":             green_for,
             "red_for":               red_for,
         }
-        _bus.publish("INFRA", {
+        self._bus.publish("INFRA", {
             "id": "INFRA",
             **state,
             "x": self.intersection_x,
@@ -158,7 +161,7 @@ class InfrastructureAgent:
             "vx": 0, "vy": 0,
             "state": "normal",
             "priority": "infrastructure",
-            "timestamp": _time.time(),
+            "timestamp": self._clock.time(),
         })
         return state
 
@@ -193,13 +196,13 @@ class InfrastructureAgent:
             if light == "red":
                 recs[vid] = {"type": "stop", "advisory_speed": 0.0, "reason": "semafor rosu"}
                 if self._last_v2i_rec.get(vid) != "stop":
-                    logger.log_v2i(vid, "stop", "semafor rosu - opreste")
+                    self._logger.log_v2i(vid, "stop", "semafor rosu - opreste")
                     self._last_v2i_rec[vid] = "stop"
             elif light == "yellow":
                 recs[vid] = {"type": "reduce_speed", "advisory_speed": ADVISORY_CAUTION,
                              "reason": "semafor galben"}
                 if self._last_v2i_rec.get(vid) != "yellow":
-                    logger.log_v2i(vid, "reduce_speed", "semafor galben", ADVISORY_CAUTION)
+                    self._logger.log_v2i(vid, "reduce_speed", "semafor galben", ADVISORY_CAUTION)
                     self._last_v2i_rec[vid] = "yellow"
             else:
                 speed = math.sqrt(v.get("vx", 0)**2 + v.get("vy", 0)**2)
@@ -207,7 +210,7 @@ class InfrastructureAgent:
                     recs[vid] = {"type": "reduce_speed", "advisory_speed": ADVISORY_APPROACH,
                                  "reason": "viteza prea mare la intersectie"}
                     if self._last_v2i_rec.get(vid) != "zone":
-                        logger.log_v2i(vid, "reduce_speed", "viteza prea mare", ADVISORY_APPROACH)
+                        self._logger.log_v2i(vid, "reduce_speed", "viteza prea mare", ADVISORY_APPROACH)
                         self._last_v2i_rec[vid] = "zone"
                 else:
                     recs[vid] = {"type": "proceed", "advisory_speed": None, "reason": "verde OK"}
@@ -1,43 +1,111 @@
-import requests
+import hashlib
 import json
 import logging
-import time as _time
-from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
 from typing import Optional
+
 from services.collision import TTC_BRAKE
+from services.circuit_breaker import CLOSED, HALF_OPEN
+from services.ollama import DeadlineExceeded, OllamaClient
+from services.situation_cache import SituationCache, situation_key
+from utils import clock as sim_clock
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("llm_client")
 
-OLLAMA_URL  = "http://localhost:11434/api/generate"
-OLLAMA_PING = "http://localhost:11434/api/tags"
 MODEL_NAME  = "llama3.2:1b"
+CACHE_PATH  = Path(__file__).parent.parent / "llm_situations.json"   # cache-ul de situatii al serverului
 
-executor = ThreadPoolExecutor(max_workers=4)
+# Client asincron cu pool keep-alive, limita de concurenta si termen per cerere
+client = OllamaClient()
 
 # ── Cache decizii LLM per vehicul (async) ─────────────────────────────
-# Structura: { vid: {"action": str, "reason": str, "ts": float} }
+# Structura: { (scope, vid): {"action": str, "reason": str, "ts": float} }
+# scope = id-ul sesiunii — vehicule cu acelasi id din sesiuni diferite nu impart cache-ul
 _llm_cache: dict = {}
-_pending:   dict = {}   # { vid: Future }
-_CACHE_TTL  = 1.8       # secunde — reutilizeaza decizia LLM pana la urmatorul raspuns
+_pending:   dict = {}   # { (scope, vid): Task / Future } — cererea in zbor
+_queued:    dict = {}   # { scope: {vid: context} } — cereri adunate in tick-ul curent, trimise de flush()
+_CACHE_TTL  = 1.8       # secunde de simulare — reutilizeaza decizia LLM pana la urmatorul raspuns
 
 # ── Disponibilitate Ollama ─────────────────────────────────────────────
-_ollama_available: bool = False
-_call_count = 0
-_RECHECK_INTERVAL = 30   # re-verifica disponibilitatea la fiecare 30 tick-uri
+# client.breaker (services/circuit_breaker.py) — tick-ul doar citeste starea; ping-urile
+# le face sonda de pe loop-ul de fundal, pornita la prima decizie LLM ceruta
+_llm_enabled: bool = True   # False = doar fallback determinist (rulari headless reproductibile)
+_batch_mode:  bool = True   # True = un prompt per set de conflict (flush), False = un prompt per vehicul
+_batches          = 0       # cereri batch trimise
+_batched_vehicles = 0       # vehicule rezolvate prin cereri batch
+
+def is_available() -> bool:
+    return client.breaker.available
+
+
+_announced: Optional[bool] = None   # ultima disponibilitate anuntata in log (None = inca nimic)
+
+
+def _on_breaker_change(prev: str, state: str) -> None:
+    global _announced
+    up = state == CLOSED
+    if state == HALF_OPEN or up == _announced:
+        logger.debug(f"Ollama breaker: {prev} → {state} (backoff {client.breaker.backoff:.0f}s)")
+        return
+    if not up:
+        logger.warning("Ollama indisponibil — se foloseste logica determinista.")
+    elif _announced is None:
+        logger.info(f"Ollama disponibil — decizii AI activate ({MODEL_NAME}).")
+    else:
+        logger.info("Ollama a revenit online — decizii LLM reactivate.")
+    _announced = up
+
+
+def set_enabled(enabled: bool) -> bool:
+    """
+    Activeaza/dezactiveaza deciziile LLM. Cand e dezactivat, request_llm_decision()
+    raspunde direct cu fallback-ul determinist, fara cereri catre Ollama.
+    Returneaza valoarea anterioara.
+    """
+    global _llm_enabled
+    prev = _llm_enabled
+    _llm_enabled = enabled
+    return prev
+
+
+def configure(max_in_flight: Optional[int] = None, deadline: Optional[float] = None,
+              batch: Optional[bool] = None, cache_capacity: Optional[int] = None,
+              cache_path=None) -> None:
+    """
+    Limita de cereri simultane catre Ollama, termenul (s) unei cereri, modul batch
+    (un prompt per set de vehicule in conflict in loc de unul per vehicul) si
+    cache-ul de situatii (capacitate LRU, fisierul folosit de load_cache / save_cache).
+    """
+    global _batch_mode
+    client.configure(max_in_flight=max_in_flight, deadline=deadline)
+    if batch is not None:
+        _batch_mode = batch
+    situations.configure(capacity=cache_capacity, path=cache_path)
+
+
+def load_cache(path=None) -> int:
+    """Incarcare la pornire a cache-ului de situatii (warm start). Returneaza numarul de intrari."""
+    if path is not None:
+        situations.configure(path=path)
+    n = situations.load()
+    if n:
+        logger.info(f"Cache situatii LLM: {n} decizii incarcate din {situations.path}")
+    return n
 
-def _check_ollama() -> bool:
-    try:
-        r = requests.get(OLLAMA_PING, timeout=2.0)
-        return r.status_code == 200
-    except Exception:
-        return False
 
-_ollama_available = _check_ollama()
-if _ollama_available:
-    logger.info(f"Ollama disponibil — decizii AI activate ({MODEL_NAME}).")
-else:
-    logger.warning("Ollama indisponibil — se foloseste logica determinista.")
+def save_cache() -> int:
+    return situations.save()
+
+
+def stats() -> dict:
+    return {**client.stats(), 'batch': _batch_mode, 'batches': _batches,
+            'batched_vehicles': _batched_vehicles, 'situations': situations.stats()}
+
+
+# Fara ping la import: breaker-ul porneste deschis, iar prima sonda (pornita la prima
+# decizie LLM ceruta) stabileste disponibilitatea
+client.breaker.on_change = _on_breaker_change
 
 
 def _repair_json(raw: str) -> str:
@@ -99,14 +167,57 @@ SINGLE_SYSTEM = (
     'Respond ONLY with JSON: {"action": "GO"|"YIELD"|"BRAKE", "reason": "scurt motiv in romana (max 8 cuvinte)"}\n'
 )
 
+# Prompt batch — toate vehiculele in conflict la o intersectie, o singura inferenta
+BATCH_SYSTEM = (
+    'You coordinate autonomous V2X agents approaching the same intersection. Each vehicle below '
+    'perceives the others through V2X radio messages and remembers its own recent decisions.\n'
+    'Decide for ALL of them at once so the decisions are consistent: at most one vehicle of each '
+    'conflicting pair should GO, the others YIELD or BRAKE.\n\n'
+    'Guidelines (not strict rules — use judgment):\n'
+    '  - Emergency vehicles (ambulance, fire truck) should always be given priority\n'
+    '  - Vehicles arriving much sooner (lower TTC) generally have practical priority\n'
+    '  - Avoid oscillating: a vehicle that just yielded should not switch to GO unless the situation changed\n'
+    '  - Vehicles on the same road going opposite directions use separate lanes — no conflict\n\n'
+    'Respond ONLY with JSON: {"decisions": [{"id": "<vehicle id>", "action": "GO"|"YIELD"|"BRAKE", '
+    '"reason": "scurt motiv in romana (max 8 cuvinte)"}, ...]} — one entry per vehicle.\n'
+)
+
+# Cache pe situatie (services/situation_cache.py) — tag-ul invalideaza fisierele salvate
+# cand se schimba modelul sau prompturile
+situations = SituationCache(
+    tag=f"{MODEL_NAME}:{hashlib.sha256((SINGLE_SYSTEM + BATCH_SYSTEM).encode()).hexdigest()[:12]}")
 
-def _get_single_decision(v: dict) -> tuple:
+
+async def _get_single_decision(v: dict) -> dict:
     """
-    Apeleaza Ollama sincron pentru un singur vehicul.
-    Returneaza (vid, {action, reason}) sau (vid, None) la eroare.
-    Ruleaza in thread-pool — nu blocheaza simularea.
+    Cere decizia Ollama pentru un singur vehicul (client asincron, vezi services/ollama.py).
+    Returneaza {vid: {action, reason}} sau {} la eroare / termen depasit — aceeasi forma
+    ca _get_batch_decision(), deci request_llm_decision() citeste ambele cu .get(vid).
     """
-    global _ollama_available
+    vid    = v["id"]
+    prompt = f"{SINGLE_SYSTEM}\n{_describe_vehicle(v)}Decision (JSON only):"
+    payload = {
+        "model":   MODEL_NAME,
+        "prompt":  prompt,
+        "stream":  False,
+        "format":  "json",
+        "options": {"temperature": 0.0, "num_predict": 60},
+    }
+    try:
+        data   = await client.generate(payload)
+        raw    = data.get("response", "{}")
+        parsed = json.loads(_repair_json(raw))
+        result = _normalize(parsed)
+        situations.put(situation_key(v), result)
+        logger.info(f"[LLM] {vid}: {result['action']} — {result['reason']}")
+        return {vid: result}
+    except Exception as e:
+        _report_error(e, vid)
+    return {}
+
+
+def _describe_vehicle(v: dict) -> str:
+    """Blocul de prompt al unui vehicul: starea proprie, vecinii in conflict, memoria recenta."""
     vid     = v["id"]
     ms      = v.get("my_state", {})
     others  = v.get("others", [])
@@ -126,9 +237,8 @@ def _get_single_decision(v: dict) -> tuple:
             for m in mem_entries
         ) + ".\n"
 
-    prompt = (
-        f"{SINGLE_SYSTEM}"
-        f"\nVehicle {vid}:\n"
+    return (
+        f"Vehicle {vid}:\n"
         f"  - TTC to intersection: {ms.get('ttc', 999):.1f}s\n"
         f"  - Priority: {ms.get('priority', 'normal')}\n"
         f"  - Direction: {ms.get('direction', '?')}, Intent: {ms.get('intent', 'straight')}\n"
@@ -136,84 +246,164 @@ def _get_single_decision(v: dict) -> tuple:
         f"  - Distance to intersection: {ms.get('dist_to_intersection', 999):.0f}px\n"
         f"Conflicting vehicles nearby: [{others_summary}].\n"
         f"{memory_summary}"
-        f"Decision (JSON only):"
+    )
+
+
+def _normalize(parsed: dict) -> dict:
+    action = str(parsed.get("action", "GO")).upper().strip()
+    reason = str(parsed.get("reason", "decizie AI")).strip()
+    if action not in ("GO", "YIELD", "BRAKE"):
+        action = "GO"
+    return {"action": action, "reason": reason}
+
+
+def _report_error(e: Exception, label: str) -> None:
+    # Breaker-ul a primit deja esecul de la client.generate(); aici doar log
+    import httpx
+    if isinstance(e, httpx.TransportError):
+        logger.warning(f"Ollama conexiune esuata pentru {label}")
+    elif isinstance(e, DeadlineExceeded):
+        # Raspuns prea tarziu ca sa mai fie util — Ollama ramane activ
+        logger.warning(f"Ollama termen depasit pentru {label}: {e}")
+    else:
+        logger.warning(f"Ollama parse eroare pentru {label}: {e}")
+
+
+def _parse_batch(raw: str, ids: list) -> dict:
+    """
+    Extrage {vid: {action, reason}} din raspunsul batch. Accepta lista simpla sau
+    {"decisions": [...]}; daca JSON-ul e trunchiat (num_predict), pastreaza obiectele
+    complete gasite pana la taietura. Vehiculele lipsa din raspuns nu apar in rezultat.
+    """
+    try:
+        parsed = json.loads(raw)
+        items  = parsed if isinstance(parsed, list) else parsed.get("decisions", [parsed])
+    except ValueError:
+        decoder, items, i = json.JSONDecoder(), [], raw.find('{', 1)
+        while i != -1:
+            try:
+                obj, end = decoder.raw_decode(raw, i)
+            except ValueError:
+                i = raw.find('{', i + 1)
+                continue
+            if isinstance(obj, dict):
+                items.append(obj)
+            i = raw.find('{', end)
+    wanted = set(ids)
+    return {str(it["id"]): _normalize(it) for it in items
+            if isinstance(it, dict) and str(it.get("id")) in wanted}
+
+
+async def _get_batch_decision(vehicles: list) -> dict:
+    """
+    Un singur prompt pentru un set de vehicule in conflict: LLM-ul vede toate vehiculele
+    deodata si raspunde cu cate o actiune per vehicul (decizii consistente intre ele,
+    un singur drum dus-intors). Returneaza {vid: {action, reason}} pentru vehiculele
+    prezente in raspuns; {} la eroare / termen depasit.
+    """
+    global _batches, _batched_vehicles
+    ids    = [v["id"] for v in vehicles]
+    prompt = (
+        f"{BATCH_SYSTEM}\n"
+        + "\n".join(_describe_vehicle(v) for v in vehicles)
+        + f"\nDecisions for {', '.join(ids)} (JSON only):"
     )
     payload = {
         "model":   MODEL_NAME,
         "prompt":  prompt,
         "stream":  False,
         "format":  "json",
-        "options": {"temperature": 0.0, "num_predict": 60},
+        "options": {"temperature": 0.0, "num_predict": 20 + 45 * len(ids)},
     }
+    label = "+".join(ids)
     try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=8.0)
-        if response.status_code == 200:
-            raw      = response.json().get("response", "{}")
-            repaired = _repair_json(raw)
-            data     = json.loads(repaired)
-            action   = data.get("action", "GO").upper().strip()
-            reason   = data.get("reason", "decizie AI").strip()
-            if action not in ("GO", "YIELD", "BRAKE"):
-                action = "GO"
-            logger.info(f"[LLM] {vid}: {action} — {reason}")
-            return vid, {"action": action, "reason": reason}
-    except requests.exceptions.ConnectionError:
-        _ollama_available = False
-        logger.warning(f"Ollama conexiune esuata pentru {vid}")
-    except requests.exceptions.Timeout:
-        _ollama_available = False
-        logger.warning(f"Ollama timeout pentru {vid}")
+        data   = await client.generate(payload)
+        result = _parse_batch(data.get("response", "{}").strip(), ids)
+        _remember_batch(vehicles, result)
+        _batches          += 1
+        _batched_vehicles += len(result)
+        logger.info(f"[LLM] batch {label}: { {k: r['action'] for k, r in result.items()} }")
+        return result
     except Exception as e:
-        logger.warning(f"Ollama parse eroare pentru {vid}: {e}")
-    return vid, None
+        _report_error(e, label)
+    return {}
+
+
+def _remember_batch(vehicles: list, result: dict) -> None:
+    """
+    Pune deciziile batch in cache-ul de situatii. Intr-un set simetric mai multi membri
+    au aceeasi cheie, dar LLM-ul i-a coordonat (unul GO, ceilalti YIELD) — o cheie cu
+    actiuni diferite nu descrie o decizie reutilizabila, deci nu se salveaza.
+    """
+    by_key: dict = {}
+    for v in vehicles:
+        if v["id"] in result:
+            by_key.setdefault(situation_key(v), []).append(result[v["id"]])
+    for skey, decisions in by_key.items():
+        if len({d["action"] for d in decisions}) == 1:
+            situations.put(skey, decisions[0])
 
 
-def request_llm_decision(vid: str, context: dict) -> dict:
+def request_llm_decision(vid: str, context: dict, scope: Optional[str] = None,
+                         now: Optional[float] = None) -> dict:
     """
     Interfata PRINCIPALA pentru Agent — returneaza decizia LLM pentru un vehicul.
 
     Functionare async cu cache:
     - Daca exista o decizie recenta in cache (<_CACHE_TTL sec) → o returneaza imediat
-    - Trimite simultan o cerere noua catre Ollama in background (thread-pool)
+    - Daca aceeasi situatie (context cuantizat, vezi services/situation_cache.py) a mai fost
+      decisa de LLM → decizia aceea, fara cerere catre Ollama (chiar daca Ollama e oprit)
+    - Trimite simultan o cerere noua catre Ollama in background (task asyncio, fara sa astepte);
+      in modul batch cererea doar se adauga in coada sesiunii si pleaca la flush(scope),
+      impreuna cu celelalte vehicule din acelasi set de conflict
     - Cat timp Ollama calculeaza, agentul foloseste cache-ul sau fallback-ul determinist
     - Cand raspunsul Ollama soseste, il stocheaza in cache
 
     context: { "my_state": {ttc, priority, direction, speed}, "others": [{id, ttc, priority}] }
+    scope:   id-ul sesiunii (cheia de cache e (scope, vid))
+    now:     timpul simularii (SimClock.time() al sesiunii); implicit utils.clock.default
     """
-    global _ollama_available, _call_count
+    if not _llm_enabled:
+        return _deterministic_fallback(context)
 
-    now = _time.time()
+    now = sim_clock.default.time() if now is None else now
+    client.start_probe()
 
-    _call_count += 1
-    if _call_count % _RECHECK_INTERVAL == 0:
-        prev = _ollama_available
-        _ollama_available = _check_ollama()
-        if _ollama_available and not prev:
-            logger.info("Ollama a revenit online — decizii LLM reactivate.")
+    key = (scope, vid)
 
     # Returneaza cache daca e proaspat
-    cached = _llm_cache.get(vid)
-    if cached and (now - cached.get("ts", 0)) < _CACHE_TTL:
+    cached = _llm_cache.get(key)
+    # ts > now: decizie dintr-o rulare anterioara (ceasul reporneste la reincarcare)
+    if cached and 0 <= (now - cached.get("ts", 0)) < _CACHE_TTL:
         return cached
 
-    # Fara Ollama → fallback imediat
-    if not _ollama_available:
+    # Raspunsul propriei cereri a sosit → intra in cache. Inaintea cache-ului de situatii
+    # (raspunsul batch e coordonat per vehicul, situatia poate fi comuna mai multor membri)
+    # si inainte de a lansa alta cerere (altfel un raspuns sosit intre doua tick-uri ar fi aruncat)
+    fut = _pending.get(key)
+    if fut is not None and fut.done():
+        _pending.pop(key, None)
+        result = None if fut.cancelled() else fut.result().get(vid)
+        if result:
+            _llm_cache[key] = {**result, "ts": now}
+            return _llm_cache[key]
+        fut = None
+
+    known = situations.get(situation_key(context))
+    if known is not None:
+        return known
+
+    # Breaker deschis / sonda in curs → fallback imediat (fara I/O pe tick)
+    if not client.breaker.available:
         return _deterministic_fallback(context)
 
     # Lanseaza cerere noua in background daca nu exista deja una in zbor
-    fut = _pending.get(vid)
-    if fut is None or fut.done():
+    if fut is None:
         v_ctx = {"id": vid, **context}
-        _pending[vid] = executor.submit(_get_single_decision, v_ctx)
-        fut = _pending[vid]
-
-    # Verifica daca cererea curenta e gata
-    if fut.done():
-        _, result = fut.result()
-        _pending.pop(vid, None)
-        if result:
-            _llm_cache[vid] = {**result, "ts": now}
-            return _llm_cache[vid]
+        if _batch_mode:
+            _queued.setdefault(scope, {})[vid] = v_ctx
+        else:
+            _pending[key] = client.submit(_get_single_decision(v_ctx))
 
     # Inca in asteptare → returneaza cache vechi sau fallback
     if cached:
@@ -221,18 +411,76 @@ def request_llm_decision(vid: str, context: dict) -> dict:
     return _deterministic_fallback(context)
 
 
-def get_batch_decisions(vehicles_context: list) -> dict:
+def _conflict_sets(queued: dict) -> list:
+    """
+    Imparte vehiculele din coada in seturi de conflict: componentele conexe ale relatiei
+    "X il are pe Y in others" (agentul pune in others doar vehicule in conflict la
+    aceeasi intersectie). Ordinea vehiculelor din coada se pastreaza.
     """
-    Decizii batch pentru toate vehiculele via LLM (async cu cache).
-    Folosit de CentralSystem sau alte componente care lucreaza cu lista de vehicule.
-    Pentru decizii per-vehicul din Agent, foloseste request_llm_decision().
+    parent = {vid: vid for vid in queued}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for vid, ctx in queued.items():
+        for o in ctx.get("others", []):
+            if o.get("id") in parent:
+                parent[find(o["id"])] = find(vid)
+    groups: dict = {}
+    for vid, ctx in queued.items():
+        groups.setdefault(find(vid), []).append(ctx)
+    return list(groups.values())
+
+
+def _submit(scope, vehicles: list) -> None:
+    """Un singur vehicul → promptul simplu; mai multe → un prompt batch. Acelasi future pentru toti."""
+    if len(vehicles) == 1:
+        fut = client.submit(_get_single_decision(vehicles[0]))
+    else:
+        fut = client.submit(_get_batch_decision(vehicles))
+    for v in vehicles:
+        _pending[(scope, v["id"])] = fut
+
+
+def flush(scope: Optional[str] = None) -> int:
     """
-    result = {}
-    for v in vehicles_context:
-        vid     = v["id"]
-        context = {k: val for k, val in v.items() if k != "id"}
-        decision = request_llm_decision(vid, context)
-        result[vid] = decision
+    Trimite cererile adunate de request_llm_decision() in tick-ul curent: un prompt
+    per set de conflict. Se apeleaza o data per tick, dupa bucla agentilor.
+    Returneaza numarul de cereri trimise.
+    """
+    queued = _queued.pop(scope, None)
+    if not queued:
+        return 0
+    sets = _conflict_sets(queued)
+    for vehicles in sets:
+        _submit(scope, vehicles)
+    return len(sets)
+
+
+def get_batch_decisions(vehicles_context: list, scope: Optional[str] = None,
+                        now: Optional[float] = None) -> dict:
+    """
+    Decizii pentru un set de vehicule via LLM (async cu cache). Vehiculele fara decizie
+    proaspata pleaca impreuna intr-un singur prompt (un drum dus-intors), indiferent
+    de relatiile din others. Pana sosesc raspunsurile → cache vechi / fallback.
+    Pentru decizii per-vehicul din Agent, foloseste request_llm_decision() + flush().
+    """
+    global _batch_mode
+    prev, _batch_mode = _batch_mode, True
+    try:
+        result = {}
+        for v in vehicles_context:
+            vid     = v["id"]
+            context = {k: val for k, val in v.items() if k != "id"}
+            result[vid] = request_llm_decision(vid, context, scope=scope, now=now)
+    finally:
+        _batch_mode = prev
+    queued = _queued.pop(scope, None)
+    if queued:
+        _submit(scope, list(queued.values()))
 
     if result:
         logger.info(f"Decizii LLM batch: { {k: v['action'] for k, v in result.items()} }")
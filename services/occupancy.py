@@ -0,0 +1,87 @@
+"""
+services/occupancy.py — Indexul de ocupare al cutiei intersectiei
+Tine setul vehiculelor aflate in cutia intersectiei si amprenta lor de conflict
+(strada pe care circula: N↔S sau E↔V). Engine-ul il reconstruieste la incarcarea
+scenariului si il reimprospateaza dupa fiecare miscare / schimbare de stare, iar
+consumatorii (senzorul de intersectie al vehiculelor, CentralSystem) il
+interogheaza in loc sa recalculeze _is_inside_intersection() pentru toti.
+"""
+from typing import Dict, List, Optional
+
+# Strada fiecarei directii de intrare — doua vehicule pe strazi diferite
+# au traiectorii care se intersecteaza in cutie (vezi CentralSystem._paths_conflict)
+ROAD = {'N': 'NS', 'S': 'NS', 'E': 'EV', 'V': 'EV'}
+
+
+class OccupancyIndex:
+    def __init__(self):
+        self._inside: Dict[str, object] = {}   # vehicle_id -> Vehicle aflat in cutie
+        self._rank: Dict[str, int] = {}        # ordinea din lista engine-ului (rezultate stabile)
+        self._footprint: Dict[str, int] = {'NS': 0, 'EV': 0}
+
+    def __len__(self) -> int:
+        return len(self._inside)
+
+    def __contains__(self, vehicle_id: str) -> bool:
+        return vehicle_id in self._inside
+
+    def clear(self) -> None:
+        self._inside.clear()
+        self._rank.clear()
+        self._footprint = {'NS': 0, 'EV': 0}
+
+    def rebuild(self, vehicles: list) -> None:
+        self.clear()
+        for i, v in enumerate(vehicles):
+            self._rank[v.id] = i
+            self.refresh(v)
+
+    def refresh(self, v) -> None:
+        """Reevalueaza un vehicul dupa miscare sau schimbare de stare."""
+        if v.id not in self._rank:
+            self._rank[v.id] = len(self._rank)
+        inside = v.state != 'done' and v._is_inside_intersection()
+        if inside == (v.id in self._inside):
+            return
+        if inside:
+            self._inside[v.id] = v
+            self._footprint[ROAD[v.direction]] += 1
+        else:
+            self._drop(v.id)
+
+    def remove(self, vehicle_id: str) -> None:
+        self._drop(vehicle_id)
+        self._rank.pop(vehicle_id, None)
+
+    def _drop(self, vehicle_id: str) -> None:
+        v = self._inside.pop(vehicle_id, None)
+        if v is not None:
+            self._footprint[ROAD[v.direction]] -= 1
+
+    def is_occupied(self, exclude: Optional[str] = None) -> bool:
+        """Exista cineva (altul decat `exclude`) in cutia intersectiei? O(1)."""
+        n = len(self._inside)
+        return n > 1 or (n == 1 and exclude not in self._inside)
+
+    def inside(self, state: Optional[str] = None) -> List:
+        """Vehiculele din cutie (optional filtrate dupa stare), in ordinea engine-ului."""
+        found = [v for v in self._inside.values() if state is None or v.state == state]
+        found.sort(key=lambda v: self._rank[v.id])
+        return found
+
+    def footprint(self) -> Dict[str, int]:
+        """Numarul de vehicule din cutie per strada (NS / EV)."""
+        return dict(self._footprint)
+
+    def conflicts_with(self, v, state: Optional[str] = None) -> bool:
+        """
+        True daca un vehicul din cutie (optional doar cu starea `state`) are
+        traiectorie in conflict cu `v` — adica circula pe cealalta strada.
+        """
+        other_road = 'EV' if ROAD[v.direction] == 'NS' else 'NS'
+        if not self._footprint[other_road]:
+            return False
+        if state is None:
+            return True
+        return any(o.state == state and ROAD[o.direction] == other_road
+                   for o in self._inside.values())
@@ -0,0 +1,192 @@
+"""
+services/ollama.py — Client asincron pentru Ollama (httpx.AsyncClient)
+Un singur AsyncClient per event loop: conexiunile keep-alive sunt refolosite intre
+cereri (fara handshake TCP per decizie). Numarul de cereri in zbor e limitat de un
+semafor (max_in_flight); o cerere care nu termina in `deadline` secunde — inclusiv
+timpul petrecut asteptand un loc — e anulata si raportata ca expirata.
+
+Fara event loop in thread-ul apelantului (rulari headless, scripturi), cererile
+ruleaza pe un loop de fundal propriu (vezi submit()).
+
+Disponibilitatea o urmareste un circuit breaker (services/circuit_breaker.py):
+cererile ii raporteaza rezultatul, iar sonda de pe loop-ul de fundal (start_probe)
+face ping /api/tags periodic si, cand e deschis, dupa fiecare backoff. Breaker-ul
+porneste deschis (disponibilitate necunoscuta) — nimic nu atinge reteaua la import,
+iar httpx se importa abia la prima cerere / sonda.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+from services.circuit_breaker import OPEN, CircuitBreaker
+from simulation.profiler import WINDOW, summarize_ms
+
+if TYPE_CHECKING:
+    import httpx
+
+BASE_URL      = "http://localhost:11434"
+MAX_IN_FLIGHT = 8       # cereri simultane catre Ollama
+DEADLINE      = 4.0     # s — termenul unei cereri (asteptare + raspuns)
+PING_TIMEOUT  = 2.0
+PROBE_POLL    = 1.0     # s — cat doarme sonda cel mult intre verificari ale starii breaker-ului
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class OllamaClient:
+    def __init__(self, base_url: str = BASE_URL, max_in_flight: int = MAX_IN_FLIGHT,
+                 deadline: float = DEADLINE, breaker: Optional[CircuitBreaker] = None):
+        self.base_url      = base_url
+        self.max_in_flight = max_in_flight
+        self.deadline      = deadline
+        self.breaker       = breaker if breaker is not None else CircuitBreaker(state=OPEN)
+        self._probe        = None   # Future-ul sondei de pe loop-ul de fundal
+        self._client: Optional['httpx.AsyncClient'] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bg_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bg_lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.expired   = 0
+        self.failed    = 0
+        self.latency: deque = deque(maxlen=WINDOW)
+
+    def configure(self, max_in_flight: Optional[int] = None, deadline: Optional[float] = None) -> None:
+        if max_in_flight is not None:
+            self.max_in_flight = max_in_flight
+            self._sem = None   # recreat la urmatoarea cerere
+        if deadline is not None:
+            self.deadline = deadline
+
+    def _bind(self) -> None:
+        # AsyncClient si semaforul apartin loop-ului curent; alt loop → obiecte noi
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._client is None:
+            import httpx
+            self._loop   = loop
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                # Concurenta o limiteaza semaforul; pool-ul doar pastreaza conexiunile calde
+                limits=httpx.Limits(max_connections=None,
+                                    max_keepalive_connections=self.max_in_flight),
+                timeout=httpx.Timeout(self.deadline))
+            self._sem = None
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_in_flight)
+
+    async def generate(self, payload: dict, deadline: Optional[float] = None) -> dict:
+        """
+        POST /api/generate. Ridica DeadlineExceeded daca nu termina la timp si
+        httpx.HTTPError la erori de retea / status != 200.
+        """
+        self._bind()
+        deadline = self.deadline if deadline is None else deadline
+        t0 = time.perf_counter()
+        try:
+            return await asyncio.wait_for(self._post(payload), deadline)
+        except asyncio.TimeoutError:
+            # Lent nu inseamna cazut — termenul depasit nu conteaza pentru breaker
+            self.expired += 1
+            raise DeadlineExceeded(f'fara raspuns in {deadline:.1f}s')
+        except Exception as e:
+            import httpx
+            self.failed += 1
+            if isinstance(e, httpx.TransportError) or (
+                    isinstance(e, httpx.HTTPStatusError) and e.response.status_code >= 500):
+                self.breaker.record_failure()
+            raise
+        finally:
+            self.latency.append(time.perf_counter() - t0)
+
+    async def _post(self, payload: dict) -> dict:
+        async with self._sem:
+            self.in_flight += 1
+            try:
+                r = await self._client.post('/api/generate', json=payload)
+                r.raise_for_status()
+                self.completed += 1
+                self.breaker.record_success()
+                return r.json()
+            finally:
+                self.in_flight -= 1
+
+    # ── Sonda de sanatate ─────────────────────────────────────────────
+
+    def start_probe(self) -> None:
+        """Porneste (o singura data) sonda pe loop-ul de fundal; tick-ul nu asteapta niciodata ping-ul."""
+        if self._probe is None or self._probe.done():
+            self._probe = asyncio.run_coroutine_threadsafe(self._probe_loop(), self._background_loop())
+
+    def stop_probe(self) -> None:
+        if self._probe is not None:
+            self._probe.cancel()
+            self._probe = None
+
+    async def _probe_loop(self) -> None:
+        # Client propriu (sonda ruleaza pe loop-ul de fundal, nu pe cel al cererilor), creat
+        # abia la prima sonda: construirea unui AsyncClient (contextul SSL) dureaza zeci de ms
+        # si ar intarzia primele cereri de pe acelasi loop
+        import httpx
+        http = None
+        try:
+            while True:
+                wait = self.breaker.probe_in()
+                if wait > 0:
+                    await asyncio.sleep(min(wait, PROBE_POLL))
+                    continue
+                if http is None:
+                    http = httpx.AsyncClient(timeout=PING_TIMEOUT)
+                self.breaker.begin_probe()
+                try:
+                    r  = await http.get(self.base_url + '/api/tags')
+                    ok = r.status_code == 200
+                except Exception:
+                    ok = False
+                self.breaker.end_probe(ok)
+        finally:
+            if http is not None:
+                await http.aclose()
+
+    # ── Integrare cu apelanti sincroni (tick-ul engine-ului) ────────────
+
+    def submit(self, coro):
+        """
+        Porneste corutina fara sa astepte. Din event loop-ul serverului (tick-ul ruleaza in
+        el) devine un Task pe acel loop; altfel ruleaza pe loop-ul de fundal. Ambele
+        rezultate au .done() / .result(), deci apelantul le interogheaza la fel.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run_coroutine_threadsafe(coro, self._background_loop())
+        return loop.create_task(coro)
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._bg_lock:
+            if self._bg_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='ollama-client', daemon=True).start()
+                self._bg_loop = loop
+            return self._bg_loop
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            'max_in_flight': self.max_in_flight,
+            'deadline_s':    self.deadline,
+            'in_flight':     self.in_flight,
+            'completed':     self.completed,
+            'expired':       self.expired,
+            'failed':        self.failed,
+            'latency_ms':    summarize_ms(self.latency),
+            'breaker':       self.breaker.stats(),
+        }
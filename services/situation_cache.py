@@ -0,0 +1,165 @@
+"""
+services/situation_cache.py — Cache de decizii LLM pe situatia de trafic (nu pe vehicul)
+Cheia e contextul agentului cuantizat si canonicalizat: TTC pe galeti de TTC_STEP
+secunde, directia celorlalti relativ la vehicul (same/opposite/left/right), intentia,
+prioritatea si no_stop. Id-urile si memoria agentului nu intra in cheie, iar vecinii
+se sorteaza — doua vehicule diferite in aceeasi situatie primesc aceeasi decizie.
+
+TTC-ul din context vine din collision.time_to_intersection(): distanta (px) / viteza
+(px per tick), deci e in tick-uri — se imparte la FPS inainte de impartirea pe galeti.
+
+Evictie LRU la `capacity` intrari, contoare hits/misses/evictions. Optional, cache-ul
+se salveaza intr-un fisier JSON (save()) si se reincarca la pornire (load()); fisierul
+poarta un `tag` (model + prompturi) — un tag diferit inseamna intrari invalide.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from services.collision import TTC_BRAKE
+from utils.clock import FPS
+
+CAPACITY = 4096
+TTC_STEP = 0.5                # s — latimea unui galet de TTC
+TTC_FAR  = TTC_BRAKE * 2      # peste → 'far' (fallback-ul ignora vecinii de la aceasta distanta)
+VERSION  = 2                  # 2: TTC convertit din tick-uri in secunde (cheile v1 sunt toate "far")
+
+# Sensul de mers pentru fiecare directie de intrare (coordonate ecran, y in jos)
+_HEADING = {'N': (0, 1), 'S': (0, -1), 'E': (-1, 0), 'V': (1, 0)}
+
+
+def _ttc_bucket(ttc_ticks) -> str:
+    seconds = float(ttc_ticks if ttc_ticks is not None else 999.0) / FPS
+    if seconds >= TTC_FAR:
+        return 'far'
+    return str(int(max(seconds, 0.0) // TTC_STEP))
+
+
+def ttc_buckets(key: str) -> set:
+    """Galetii de TTC dintr-o cheie (vehiculul propriu si vecinii) — pentru verificari."""
+    me, _, others = key.partition('|')
+    parts = [me] + [o for o in others.split(';') if o]
+    return {p.split(',')[-2] for p in parts}
+
+
+def _relative(mine: str, other: str) -> str:
+    """Directia celuilalt vehicul fata de mine — aceeasi conventie ca collision.is_right_of."""
+    a, b = _HEADING.get(mine), _HEADING.get(other)
+    if a is None or b is None:
+        return '?'
+    dot   = a[0] * b[0] + a[1] * b[1]
+    cross = a[0] * b[1] - a[1] * b[0]
+    if dot > 0:
+        return 'same'
+    if dot < 0:
+        return 'opposite'
+    return 'right' if cross > 0 else 'left'
+
+
+def situation_key(context: dict) -> str:
+    """Cheia canonica a contextului trimis de Agent catre llm_client."""
+    my = context.get('my_state', {})
+    me = (f"{my.get('priority', 'normal')},{my.get('intent', 'straight')},"
+          f"{_ttc_bucket(my.get('ttc'))},{int(bool(my.get('no_stop')))}")
+    others = sorted(
+        f"{_relative(my.get('direction'), o.get('direction'))},{o.get('intent', 'straight')},"
+        f"{o.get('priority', 'normal')},{_ttc_bucket(o.get('ttc'))},{int(bool(o.get('no_stop')))}"
+        for o in context.get('others', [])
+    )
+    return me + '|' + ';'.join(others)
+
+
+class SituationCache:
+    def __init__(self, capacity: int = CAPACITY, path: Optional[Path] = None, tag: str = ''):
+        self.capacity  = capacity
+        self.path      = Path(path) if path is not None else None
+        self.tag       = tag
+        self._entries: OrderedDict = OrderedDict()
+        # Raspunsurile sosesc pe loop-ul clientului Ollama (poate fi alt thread decat tick-ul)
+        self._lock     = threading.Lock()
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            decision = self._entries.get(key)
+            if decision is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return decision
+
+    def put(self, key: str, decision: dict) -> None:
+        with self._lock:
+            self._entries[key] = {'action': decision['action'], 'reason': decision['reason']}
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def configure(self, capacity: Optional[int] = None, path: Optional[Path] = None) -> None:
+        with self._lock:
+            if capacity is not None:
+                self.capacity = capacity
+                self._evict()
+        if path is not None:
+            self.path = Path(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    # ── Persistenta ───────────────────────────────────────────────────
+
+    def load(self) -> int:
+        """Incarca intrarile din `path` (cele mai vechi primele). Returneaza cate au fost incarcate."""
+        if self.path is None:
+            return 0
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return 0
+        if data.get('version') != VERSION or data.get('tag') != self.tag:
+            return 0   # alt model / alte prompturi — deciziile nu mai sunt valabile
+        with self._lock:
+            for key, decision in data.get('entries', []):
+                self._entries[key] = decision
+                self._entries.move_to_end(key)
+            self._evict()
+            return len(self._entries)
+
+    def save(self) -> int:
+        """Scrie cache-ul in `path` (atomic: fisier temporar + rename). Returneaza numarul de intrari."""
+        if self.path is None:
+            return 0
+        with self._lock:
+            data = {'version': VERSION, 'tag': self.tag, 'entries': list(self._entries.items())}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.path)
+        return len(data['entries'])
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries':   len(self._entries),
+            'capacity':  self.capacity,
+            'hits':      self.hits,
+            'misses':    self.misses,
+            'evictions': self.evictions,
+            'hit_rate':  round(self.hits / lookups, 3) if lookups else 0.0,
+            'path':      str(self.path) if self.path is not None else None,
+        }
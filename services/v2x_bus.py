@@ -1,19 +1,57 @@
 """
 services/v2x_bus.py — Canalul V2X partajat
-Dict global: { vehicle_id: state_dict }
+Dict: { vehicle_id: state_dict }
+Fiecare SimulationEngine are propriul V2XBus (sesiuni izolate).
+Functiile de modul opereaza pe bus-ul implicit (compatibilitate).
 """
 from typing import Dict
-_channel: Dict[str, dict] = {}
+
+
+class V2XBus:
+    def __init__(self):
+        self._channel: Dict[str, dict] = {}
+
+    def publish(self, vehicle_id: str, data: dict) -> None:
+        """Scrie starea unui vehicul pe bus."""
+        self._channel[vehicle_id] = data
+
+    def get_all(self) -> Dict[str, dict]:
+        return dict(self._channel)
+
+    def get_others(self, vehicle_id: str) -> Dict[str, dict]:
+        """Returneaza toti ceilalti agenti."""
+        return {k: v for k, v in self._channel.items() if k != vehicle_id}
+
+    def get(self, vehicle_id: str):
+        return self._channel.get(vehicle_id)
+
+    def clear(self) -> None:
+        """Goleste bus-ul la reset scenariu."""
+        self._channel.clear()
+
+
+_default = V2XBus()
+_channel: Dict[str, dict] = _default._channel
+
+
 def publish(vehicle_id: str, data: dict) -> None:
     """Scrie starea unui vehicul pe bus."""
-    _channel[vehicle_id] = data
+    _default.publish(vehicle_id, data)
+
+
 def get_all() -> Dict[str, dict]:
-    return dict(_channel)
+    return _default.get_all()
+
+
 def get_others(vehicle_id: str) -> Dict[str, dict]:
     """Returneaza toti ceilalti agenti."""
-    return {k: v for k, v in _channel.items() if k != vehicle_id}
+    return _default.get_others(vehicle_id)
+
+
 def get(vehicle_id: str):
-    return _channel.get(vehicle_id)
+    return _default.get(vehicle_id)
+
+
 def clear() -> None:
     """Goleste bus-ul la reset scenariu."""
-    _channel.clear()
+    _default.clear()
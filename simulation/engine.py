@@ -2,19 +2,42 @@
 simulation/engine.py — Loop principal 30 FPS
 """
 import asyncio
+import hashlib
+import json
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import numpy as np
 from models.vehicle import Vehicle
+from models.vehicle_array import VehicleArray
 from models.agent import Agent
-from services import v2x_bus
+from services import llm_client, v2x_bus
 from services.central_system import CentralSystem
 from services.infrastructure import InfrastructureAgent
-from services.collision import time_to_intersection, TTC_BRAKE, TTC_YIELD, check_physical_collision
+from services.occupancy import OccupancyIndex
+from services.collision import (time_to_intersection, TTC_BRAKE, TTC_YIELD, SpatialHash,
+                                PairwiseRisk, assess_risk)
+from simulation.lanes import LaneQueues
+from simulation.profiler import TickProfiler
+from simulation.recording import Recorder
+from simulation.tick_signal import TickSignal
 from utils import logger
-from scenarios import SCENARIOS, NO_SEMAPHORE_SCENARIOS, AEB_DISABLED_SCENARIOS
+from utils.clock import SimClock
+import scenarios
 
 FPS           = 30
 TICK_INTERVAL = 1.0 / FPS
+VECTORIZE_MIN = 400   # vectorized=None: pasul pe VehicleArray de la atatea vehicule in scena
+
+# Sectiunile starii, in ordinea din get_state(); cele "live" se citesc direct, la fiecare cerere
+STATE_SECTIONS = (
+    'tick', 'timestamp', 'cooperation', 'scenario', 'paused', 'vehicles', 'semaphore',
+    'custom_scenario', 'custom_has_semaphore', 'risk', 'risk_zones', 'event_seq',
+    'event_log_start', 'collisions', 'agents_memory',
+)
+LIVE_SECTIONS = frozenset({
+    'cooperation', 'scenario', 'paused', 'custom_scenario', 'custom_has_semaphore',
+    'event_seq', 'event_log_start',
+})
 
 
 # Scenariul custom editabil de utilizator
@@ -23,42 +46,72 @@ TICK_INTERVAL = 1.0 / FPS
 
 
 class SimulationEngine:
-    def __init__(self):
+    def __init__(self, session_id: str = 'default'):
+        # Fiecare engine (sesiune) are propriul bus V2X si propriul buffer de evenimente
+        self.session_id          = session_id
+        self.tick_count          = 0
+        # Timpul simularii = tick_count / FPS — iesirea nu depinde de ceasul de perete
+        self.clock               = SimClock(lambda: self.tick_count, FPS)
+        self.bus                 = v2x_bus.V2XBus()
+        self.log                 = logger.DecisionLogger(clock=self.clock)
         self.scenario_name       = 'perpendicular'
         self.cooperation         = True
+        self.vectorized: Optional[bool] = None     # pasul pe VehicleArray: None = automat (VECTORIZE_MIN)
+        self.store: Optional[VehicleArray] = None  # starea vehiculelor cand pasul e vectorizat
+        self._lanes_stale        = False           # pasul vectorizat nu tine cozile benzilor la zi
         self.vehicles: List[Vehicle] = []
         self.agents:   List[Agent]   = []   # agenti autonomi per vehicul
-        self.central             = CentralSystem()
-        self.semaphore           = InfrastructureAgent()
-        self.tick_count          = 0
+        self.central             = CentralSystem(bus=self.bus, log=self.log, clock=self.clock)
+        self.semaphore           = InfrastructureAgent(bus=self.bus, log=self.log, clock=self.clock)
         self.running             = False
         self.paused              = False
-        self._last_state         = {}
+        self.state_version       = 0               # creste la fiecare _update_state()
+        self._state_cache: Dict[str, Any] = {}     # sectiunile construite pentru versiunea curenta
+        self._state_risk         = None
+        self._state_bus: dict    = {}
         self._event_log: list    = []
         self._custom_scenario: List[Dict[str, Any]] = []
         self._custom_has_semaphore: bool = True  # default: custom cu semafor
         self._crash_timers: Dict[str, int] = {}   # vehicle_id -> tick cand a intrat in crashed
         self._active_collisions: list = []         # coliziuni active (vizibile pe canvas)
+        self._collision_log: list = []             # toate coliziunile din rularea curenta
+        self._grid               = SpatialHash()   # broad-phase coliziuni, actualizat incremental
+        self.lanes               = LaneQueues()    # cozi ordonate per banda (lider O(1))
+        self.occupancy           = OccupancyIndex()  # cine e in cutia intersectiei
+        self.profiler            = TickProfiler(TICK_INTERVAL, name=session_id)  # dezactivat implicit
+        self.tick_signal         = TickSignal()    # trezeste /ws dupa fiecare _update_state()
+        self.recorder: Optional[Recorder] = None   # inregistrarea in curs (simulation/recording.py)
         self._load_scenario('perpendicular')
 
     # ── Configurare ────────────────────────────────────────────────────
 
-    def _load_scenario(self, name: str):
+    def _load_scenario(self, name: str, defs: List[Dict[str, Any]] = None,
+                       has_semaphore: bool = None):
+        """
+        Incarca scenariul `name`. `defs` / `has_semaphore` suprascriu definitia
+        din registry (folosit de rularile headless cu parametri modificati).
+        """
         if name == 'custom':
-            has_semaphore = self._custom_has_semaphore
-            defs = list(self._custom_scenario)
+            default_sem  = self._custom_has_semaphore
+            default_defs = list(self._custom_scenario)
         else:
-            has_semaphore = name not in NO_SEMAPHORE_SCENARIOS
-            defs = SCENARIOS.get(name, SCENARIOS['perpendicular'])
-        v2x_bus.clear()
-        logger.clear()
+            default_sem  = name not in scenarios.NO_SEMAPHORE_SCENARIOS
+            default_defs = scenarios.SCENARIOS.get(name, scenarios.SCENARIOS['perpendicular'])
+        if defs is None:
+            defs = default_defs
+        if has_semaphore is None:
+            has_semaphore = default_sem
+        self.bus.clear()
+        self.log.clear()
         self.central.reset()
-        self.semaphore           = InfrastructureAgent()
+        self.semaphore           = InfrastructureAgent(bus=self.bus, log=self.log, clock=self.clock)
         self.tick_count          = 0
         self.scenario_name       = name
         self._event_log          = []
         self._crash_timers       = {}
         self._active_collisions  = []
+        self._collision_log      = []
+        self._grid.clear()
         # Calculam spawn_tick (2 secunde delay = 60 ticks per vehicul pe aceeasi directie)
         # Si offset de pozitie ca sa nu se suprapuna la spawn
         lane_counts = {}
@@ -76,7 +129,8 @@ class SimulationEngine:
                 speed_multiplier=d.get('speed_multiplier', 1.0),
                 v2x_enabled=d.get('v2x_enabled', True),
                 no_stop=d.get('no_stop', False),
-                spawn_tick=count * 30 # Reduced from 80 to 30 (1s)
+                spawn_tick=count * 30, # Reduced from 80 to 30 (1s)
+                clock=self.clock,
             )
             
             # Repozitionam vehiculul "in spate" pe baza indexului de spawn
@@ -94,9 +148,18 @@ class SimulationEngine:
             
             self.vehicles.append(v)
             lane_counts[direction] = count + 1
-        
+
+        # Multimi mari: starea traieste in VehicleArray, vehiculele devin view-uri
+        self.store = None
+        if self._vectorize():
+            self.store    = VehicleArray.from_vehicles(self.vehicles)
+            self.vehicles = self.store.bind(self.vehicles)
+        self._lanes_stale = False
+        self.lanes.rebuild(self.vehicles)
+        self.occupancy.rebuild(self.vehicles)
+
         # Creeaza agenti autonomi per vehicul
-        self.agents = [Agent(v, cooperation=self.cooperation) for v in self.vehicles]
+        self.agents = [self._make_agent(v) for v in self.vehicles]
         
         # Configureaza semaforul si sistemul central in functie de scenariu
         self.semaphore.reset(has_semaphore)
@@ -105,53 +168,80 @@ class SimulationEngine:
         # Publica starea INITIALA pe bus (important daca e pauza)
         self.semaphore.update()
         for v in self.vehicles:
-            v2x_bus.publish(v.id, v.to_dict())
+            self.bus.publish(v.id, v.to_dict())
             
         logger.log_info(f'Scenariu: {name} (cooperation={self.cooperation}) încărcat.')
         self._update_state()
 
+    def _make_agent(self, vehicle: Vehicle) -> Agent:
+        return Agent(vehicle, cooperation=self.cooperation, bus=self.bus,
+                     log=self.log, scope=self.session_id, clock=self.clock)
+
     def reset(self, scenario: str = None):
         logger.log_info(f"RESET cerut pentru: {scenario} (curent: {self.scenario_name})")
-        if scenario and (scenario in SCENARIOS or scenario == 'custom'):
+        if scenario and (scenario in scenarios.SCENARIOS or scenario == 'custom'):
             self.scenario_name = scenario
         self._load_scenario(self.scenario_name)
         self._update_state()
 
     def _update_state(self):
-        """Genereaza si salveaza starea curenta pentru API / frontend."""
-        bus_data = {vid: data for vid, data in v2x_bus.get_all().items()
-                    if vid != 'INFRA'}
-        risk_zones = _compute_risk_zones(bus_data)
-        
-        # Sursa principala pentru panoul de sus (banner risc)
-        from services.collision import assess_risk
-        global_risk = assess_risk(bus_data)
-
-        agents_memory = {
-            agent.vehicle_id: agent.get_memory()
-            for agent in self.agents
-        }
-        
-        sem_state = self.semaphore.get_state() if hasattr(self.semaphore, 'get_state') else {}
-        # Adaug flag-ul has_semaphore in sem_state pentru frontend
-        sem_state['has_semaphore'] = self.semaphore.has_semaphore
-
-        self._last_state = {
-            'tick':            self.tick_count,
-            'timestamp':       time.monotonic(),
-            'cooperation':     self.cooperation,
-            'scenario':        self.scenario_name,
-            'paused':          self.paused,
-            'vehicles':        [v.to_dict() for v in self.vehicles if v.state != 'done'],
-            'semaphore':       sem_state,
-            'custom_scenario': self._custom_scenario,
-            'custom_has_semaphore': self._custom_has_semaphore,
-            'risk':            global_risk,
-            'risk_zones':      risk_zones,
-            'event_log':       list(logger.get_all()[-20:]),
-            'collisions':      list(self._active_collisions),
-            'agents_memory':   agents_memory
-        }
+        """
+        Marcheaza starea curenta ca noua (tick nou / schimbare din API). Nu construieste
+        nimic: sectiunile se materializeaza la cerere in get_state(), o data per versiune.
+        """
+        self.state_version += 1
+        self._state_cache  = {'tick': self.tick_count, 'timestamp': self.clock.time()}
+        self._state_risk   = None
+        self.tick_signal.notify(self.tick_count)
+
+    def _risk_kernel(self) -> PairwiseRisk:
+        # Un singur kernel de risc per versiune — zonele si banner-ul deriva din el
+        if self._state_risk is None:
+            self._state_bus  = {vid: data for vid, data in self.bus.get_all().items()
+                                if vid != 'INFRA'}
+            self._state_risk = PairwiseRisk(self._state_bus)
+        return self._state_risk
+
+    def _build_section(self, name: str):
+        if name == 'vehicles':
+            return [v.to_dict() for v in self.vehicles if v.state != 'done']
+        if name == 'semaphore':
+            sem_state = self.semaphore.get_state() if hasattr(self.semaphore, 'get_state') else {}
+            # Adaug flag-ul has_semaphore in sem_state pentru frontend
+            sem_state['has_semaphore'] = self.semaphore.has_semaphore
+            return sem_state
+        if name == 'risk':
+            # Sursa principala pentru panoul de sus (banner risc)
+            risk = self._risk_kernel()
+            return assess_risk(self._state_bus, risk)
+        if name == 'risk_zones':
+            risk = self._risk_kernel()
+            return _compute_risk_zones(self._state_bus, risk)
+        if name == 'collisions':
+            return list(self._active_collisions)
+        if name == 'agents_memory':
+            return {agent.vehicle_id: agent.get_memory() for agent in self.agents}
+        raise KeyError(name)
+
+    def _live_section(self, name: str):
+        # Sectiuni ieftine, citite mereu la zi (nu se cache-uiesc)
+        if name == 'cooperation':
+            return self.cooperation
+        if name == 'scenario':
+            return self.scenario_name
+        if name == 'paused':
+            return self.paused
+        if name == 'custom_scenario':
+            return self._custom_scenario
+        if name == 'custom_has_semaphore':
+            return self._custom_has_semaphore
+        # Evenimentele nu se copiaza in stare: clientii cer doar ce e nou
+        # (get_since(event_seq) / campul 'events' de pe /ws)
+        if name == 'event_seq':
+            return self.log.last_seq
+        if name == 'event_log_start':
+            return self.log.start_seq
+        raise KeyError(name)
 
     def toggle_cooperation(self) -> bool:
         self.cooperation = not self.cooperation
@@ -163,17 +253,20 @@ class SimulationEngine:
                 if v.state == 'waiting':
                     v.clearance = False
         logger.log_info(f'Cooperation {"AUTO" if self.cooperation else "MANUAL"}')
+        self._update_state()
         return self.cooperation
 
     def start(self):
         """Porneste / reia simularea."""
         self.paused = False
         logger.log_info('Simulare PORNITA')
+        self._update_state()
 
     def stop_sim(self):
         """Pauzeaza simularea (vehiculele se opresc pe loc)."""
         self.paused = True
         logger.log_info('Simulare OPRITA')
+        self._update_state()
 
     def grant_clearance(self, vehicle_id: str) -> dict:
         for v in self.vehicles:
@@ -184,10 +277,30 @@ class SimulationEngine:
                     v.vx = v._base_vx
                     v.vy = v._base_vy
                     self.central._log(vehicle_id, 'CLEARANCE', reason='acordat manual de utilizator')
+                    self._update_state()
                     return {'ok': True, 'vehicle_id': vehicle_id, 'state': 'crossing'}
                 return {'ok': False, 'reason': f'{vehicle_id} este {v.state}, nu waiting'}
         return {'ok': False, 'reason': f'{vehicle_id} negasit'}
 
+    # ── Inregistrare ───────────────────────────────────────────────────
+
+    def start_recording(self, path) -> dict:
+        """Incepe sa inregistreze fiecare tick in directorul `path` (vezi simulation/recording.py)."""
+        if self.recorder is not None:
+            raise RuntimeError(f'sesiunea {self.session_id} inregistreaza deja ({self.recorder.path.name})')
+        self.recorder = Recorder(self, path)
+        logger.log_info(f'Inregistrare pornita: {self.recorder.path}')
+        return self.recorder.info()
+
+    def stop_recording(self) -> Optional[dict]:
+        """Opreste inregistrarea si o finalizeaza; None daca nu era niciuna."""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        info = recorder.close()
+        logger.log_info(f"Inregistrare oprita: {info['path']} ({info['frames']} frame-uri)")
+        return info
+
     # ── Custom scenario management ──────────────────────────────────────
 
     def custom_add_vehicle(self, vehicle_def: dict) -> dict:
@@ -227,7 +340,8 @@ class SimulationEngine:
                 priority=entry['priority'],
                 speed_multiplier=entry['speed_multiplier'],
                 v2x_enabled=entry['v2x_enabled'],
-                spawn_tick=entry.get('spawn_tick', 0)
+                spawn_tick=entry.get('spawn_tick', 0),
+                clock=self.clock,
             )
             
             # Aplica offset-ul si pentru custom (bazat pe spawn_offset salvat)
@@ -237,9 +351,13 @@ class SimulationEngine:
             elif v.direction == 'E': v.x += offset
             elif v.direction == 'V': v.x -= offset
             v._init = (v.x, v.y, v.vx, v.vy)
-            
+            if self.store is not None:
+                v = self.store.append(v)
+
             self.vehicles.append(v)
-            self.agents.append(Agent(v, cooperation=self.cooperation))
+            self.lanes.add(v)
+            self.occupancy.refresh(v)
+            self.agents.append(self._make_agent(v))
 
         return {'ok': True, 'vehicle': entry, 'custom_scenario': self._custom_scenario}
 
@@ -252,6 +370,11 @@ class SimulationEngine:
         if self.scenario_name == 'custom':
             self.vehicles = [v for v in self.vehicles if v.id != vehicle_id]
             self.agents   = [a for a in self.agents   if a.vehicle_id != vehicle_id]
+            if self.store is not None:
+                self.store.remove(vehicle_id)
+            self._grid.remove(vehicle_id)
+            self.lanes.remove(vehicle_id)
+            self.occupancy.remove(vehicle_id)
         return {'ok': True, 'removed': vehicle_id, 'custom_scenario': self._custom_scenario}
 
     def custom_update_vehicle(self, vehicle_id: str, updates: dict) -> dict:
@@ -275,6 +398,10 @@ class SimulationEngine:
         if self.scenario_name == 'custom':
             self.vehicles = []
             self.agents   = []
+            self.store    = None
+            self._grid.clear()
+            self.lanes.clear()
+            self.occupancy.clear()
         return {'ok': True, 'custom_scenario': []}
 
     def set_custom_semaphore(self, has_semaphore: bool) -> dict:
@@ -286,7 +413,7 @@ class SimulationEngine:
         return list(self._custom_scenario)
 
     def get_scenarios(self) -> list:
-        return list(SCENARIOS.keys()) + ['custom']
+        return list(scenarios.SCENARIOS.keys()) + ['custom']
 
     # ── Loop ───────────────────────────────────────────────────────────
 
@@ -307,35 +434,137 @@ class SimulationEngine:
     def stop(self):
         self.running = False
 
+    def run_headless(self, max_ticks: int = 3000, until_done: bool = True,
+                     digest: bool = False) -> dict:
+        """
+        Ruleaza simularea sincron, fara asteptare intre tick-uri (cat de repede permite CPU-ul).
+        Se opreste dupa max_ticks sau — daca until_done — cand toate vehiculele sunt 'done'
+        (inainte ca _tick() sa reincarce scenariul). Returneaza rezumatul rularii.
+        digest=True adauga 'digest': sha256 peste starea completa si evenimentele fiecarui
+        tick — doua rulari cu aceleasi intrari dau acelasi digest (ceasul e cel simulat).
+        """
+        h = hashlib.sha256() if digest else None
+        cursor = self.log.last_seq
+        t0 = time.perf_counter()
+        completion_tick = None
+        start_tick = self.tick_count
+        while self.tick_count - start_tick < max_ticks:
+            if self._all_done():
+                completion_tick = self.tick_count
+                if until_done:
+                    break
+            self._tick()
+            if h is not None:
+                events = self.log.get_since(cursor)
+                cursor = self.log.last_seq
+                h.update(json.dumps([self.get_state(), events], sort_keys=True, default=str).encode())
+        if completion_tick is None and self._all_done():
+            completion_tick = self.tick_count
+        elapsed = time.perf_counter() - t0
+        ticks = self.tick_count - start_tick
+        summary = {
+            'scenario':        self.scenario_name,
+            'cooperation':     self.cooperation,
+            'has_semaphore':   self.semaphore.has_semaphore,
+            'ticks':           ticks,
+            'completed':       completion_tick is not None,
+            'completion_tick': completion_tick,
+            'collisions':      [dict(c) for c in self._collision_log],
+            'collision_count': len(self._collision_log),
+            'decisions':       self.log.get_counts(),
+            'elapsed_s':       round(elapsed, 4),
+            'ticks_per_s':     round(ticks / elapsed, 1) if elapsed > 0 else None,
+        }
+        if h is not None:
+            summary['digest'] = h.hexdigest()
+        if self.profiler.enabled:
+            summary['tick_profile'] = self.profiler.stats()
+        return summary
+
     # ── Tick ───────────────────────────────────────────────────────────
 
+    def _all_done(self) -> bool:
+        """Toate masinile au terminat (sau au fost crashuite si timeouted)."""
+        return bool(self.vehicles) and all(v.state == 'done' for v in self.vehicles)
+
+    def _sync_grid(self, v: Vehicle):
+        """Tine grila de coliziuni la zi: doar vehiculele spawnate si active participa."""
+        if v.state in ('done', 'crashed') or getattr(v, 'spawn_tick', 0) > self.tick_count:
+            self._grid.remove(v.id)
+        else:
+            self._grid.update(v.id, v.x, v.y)
+
+    def _vectorize(self) -> bool:
+        """Pasul cinematic pe VehicleArray? vectorized=None → automat, dupa numarul de vehicule."""
+        if self.vectorized is None:
+            return self.store is not None or len(self.vehicles) >= VECTORIZE_MIN
+        return self.vectorized
+
+    def _bind_store(self):
+        """Muta starea vehiculelor in self.store; lista, agentii si indexurile primesc view-urile."""
+        self.store    = VehicleArray.from_vehicles(self.vehicles)
+        self.vehicles = self.store.bind(self.vehicles)
+        views = {v.id: v for v in self.vehicles}
+        for agent in self.agents:
+            agent.vehicle = views[agent.vehicle_id]
+        self.lanes.rebuild(self.vehicles)
+        self.occupancy.rebuild(self.vehicles)
+
+    def _step_store(self):
+        """
+        Acelasi pas ca bucla Vehicle.update(), direct pe self.store (order='list' — vecinii se
+        citesc in ordinea listei, deci rezultatul e identic). Vehiculele sunt view-uri peste
+        store, deci nu se copiaza nimic; indexul de ocupare se atinge doar pentru cei care au
+        intrat / iesit din cutie, grila se actualizeaza din vectori. Liderul vine din store,
+        nu din cozile benzilor — se reconstruiesc daca se revine la bucla.
+        """
+        if self.store is None:
+            self._bind_store()
+        store  = self.store
+        rows   = np.flatnonzero(store.live())
+        in_box = store.in_box()
+        store.step(self.tick_count, lights=(self.bus.get('INFRA') or {}).get('lights'))
+        self._lanes_stale = True
+        for i in np.flatnonzero(store.in_box() != in_box):
+            self.occupancy.refresh(store.views[i])
+        on_grid = store.on_grid(self.tick_count)
+        xs, ys  = store.x.tolist(), store.y.tolist()
+        for i in rows.tolist():
+            if on_grid[i]:
+                self._grid.update(store.ids[i], xs[i], ys[i])
+            else:
+                self._grid.remove(store.ids[i])
+
     def _tick(self):
+        prof = self.profiler
+        prof.begin()
         self.tick_count += 1
 
-        all_done = self.vehicles and all(
-            v.state in ('done', 'crashed') for v in self.vehicles
-        )
-        # Verifica daca toate masinile au terminat sau au fost crashuite si timeouted
-        really_done = self.vehicles and all(
-            v.state == 'done' for v in self.vehicles
-        )
-        if really_done:
+        if self._all_done():
             if self.scenario_name == 'custom':
                 self._load_scenario('custom')
             else:
                 self._load_scenario(self.scenario_name)
+            prof.mark('reload')
+            if self.recorder is not None:
+                self.recorder.capture()
+                prof.mark('record')
+            prof.end()
             return
 
         # Semaforul se actualizeaza primul
         sem_state = self.semaphore.update()
+        prof.mark('semaphore')
 
         # Publica starea curenta pe bus INAINTE de decizii
         for v in self.vehicles:
-            v2x_bus.publish(v.id, v.to_dict())
+            self.bus.publish(v.id, v.to_dict())
+        prof.mark('publish')
 
         # CentralSystem decide clearance (V2I / reguli prioritate)
         if self.cooperation:
-            self.central.decide(self.vehicles)
+            self.central.decide(self.vehicles, occupancy=self.occupancy)
+        prof.mark('central')
 
         # Agenti autonomi — decizia LLM seteaza flag-ul agent_yield pe vehicul
         # vehicle.update() il respecta in _desired_speed_factor() → factor=0 → oprire
@@ -350,42 +579,51 @@ class SimulationEngine:
                 v.agent_yield = True
             else:  # go
                 v.agent_yield = False
+        # Cererile LLM adunate de agenti pleaca acum: un prompt per set de conflict
+        llm_client.flush(self.session_id)
+        prof.mark('agents')
 
-        # Updateaza pozitiile — pasam vehiculele pe aceeasi directie pentru following
-        active = [v for v in self.vehicles if v.state != 'done']
-        for v in self.vehicles:
-            same_dir = [o for o in active
-                        if o.id != v.id and o.direction == v.direction]
-            v.update(same_dir, active_vehicles=active, current_tick=self.tick_count)
+        # Updateaza pozitiile — liderul pentru following vine din coada benzii (O(1))
+        if self._vectorize():
+            self._step_store()
+        else:
+            if self._lanes_stale:
+                self.lanes.rebuild(self.vehicles)
+                self._lanes_stale = False
+            for v in self.vehicles:
+                v.update(leader=self.lanes.leader(v), occupancy=self.occupancy,
+                         current_tick=self.tick_count, bus=self.bus)
+                self.lanes.refresh(v)
+                self.occupancy.refresh(v)
+                self._sync_grid(v)
+        prof.mark('vehicles')
 
         # Publica starea finala pentru bus
         for v in self.vehicles:
-            v2x_bus.publish(v.id, v.to_dict())
+            self.bus.publish(v.id, v.to_dict())
+        prof.mark('publish')
 
         # ── Detectare coliziuni fizice ────────────────────────────────────
-        # Ignoram vehiculele care nu s-au spawnat inca
-        active_data = {
-            v.id: v.to_dict() for v in self.vehicles
-            if v.state not in ('done', 'crashed') and getattr(v, 'spawn_tick', 0) <= self.tick_count
-        }
-        # Mapa rapida aeb_active per id
-        aeb_active_ids = {v.id for v in self.vehicles if getattr(v, 'aeb_active', False)}
-        collisions = check_physical_collision(active_data)
+        # Grila e deja la zi (_sync_grid dupa fiecare update) → doar celulele vecine
+        collisions = self._grid.collisions()
         for (id1, id2) in collisions:
             # Marcam vehiculele ca 'crashed' daca nu sunt deja
             for vid in (id1, id2):
                 if vid not in self._crash_timers:
                     self._crash_timers[vid] = self.tick_count
-                    logger.log_decision(vid, '💥 COLIZIUNE', 0.0, f'coliziune fizică cu {id2 if vid == id1 else id1}')
+                    self.log.log_decision(vid, '💥 COLIZIUNE', 0.0, f'coliziune fizică cu {id2 if vid == id1 else id1}')
                 for v in self.vehicles:
                     if v.id == vid and v.state != 'crashed':
                         v.state = 'crashed'
                         v.vx = 0.0
                         v.vy = 0.0
+                self._grid.remove(vid)
+                self.lanes.remove(vid)
             pair_key = tuple(sorted([id1, id2]))
             if not any(tuple(sorted(c['vehicles'])) == pair_key for c in self._active_collisions):
                 self._active_collisions.append({'vehicles': [id1, id2], 'tick': self.tick_count})
-
+                self._collision_log.append({'vehicles': [id1, id2], 'tick': self.tick_count})
+        prof.mark('collisions')
 
         # ── Timeout crashed vehicles: dupa 60 ticks (~2s) → done ─────────
         CRASH_TIMEOUT = 60
@@ -395,9 +633,10 @@ class SimulationEngine:
                 for v in self.vehicles:
                     if v.id == vid:
                         v.state = 'done'
-                        v2x_bus.publish(v.id, v.to_dict()) # update final pentru frontend
+                        self.occupancy.refresh(v)
+                        self.bus.publish(v.id, v.to_dict()) # update final pentru frontend
                 del self._crash_timers[vid]
-                logger.log_decision(vid, '🗑 REMOVED', 0.0, 'vehicul avariat îndepărtat din scenă')
+                self.log.log_decision(vid, '🗑 REMOVED', 0.0, 'vehicul avariat îndepărtat din scenă')
 
         # Curata coliziunile active daca ambele vehicule sunt done
         self._active_collisions = [
@@ -407,26 +646,45 @@ class SimulationEngine:
                 for vid in c['vehicles']
             )
         ]
+        prof.mark('cleanup')
 
         self._update_state()
-
-    def get_state(self) -> dict:
-        st = self._last_state or {}
-        if st:
-            st['paused'] = self.paused
-            st['cooperation'] = self.cooperation
-        return st
+        prof.mark('state')
+        if self.recorder is not None:
+            self.recorder.capture()
+            prof.mark('record')
+        prof.end()
+
+    def get_state(self, sections=None) -> dict:
+        """
+        Starea curenta pentru API / frontend / inregistrare. Sectiunile scumpe (vehicule,
+        risc, memoria agentilor...) se construiesc la prima cerere dupa _update_state() si
+        se refolosesc pana la urmatoarea versiune; fara cereri nu costa nimic.
+        sections: numele dorite (None = toate); 'tick' si 'timestamp' sunt mereu incluse.
+        """
+        cache = self._state_cache
+        state = {}
+        for name in STATE_SECTIONS:
+            if sections is not None and name not in sections and name not in ('tick', 'timestamp'):
+                continue
+            if name in LIVE_SECTIONS:
+                state[name] = self._live_section(name)
+            else:
+                if name not in cache:
+                    cache[name] = self._build_section(name)
+                state[name] = cache[name]
+        return state
 
 
 # ── Zone de risc ────────────────────────────────────────────────────────────
 
-def _compute_risk_zones(bus_data: dict) -> list:
+def _compute_risk_zones(bus_data: dict, risk: PairwiseRisk = None) -> list:
     """
     Calculeaza zonele de risc pe baza distantei vehiculelor fata de intersectie.
     Returneaza o lista de zone (cercuri) de desenat pe canvas:
       { x, y, radius, level: 'high'|'medium'|'low', vehicles: [id1, id2] }
+    `risk` — kernelul PairwiseRisk al tick-ului curent (partajat cu assess_risk).
     """
-    import math
     INTERSECTION_X, INTERSECTION_Y = 400, 400
 
     # Praguri de distanta (px) pentru risc vizibil pe canvas
@@ -435,57 +693,53 @@ def _compute_risk_zones(bus_data: dict) -> list:
     DIST_MEDIUM = 180   # ambele vehicule < 180px → risc mediu
     DIST_WARN   = 300   # ambele vehicule < 300px → risc scăzut (avertizare)
 
-    zones = []
-    ids = [vid for vid, data in bus_data.items()
-           if data.get('state') not in ('done', None)]
-
-    # Distanta fata de intersectie per vehicul
-    dist_map = {}
-    for vid in ids:
-        v = bus_data[vid]
-        dx = INTERSECTION_X - v.get('x', 0)
-        dy = INTERSECTION_Y - v.get('y', 0)
-        dist_map[vid] = math.sqrt(dx**2 + dy**2)
-
-    for i, id1 in enumerate(ids):
-        for id2 in ids[i+1:]:
-            d1, d2 = dist_map.get(id1, 9999), dist_map.get(id2, 9999)
-            # Ambele vehicule trebuie sa fie in zona de avertizare
-            if d1 > DIST_WARN or d2 > DIST_WARN:
-                continue
-            min_dist = min(d1, d2)
-            v1 = bus_data[id1]
-            v2 = bus_data[id2]
-            # Zona: intre cele doua vehicule, centrata pe intersectie
-            # daca sunt aproape → zona la intersectie, altfel la mijlocul traseului
-            cx = (v1.get('x', INTERSECTION_X) + v2.get('x', INTERSECTION_X)) / 2
-            cy = (v1.get('y', INTERSECTION_Y) + v2.get('y', INTERSECTION_Y)) / 2
-            # Tragem centrul spre intersectie cu 40%
-            cx = cx + (INTERSECTION_X - cx) * 0.4
-            cy = cy + (INTERSECTION_Y - cy) * 0.4
-            # TTC afapt (px/tick) pentru afisaj
-            spd1 = math.sqrt(v1.get('vx', 0)**2 + v1.get('vy', 0)**2)
-            spd2 = math.sqrt(v2.get('vx', 0)**2 + v2.get('vy', 0)**2)
-            ttc1 = d1 / spd1 if spd1 > 0.1 else 999
-            ttc2 = d2 / spd2 if spd2 > 0.1 else 999
-            min_ttc = min(ttc1, ttc2)
-            # Nivel de risc bazat pe distanta
-            if min_dist < DIST_HIGH:
-                level, radius = 'high', 60
-            elif min_dist < DIST_MEDIUM:
-                level, radius = 'medium', 50
-            else:
-                level, radius = 'low', 40
-            zones.append({
-                'x':        round(cx, 1),
-                'y':        round(cy, 1),
-                'radius':   radius,
-                'level':    level,
-                'vehicles': [id1, id2],
-                'ttc':      round(min_ttc, 1),
-            })
+    if risk is None:
+        risk = PairwiseRisk(bus_data)
+
+    # Ambele vehicule (active) trebuie sa fie in zona de avertizare
+    i, j = risk.pairs(risk.active & (risk.dist <= DIST_WARN))
+    if len(i) == 0:
+        return []
+    min_dist = np.minimum(risk.dist[i], risk.dist[j])
+    # Zona: intre cele doua vehicule, trasa spre intersectie cu 40%
+    cx = (risk.x[i] + risk.x[j]) / 2
+    cy = (risk.y[i] + risk.y[j]) / 2
+    cx = cx + (INTERSECTION_X - cx) * 0.4
+    cy = cy + (INTERSECTION_Y - cy) * 0.4
+    # TTC afapt (px/tick) pentru afisaj
+    min_ttc = np.minimum(risk.ttc_display[i], risk.ttc_display[j])
 
+    zones = []
+    ids = risk.ids
+    for a, b, d, x, y, t in zip(i.tolist(), j.tolist(), min_dist.tolist(),
+                                cx.tolist(), cy.tolist(), min_ttc.tolist()):
+        # Nivel de risc bazat pe distanta
+        if d < DIST_HIGH:
+            level, radius = 'high', 60
+        elif d < DIST_MEDIUM:
+            level, radius = 'medium', 50
+        else:
+            level, radius = 'low', 40
+        zones.append({
+            'x':        round(x, 1),
+            'y':        round(y, 1),
+            'radius':   radius,
+            'level':    level,
+            'vehicles': [ids[a], ids[b]],
+            'ttc':      round(t, 1),
+        })
     return zones
 
 
-engine = SimulationEngine()
+_default_engine: Optional[SimulationEngine] = None
+
+
+def __getattr__(name: str):
+    # `engine` (sesiunea implicita) se construieste la primul acces, nu la import:
+    # importul modulului (FPS, SimulationEngine) nu incarca niciun scenariu
+    global _default_engine
+    if name == 'engine':
+        if _default_engine is None:
+            _default_engine = SimulationEngine()
+        return _default_engine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,123 @@
+"""
+simulation/headless.py — Rulare headless, mai rapida decat timpul real
+Ruleaza _tick() in bucla stransa (fara asyncio.sleep) pana la max_ticks sau pana
+cand toate vehiculele sunt 'done', si returneaza un rezumat:
+  coliziuni, tick-ul de finalizare, numarul de decizii per actiune.
+
+Rulare:
+  python -m simulation.headless perpendicular
+  python -m simulation.headless --all --ticks 2000 --no-cooperation --json
+  python -m simulation.headless traffic_jam --profile
+  python -m simulation.headless --all --llm --llm-cache llm_situations.json
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from scenarios import SCENARIOS
+from services import llm_client
+from simulation.engine import SimulationEngine
+from utils import logger
+
+DEFAULT_MAX_TICKS = 3000
+
+
+def run_scenario(name: str, cooperation: bool = True,
+                 has_semaphore: Optional[bool] = None,
+                 defs: Optional[List[Dict[str, Any]]] = None,
+                 max_ticks: int = DEFAULT_MAX_TICKS,
+                 until_done: bool = True,
+                 use_llm: bool = False,
+                 persist: bool = False,
+                 profile: bool = False,
+                 digest: bool = False,
+                 vectorized: Optional[bool] = None) -> dict:
+    """
+    Ruleaza un scenariu headless pe un engine nou si returneaza rezumatul.
+
+    has_semaphore / defs suprascriu valorile din registry-ul de scenarii.
+    use_llm=False forteaza fallback-ul determinist (Ollama raspunde in timp real,
+    deci deciziile lui nu au sens intr-o rulare accelerata).
+    persist=False nu scrie deciziile in decisions.jsonl.
+    profile=True adauga in rezumat 'tick_profile' (timpi per faza, vezi TickProfiler).
+    digest=True adauga 'digest' (sha256 al iesirii tick cu tick — identic intre rulari).
+    vectorized: engine.vectorized — True / False forteaza pasul pe VehicleArray / bucla
+    Vehicle.update() (acelasi rezultat), None = automat dupa numarul de vehicule.
+    """
+    prev_llm     = llm_client.set_enabled(use_llm)
+    prev_persist = logger.set_persist(persist)
+    try:
+        eng = SimulationEngine()
+        eng.cooperation = cooperation
+        eng.vectorized  = vectorized
+        eng.profiler.configure(enabled=profile)
+        eng._load_scenario(name, defs=defs, has_semaphore=has_semaphore)
+        return eng.run_headless(max_ticks=max_ticks, until_done=until_done, digest=digest)
+    finally:
+        llm_client.set_enabled(prev_llm)
+        logger.set_persist(prev_persist)
+
+
+def _format_summary(s: dict) -> str:
+    status = f"done @ tick {s['completion_tick']}" if s['completed'] else f"incomplet ({s['ticks']} ticks)"
+    crashes = ', '.join('+'.join(c['vehicles']) + f"@{c['tick']}" for c in s['collisions']) or '-'
+    decisions = ', '.join(f'{k}={v}' for k, v in sorted(s['decisions'].items())) or '-'
+    return (f"{s['scenario']:<14} coop={'ON ' if s['cooperation'] else 'OFF'} "
+            f"sem={'ON ' if s['has_semaphore'] else 'OFF'} | {status} | "
+            f"coliziuni: {s['collision_count']} [{crashes}] | "
+            f"{s['ticks_per_s']} ticks/s\n    decizii: {decisions}"
+            + (f"\n    digest: {s['digest']}" if 'digest' in s else '')
+            + (_format_profile(s['tick_profile']) if 'tick_profile' in s else ''))
+
+
+def _format_profile(p: dict) -> str:
+    rows = [f"\n    profil (ms, p50/p95/p99) — overrun {p['overruns']}/{p['ticks']} (buget {p['budget_ms']} ms)"]
+    for phase, st in p['phases'].items():
+        if st['max'] > 0:
+            rows.append(f"      {phase:<11} {st['p50']:8.3f} {st['p95']:8.3f} {st['p99']:8.3f}")
+    return '\n'.join(rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m simulation.headless',
+                                     description='Rulare headless a scenariilor V2X.')
+    parser.add_argument('scenarios', nargs='*', help='scenarii de rulat (implicit: perpendicular)')
+    parser.add_argument('--all', action='store_true', help='ruleaza toate scenariile')
+    parser.add_argument('--ticks', type=int, default=DEFAULT_MAX_TICKS, help='numar maxim de tick-uri')
+    parser.add_argument('--no-cooperation', action='store_true', help='ruleaza cu cooperarea V2X oprita')
+    parser.add_argument('--semaphore', choices=('on', 'off'), help='suprascrie semaforul scenariului')
+    parser.add_argument('--llm', action='store_true', help='foloseste Ollama (implicit: fallback determinist)')
+    parser.add_argument('--json', action='store_true', help='afiseaza rezumatele ca JSON (unul pe linie)')
+    parser.add_argument('--profile', action='store_true', help='masoara timpul per faza al fiecarui tick')
+    parser.add_argument('--digest', action='store_true', help='sha256 al iesirii (verificare reproductibilitate)')
+    parser.add_argument('--vectorized', action='store_const', const=True, default=None,
+                        help='forteaza pasul cinematic pe VehicleArray (NumPy) in loc de Vehicle.update()')
+    parser.add_argument('--llm-cache', metavar='PATH',
+                        help='cache-ul de situatii LLM: incarcat la pornire, salvat la final (cu --llm)')
+    args = parser.parse_args(argv)
+
+    names = list(SCENARIOS) if args.all else (args.scenarios or ['perpendicular'])
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"scenarii necunoscute: {', '.join(unknown)}. Valori: {', '.join(SCENARIOS)}")
+
+    has_semaphore = None if args.semaphore is None else args.semaphore == 'on'
+    if args.llm_cache:
+        llm_client.load_cache(args.llm_cache)
+    for name in names:
+        summary = run_scenario(name, cooperation=not args.no_cooperation,
+                               has_semaphore=has_semaphore, max_ticks=args.ticks,
+                               use_llm=args.llm, profile=args.profile, digest=args.digest,
+                               vectorized=args.vectorized)
+        print(json.dumps(summary) if args.json else _format_summary(summary))
+    if args.llm_cache:
+        llm_client.save_cache()
+        if args.llm and not args.json:
+            st = llm_client.situations.stats()
+            print(f"cache situatii LLM: {st['entries']} intrari, {st['hits']} hits / {st['misses']} misses")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+simulation/lanes.py — Cozi ordonate per banda de intrare (car-following)
+Pentru fiecare directie de intrare (N, S, E, V) engine-ul tine lista vehiculelor
+care inca sunt pe banda (nevirate, nici done/crashed), sortata dupa progresul
+pe banda — primul element e cel mai aproape de iesire.
+Liderul unui vehicul e vecinul din fata din coada → O(1) in loc de o scanare
+a tuturor vehiculelor pe aceeasi directie.
+Coada se actualizeaza la spawn (add), viraj / iesire (refresh → remove) si crash.
+"""
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from models.vehicle import DIRECTIONS
+
+
+def progress(v) -> float:
+    """Distanta parcursa pe axa benzii de intrare (creste in sensul de mers)."""
+    d = v.direction
+    if d == 'N': return v.y
+    if d == 'S': return -v.y
+    if d == 'E': return -v.x
+    return v.x   # V
+
+
+def _on_lane(v) -> bool:
+    return not v._turned and v.state not in ('done', 'crashed')
+
+
+class LaneQueues:
+    def __init__(self):
+        self._lanes: Dict[str, list] = {d: [] for d in DIRECTIONS}
+        self._pos: Dict[str, int] = {}       # vehicle_id -> index in coada benzii lui
+        self._members: Dict[str, object] = {}  # vehicle_id -> Vehicle
+
+    def __contains__(self, vehicle_id: str) -> bool:
+        return vehicle_id in self._pos
+
+    def lane(self, direction: str) -> List:
+        """Coada benzii `direction` (fata → spate). Nu modificati lista returnata."""
+        return self._lanes[direction]
+
+    def clear(self) -> None:
+        for q in self._lanes.values():
+            q.clear()
+        self._pos.clear()
+        self._members.clear()
+
+    def rebuild(self, vehicles: list) -> None:
+        self.clear()
+        for v in vehicles:
+            self.add(v)
+
+    def _reindex(self, q: list, start: int) -> None:
+        for i in range(start, len(q)):
+            self._pos[q[i].id] = i
+
+    def add(self, v) -> None:
+        """Spawn: insereaza vehiculul la pozitia lui pe banda (daca e inca pe banda)."""
+        if v.id in self._pos or not _on_lane(v):
+            return
+        q = self._lanes[v.direction]
+        # Coada e descrescatoare dupa progres; la egalitate → dupa cei existenti
+        p = progress(v)
+        i = bisect_left(q, -p, key=lambda o: -progress(o))
+        while i < len(q) and progress(q[i]) == p:
+            i += 1
+        q.insert(i, v)
+        self._members[v.id] = v
+        self._reindex(q, i)
+
+    def remove(self, vehicle_id: str) -> None:
+        i = self._pos.pop(vehicle_id, None)
+        if i is None:
+            return
+        q = self._lanes[self._members.pop(vehicle_id).direction]
+        del q[i]
+        self._reindex(q, i)
+
+    def refresh(self, v) -> None:
+        """
+        Dupa update(): vehiculul iese din coada daca a virat / a terminat / s-a
+        avariat; altfel isi reia locul daca a depasit (rar — following-ul impiedica).
+        """
+        i = self._pos.get(v.id)
+        if i is None:
+            return
+        if not _on_lane(v):
+            self.remove(v.id)
+            return
+        q = self._lanes[v.direction]
+        p = progress(v)
+        while i > 0 and progress(q[i - 1]) < p:
+            self._swap(q, i - 1, i)
+            i -= 1
+        while i + 1 < len(q) and progress(q[i + 1]) > p:
+            self._swap(q, i, i + 1)
+            i += 1
+
+    def _swap(self, q: list, i: int, j: int) -> None:
+        q[i], q[j] = q[j], q[i]
+        self._pos[q[i].id] = i
+        self._pos[q[j].id] = j
+
+    def leader(self, v) -> Optional[object]:
+        """
+        Cel mai apropiat vehicul aflat strict in fata lui `v` pe banda lui de intrare.
+        Vehiculele deja virate nu mai sunt in coada — liderul lor se cauta binar
+        dupa progresul pe axa de intrare (acelasi criteriu ca Vehicle.dist_ahead).
+        """
+        q = self._lanes[v.direction]
+        p = progress(v)
+        i = self._pos.get(v.id)
+        if i is None:
+            i = bisect_left(q, -p, key=lambda o: -progress(o))
+        # Elementele dinaintea lui i au progres >= p; primul strict mai mare e liderul
+        for j in range(i - 1, -1, -1):
+            if progress(q[j]) > p:
+                return q[j]
+        return None
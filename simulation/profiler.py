@@ -0,0 +1,139 @@
+"""
+simulation/profiler.py — Profiler per faza pentru SimulationEngine._tick()
+Fiecare tick e impartit in faze (semafor, publish pe bus, CentralSystem, agenti,
+Vehicle.update, coliziuni, curatare crash, _update_state). Duratele intra intr-o
+fereastra rulanta (implicit ultimele 600 de tick-uri ≈ 20s) din care se calculeaza
+p50/p95/p99; tick-urile care depasesc bugetul (TICK_INTERVAL) sunt numarate ca overrun.
+
+Dezactivat (implicit), fiecare mark() e doar un test de flag.
+"""
+import logging
+import math
+import time
+from collections import deque
+from typing import Dict, Optional
+
+PHASES = ('semaphore', 'publish', 'central', 'agents', 'vehicles',
+          'collisions', 'cleanup', 'state', 'record', 'reload')
+WINDOW = 600
+
+_log = logging.getLogger("V2X.profiler")
+
+
+def _percentile(sorted_vals: list, q: float) -> float:
+    """Percentila (nearest-rank) dintr-o lista sortata."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(q / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+
+def summarize_ms(samples) -> dict:
+    """p50/p95/p99/mean/max in milisecunde pentru o serie de durate (s)."""
+    vals = sorted(samples)
+    n = len(vals)
+    return {
+        'p50':  round(_percentile(vals, 50) * 1000, 3),
+        'p95':  round(_percentile(vals, 95) * 1000, 3),
+        'p99':  round(_percentile(vals, 99) * 1000, 3),
+        'mean': round(sum(vals) / n * 1000, 3) if n else 0.0,
+        'max':  round(vals[-1] * 1000, 3) if n else 0.0,
+    }
+
+
+class TickProfiler:
+    def __init__(self, budget: float, enabled: bool = False, window: int = WINDOW,
+                 log_every: int = 0, name: str = 'default'):
+        """
+        budget:    durata maxima a unui tick (s) — peste ea tick-ul e overrun
+        log_every: la fiecare N tick-uri profilate scrie o linie de rezumat in log (0 = niciodata)
+        """
+        self.budget    = budget
+        self.enabled   = enabled
+        self.window    = window
+        self.log_every = log_every
+        self.name      = name
+        self.reset()
+
+    def reset(self) -> None:
+        self._samples: Dict[str, deque] = {p: deque(maxlen=self.window) for p in PHASES + ('total',)}
+        self._current: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self._t0     = 0.0
+        self._last   = 0.0
+        self._open   = False
+        self.ticks    = 0
+        self.overruns = 0
+        self.worst    = 0.0
+        self._recent_overruns = deque(maxlen=self.window)
+
+    def configure(self, enabled: Optional[bool] = None, log_every: Optional[int] = None) -> None:
+        if enabled is not None:
+            if enabled and not self.enabled:
+                self.reset()
+            self.enabled = enabled
+        if log_every is not None:
+            self.log_every = max(0, int(log_every))
+
+    # ── Instrumentare (apelat din _tick) ───────────────────────────────
+
+    def begin(self) -> None:
+        if not self.enabled:
+            return
+        self._t0 = self._last = time.perf_counter()
+        self._open = True
+
+    def mark(self, phase: str) -> None:
+        """Inchide faza `phase`: timpul scurs de la mark-ul anterior ii este atribuit."""
+        if not self._open:
+            return
+        now = time.perf_counter()
+        self._current[phase] += now - self._last
+        self._last = now
+
+    def end(self) -> None:
+        if not self._open:
+            return
+        self._open = False
+        total = self._last - self._t0
+        for phase, spent in self._current.items():
+            self._samples[phase].append(spent)
+            self._current[phase] = 0.0
+        self._samples['total'].append(total)
+        self.ticks += 1
+        overrun = total > self.budget
+        self._recent_overruns.append(overrun)
+        if overrun:
+            self.overruns += 1
+        if total > self.worst:
+            self.worst = total
+        if self.log_every and self.ticks % self.log_every == 0:
+            self._log_summary()
+
+    # ── Raportare ──────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """Rezumat in milisecunde: p50/p95/p99/mean/max per faza + overrun-uri."""
+        phases = {phase: summarize_ms(samples) for phase, samples in self._samples.items()}
+        recent = sum(self._recent_overruns)
+        return {
+            'enabled':        self.enabled,
+            'budget_ms':      round(self.budget * 1000, 3),
+            'window':         self.window,
+            'samples':        len(self._samples['total']),
+            'ticks':          self.ticks,
+            'overruns':       self.overruns,
+            'overruns_window': recent,
+            'overrun_rate':   round(recent / len(self._recent_overruns), 4) if self._recent_overruns else 0.0,
+            'worst_ms':       round(self.worst * 1000, 3),
+            'phases':         phases,
+        }
+
+    def _log_summary(self) -> None:
+        s = self.stats()
+        total = s['phases']['total']
+        slowest = max(PHASES, key=lambda p: s['phases'][p]['p95'])
+        _log.info(
+            f"[{self.name}] tick p50={total['p50']:.2f}ms p95={total['p95']:.2f}ms p99={total['p99']:.2f}ms "
+            f"| overrun {s['overruns_window']}/{s['samples']} | cea mai lenta faza (p95): "
+            f"{slowest}={s['phases'][slowest]['p95']:.2f}ms"
+        )
@@ -0,0 +1,326 @@
+"""
+simulation/recording.py — Inregistrarea si redarea rularilor (fara re-simulare)
+Un Recorder atasat unui engine scrie la fiecare tick vehiculele, semaforul, coliziunile
+active si deciziile noi intr-un director <nume>.v2xrec/:
+
+  frames.<col>.bin    — indexul de frame-uri, o valoare fixa per frame si coloana (FRAME_COLUMNS)
+  vehicles.<col>.bin  — vehiculele tuturor frame-urilor, concatenate (VEHICLE_COLUMNS)
+  events.jsonl        — deciziile, in ordine; frames.ev_end = cate erau scrise la acel frame
+  meta.json           — scenariul, tabelele de id-uri / stari de semafor / coliziuni, numarul de frame-uri
+
+Fiecare coloana e un fisier binar brut (little-endian), citit cu np.memmap: Recording.state(n)
+citeste randul n din index (offset + numar de vehicule) si feliile corespunzatoare — O(1),
+indiferent de lungimea inregistrarii. Starile semaforului si seturile de coliziuni se repeta
+mult, deci se scriu o data in meta.json si frame-ul pastreaza doar indexul.
+
+Replay reda o inregistrare cu play / pause / seek / viteza oarecare (si negativa): pozitia
+se calculeaza din ceas, nu se avanseaza niciun engine.
+"""
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models.vehicle import DIRECTIONS, INTENTS, STATES
+
+RECORDINGS_DIR = Path(__file__).parent.parent / "recordings"
+SUFFIX         = '.v2xrec'
+VERSION        = 1
+FPS            = 30         # frame-uri inregistrate pe secunda (un frame per tick)
+EVENT_BACKLOG  = 20         # evenimente in starea redata (ca GET /state)
+
+FRAME_COLUMNS = {
+    'tick':       '<u4',    # tick_count al engine-ului (reporneste de la 0 la reincarcare)
+    'timestamp':  '<f8',
+    'veh_start':  '<u8',    # primul rand din vehicles.*
+    'veh_count':  '<u2',
+    'semaphore':  '<u4',    # index in meta['semaphores']
+    'sem_timer':  '<u4',
+    'collisions': '<u4',    # index in meta['collisions']
+    'ev_end':     '<u4',    # evenimente scrise pana la acest frame inclusiv
+}
+VEHICLE_COLUMNS = {
+    'id':        '<u2',     # index in meta['ids']
+    'direction': 'u1',
+    'intent':    'u1',
+    'state':     'u1',
+    'flags':     'u1',      # bit0 v2x_enabled, bit1 no_stop, bit2 clearance, bit3 emergency
+    'speed_kmh': '<u2',
+    'x': '<f4', 'y': '<f4', 'vx': '<f4', 'vy': '<f4', 'heading': '<f4', 'dist_to_intersection': '<f4',
+}
+F_V2X, F_NO_STOP, F_CLEARANCE, F_EMERGENCY = 1, 2, 4, 8
+UNKNOWN = 0xFF
+
+_CODES = {
+    'direction': {d: i for i, d in enumerate(DIRECTIONS)},
+    'intent':    {t: i for i, t in enumerate(INTENTS)},
+    'state':     {s: i for i, s in enumerate(STATES)},
+}
+_NAMES = {'direction': DIRECTIONS, 'intent': INTENTS, 'state': STATES}
+# Precizia din Vehicle.to_dict() — float32 se rotunjeste inapoi la aceleasi valori
+_ROUND = (('x', 1), ('y', 1), ('vx', 2), ('vy', 2), ('heading', 4), ('dist_to_intersection', 1))
+
+
+def recording_path(name: str, root: Path = RECORDINGS_DIR) -> Path:
+    """Directorul inregistrarii `name`; ValueError pentru nume care ies din root."""
+    if not name or '/' in name or '\\' in name or name.startswith('.'):
+        raise ValueError(f'nume de inregistrare invalid: {name!r}')
+    return Path(root) / (name if name.endswith(SUFFIX) else name + SUFFIX)
+
+
+def list_recordings(root: Path = RECORDINGS_DIR) -> List[dict]:
+    out = []
+    for path in sorted(Path(root).glob('*' + SUFFIX)):
+        try:
+            meta = json.loads((path / 'meta.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue   # inregistrare in curs sau incompleta
+        out.append({'name': path.name[:-len(SUFFIX)], 'scenario': meta['scenario'],
+                    'frames': meta['frames'], 'session': meta.get('session')})
+    return out
+
+
+class _Interner:
+    """Valori repetate (id-uri, stari de semafor, seturi de coliziuni) → index."""
+    def __init__(self, key=lambda v: v):
+        self.values: list = []
+        self._index: Dict = {}
+        self._key = key
+
+    def index(self, value) -> int:
+        k = self._key(value)
+        i = self._index.get(k)
+        if i is None:
+            i = self._index[k] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+def _json_key(value) -> str:
+    return json.dumps(value, sort_keys=True)
+
+
+class Recorder:
+    """
+    Scrie starea engine-ului la fiecare tick (capture() e apelat din _tick). Fisierele sunt
+    deschise cu buffer, deci un tick adauga doar cateva zeci de octeti in memorie.
+    """
+    def __init__(self, engine, path: Path):
+        self.engine = engine
+        self.path   = Path(path)
+        self.path.mkdir(parents=True, exist_ok=False)
+        self.frames = 0
+        self._rows  = 0
+        self._events = 0
+        self._cursor = engine.log.start_seq
+        self._ids        = _Interner()
+        self._semaphores = _Interner(_json_key)
+        self._collisions = _Interner(_json_key)
+        self._frame_files = {c: open(self.path / f'frames.{c}.bin', 'wb') for c in FRAME_COLUMNS}
+        self._veh_files   = {c: open(self.path / f'vehicles.{c}.bin', 'wb') for c in VEHICLE_COLUMNS}
+        self._events_file = open(self.path / 'events.jsonl', 'w', encoding='utf-8')
+        self.started = time.time()
+        self.capture()   # starea de la pornire (ex. simulare in pauza)
+
+    def capture(self) -> None:
+        eng = self.engine
+        state = eng.get_state(('vehicles', 'semaphore', 'collisions'))
+        vehicles = state['vehicles']
+        sem = {k: v for k, v in state['semaphore'].items() if k != 'timer'}
+
+        log = eng.log
+        events = log.get_since(max(self._cursor, log.start_seq))
+        if events:
+            self._cursor = events[-1]['seq']
+            self._events_file.write(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in events))
+            self._events += len(events)
+
+        row = {
+            'tick':       state['tick'],
+            'timestamp':  state['timestamp'],
+            'veh_start':  self._rows,
+            'veh_count':  len(vehicles),
+            'semaphore':  self._semaphores.index(sem),
+            'sem_timer':  state['semaphore'].get('timer') or 0,
+            'collisions': self._collisions.index(state['collisions']),
+            'ev_end':     self._events,
+        }
+        for col, dtype in FRAME_COLUMNS.items():
+            self._frame_files[col].write(np.array(row[col], dtype=dtype).tobytes())
+
+        if vehicles:
+            columns = {
+                'id':    [self._ids.index(v['id']) for v in vehicles],
+                'flags': [(F_V2X if v['v2x_enabled'] else 0) | (F_NO_STOP if v['no_stop'] else 0)
+                          | (F_CLEARANCE if v['clearance'] else 0)
+                          | (F_EMERGENCY if v['priority'] == 'emergency' else 0) for v in vehicles],
+            }
+            for col, codes in _CODES.items():
+                columns[col] = [codes.get(v[col], UNKNOWN) for v in vehicles]
+            for col, dtype in VEHICLE_COLUMNS.items():
+                values = columns[col] if col in columns else [v[col] for v in vehicles]
+                self._veh_files[col].write(np.asarray(values, dtype=dtype).tobytes())
+            self._rows += len(vehicles)
+        self.frames += 1
+
+    def close(self) -> dict:
+        """Goleste fisierele si scrie meta.json; inregistrarea devine citibila."""
+        for f in (*self._frame_files.values(), *self._veh_files.values(), self._events_file):
+            f.close()
+        meta = {
+            'version':     VERSION,
+            'session':     self.engine.session_id,
+            'scenario':    self.engine.scenario_name,
+            'started':     self.started,
+            'frames':      self.frames,
+            'vehicles':    self._rows,
+            'events':      self._events,
+            'ids':         self._ids.values,
+            'semaphores':  self._semaphores.values,
+            'collisions':  self._collisions.values,
+            'frame_columns':   FRAME_COLUMNS,
+            'vehicle_columns': VEHICLE_COLUMNS,
+        }
+        (self.path / 'meta.json').write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+        return self.info()
+
+    def info(self) -> dict:
+        return {'name': self.path.name[:-len(SUFFIX)], 'path': str(self.path),
+                'frames': self.frames, 'vehicles': self._rows, 'events': self._events}
+
+
+def _column(path: Path, dtype: str, count: int) -> np.ndarray:
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+
+class Recording:
+    """O inregistrare deschisa pentru citire (coloanele sunt memory-mapped)."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            self.meta = json.loads((self.path / 'meta.json').read_text(encoding='utf-8'))
+        except OSError:
+            raise FileNotFoundError(f'inregistrarea {self.path.name} nu exista sau nu e finalizata')
+        if self.meta.get('version') != VERSION:
+            raise ValueError(f"versiune de inregistrare nesuportata: {self.meta.get('version')}")
+        self.frame_count = self.meta['frames']
+        self.frames = {c: _column(self.path / f'frames.{c}.bin', t, self.frame_count)
+                       for c, t in self.meta['frame_columns'].items()}
+        self.vehicles = {c: _column(self.path / f'vehicles.{c}.bin', t, self.meta['vehicles'])
+                         for c, t in self.meta['vehicle_columns'].items()}
+        with open(self.path / 'events.jsonl', encoding='utf-8') as f:
+            self.events = [json.loads(line) for line in f]
+
+    @property
+    def name(self) -> str:
+        return self.path.name[:-len(SUFFIX)]
+
+    def state(self, frame: int) -> dict:
+        """Starea inregistrata la frame-ul `frame` (acelasi format ca engine.get_state())."""
+        if not 0 <= frame < self.frame_count:
+            raise IndexError(f'frame {frame} in afara inregistrarii (0..{self.frame_count - 1})')
+        fr = self.frames
+        start, count = int(fr['veh_start'][frame]), int(fr['veh_count'][frame])
+        cols = {c: arr[start:start + count].tolist() for c, arr in self.vehicles.items()}
+        ids = self.meta['ids']
+        vehicles = []
+        for i in range(count):
+            flags = cols['flags'][i]
+            v = {
+                'id':          ids[cols['id'][i]],
+                'direction':   _name('direction', cols['direction'][i]),
+                'intent':      _name('intent', cols['intent'][i]),
+                'priority':    'emergency' if flags & F_EMERGENCY else 'normal',
+                'v2x_enabled': bool(flags & F_V2X),
+                'no_stop':     bool(flags & F_NO_STOP),
+                'state':       _name('state', cols['state'][i]),
+                'clearance':   bool(flags & F_CLEARANCE),
+                'speed_kmh':   cols['speed_kmh'][i],
+            }
+            for name, digits in _ROUND:
+                v[name] = round(cols[name][i], digits)
+            vehicles.append(v)
+        semaphore = dict(self.meta['semaphores'][int(fr['semaphore'][frame])])
+        semaphore['timer'] = int(fr['sem_timer'][frame])
+        ev_end = int(fr['ev_end'][frame])
+        return {
+            'frame':      frame,
+            'frames':     self.frame_count,
+            'tick':       int(fr['tick'][frame]),
+            'timestamp':  float(fr['timestamp'][frame]),
+            'scenario':   self.meta['scenario'],
+            'vehicles':   vehicles,
+            'semaphore':  semaphore,
+            'collisions': self.meta['collisions'][int(fr['collisions'][frame])],
+            'event_log':  self.events[max(0, ev_end - EVENT_BACKLOG):ev_end],
+        }
+
+
+def _name(field: str, code: int) -> Optional[str]:
+    names = _NAMES[field]
+    return names[code] if code < len(names) else None
+
+
+class Replay:
+    """
+    Redarea unei inregistrari. Pozitia = ancora + (acum - momentul ancorei) × FPS × viteza,
+    limitata la [0, frame_count - 1]; la capat redarea se opreste singura.
+    """
+    def __init__(self, recording: Recording, clock=time.monotonic):
+        self.recording = recording
+        self.speed     = 1.0
+        self.paused    = True
+        self._clock    = clock
+        self._anchor_frame = 0.0
+        self._anchor_time  = clock()
+
+    def _position(self, now: float) -> float:
+        pos = self._anchor_frame
+        if not self.paused:
+            pos += (now - self._anchor_time) * FPS * self.speed
+        return min(max(pos, 0.0), self.recording.frame_count - 1)
+
+    def _reanchor(self, frame: float) -> None:
+        self._anchor_frame = frame
+        self._anchor_time  = self._clock()
+
+    @property
+    def frame(self) -> int:
+        now = self._clock()
+        pos = self._position(now)
+        last = self.recording.frame_count - 1
+        if not self.paused and ((self.speed > 0 and pos >= last) or (self.speed < 0 and pos <= 0)):
+            self.paused = True
+            self._anchor_frame, self._anchor_time = pos, now
+        return int(pos)
+
+    def play(self, speed: Optional[float] = None) -> None:
+        self._reanchor(self._position(self._clock()))
+        if speed is not None:
+            if speed == 0:
+                raise ValueError("'speed' nu poate fi 0 (foloseste pause)")
+            self.speed = float(speed)
+        self.paused = False
+
+    def pause(self) -> None:
+        self._reanchor(self._position(self._clock()))
+        self.paused = True
+
+    def seek(self, frame: int) -> None:
+        if not 0 <= frame < self.recording.frame_count:
+            raise IndexError(f'frame {frame} in afara inregistrarii (0..{self.recording.frame_count - 1})')
+        self._reanchor(float(frame))
+
+    def state(self, frame: Optional[int] = None) -> dict:
+        """Starea la frame-ul curent al redarii (sau la `frame`, fara sa mute redarea)."""
+        st = self.recording.state(self.frame if frame is None else frame)
+        st['replay'] = self.status()
+        return st
+
+    def status(self) -> dict:
+        return {'recording': self.recording.name, 'frame': self.frame,
+                'frames': self.recording.frame_count, 'speed': self.speed, 'paused': self.paused}
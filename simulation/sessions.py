@@ -0,0 +1,98 @@
+"""
+simulation/sessions.py — Sesiuni de simulare multiple intr-un singur proces
+Fiecare sesiune are propriul SimulationEngine (cu bus V2X, buffer de evenimente,
+CentralSystem si InfrastructureAgent proprii). Toate sesiunile sunt avansate
+de un singur scheduler la 30 FPS — nu exista un task asyncio per sesiune.
+"""
+import asyncio
+import time
+import traceback
+import uuid
+from typing import Dict, List, Optional
+
+from simulation import engine as _engine_module
+from simulation.engine import SimulationEngine, TICK_INTERVAL
+from utils import logger
+
+DEFAULT_SESSION = 'default'
+MAX_SESSIONS    = 64
+
+
+class SessionManager:
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.running      = False
+        self._by_id: Dict[str, SimulationEngine] = {}
+
+    @property
+    def _sessions(self) -> Dict[str, SimulationEngine]:
+        # Sesiunea implicita (simulation.engine.engine) se construieste la primul acces, nu la import
+        if DEFAULT_SESSION not in self._by_id:
+            self._by_id = {DEFAULT_SESSION: _engine_module.engine, **self._by_id}
+        return self._by_id
+
+    # ── Registry ───────────────────────────────────────────────────────
+
+    def get(self, session_id: str) -> Optional[SimulationEngine]:
+        return self._sessions.get(session_id)
+
+    def create(self, session_id: Optional[str] = None, scenario: Optional[str] = None) -> SimulationEngine:
+        """Creeaza o sesiune noua. Ridica ValueError daca id-ul exista sau limita e atinsa."""
+        session_id = session_id or uuid.uuid4().hex[:8]
+        if session_id in self._sessions:
+            raise ValueError(f'sesiunea {session_id} exista deja')
+        if len(self._sessions) >= self.max_sessions:
+            raise ValueError(f'limita de {self.max_sessions} sesiuni atinsa')
+        eng = SimulationEngine(session_id=session_id)
+        if scenario:
+            eng.reset(scenario)
+        self._sessions[session_id] = eng
+        logger.log_info(f'Sesiune {session_id} creata ({eng.scenario_name}).')
+        return eng
+
+    def remove(self, session_id: str) -> bool:
+        """Sterge o sesiune. Sesiunea implicita nu poate fi stearsa."""
+        if session_id == DEFAULT_SESSION or session_id not in self._sessions:
+            return False
+        self._sessions.pop(session_id).stop_recording()
+        logger.log_info(f'Sesiune {session_id} stearsa.')
+        return True
+
+    def list(self) -> List[dict]:
+        return [
+            {
+                'session_id': sid,
+                'scenario':   eng.scenario_name,
+                'tick':       eng.tick_count,
+                'paused':     eng.paused,
+                'vehicles':   len(eng.vehicles),
+            }
+            for sid, eng in self._sessions.items()
+        ]
+
+    # ── Scheduler comun ────────────────────────────────────────────────
+
+    async def run(self):
+        """Un singur loop la 30 FPS care avanseaza toate sesiunile active."""
+        self.running = True
+        while self.running:
+            t0 = time.monotonic()
+            for sid, eng in list(self._sessions.items()):
+                if eng.paused:
+                    continue
+                try:
+                    eng._tick()
+                except Exception as e:
+                    logger.log_info(f"FATAL Simulation Error [{sid}]: {e}")
+                    traceback.print_exc()
+            elapsed = time.monotonic() - t0
+            await asyncio.sleep(max(0.0, TICK_INTERVAL - elapsed))
+
+    def stop(self):
+        self.running = False
+        # Inregistrarile in curs se finalizeaza (altfel raman fara meta.json, deci necitibile)
+        for eng in self._sessions.values():
+            eng.stop_recording()
+
+
+sessions = SessionManager()
@@ -0,0 +1,207 @@
+"""
+simulation/sweep.py — Sweep paralel de scenarii pe un ProcessPoolExecutor
+Fiecare job (scenariu × combinatie de parametri) ruleaza headless intr-un proces
+worker, pe un SimulationEngine propriu — bus-ul V2X, buffer-ul logger-ului si
+engine-ul global sunt per proces, deci rularile nu se influenteaza intre ele.
+Rezultatele sunt livrate pe masura ce workerii termina.
+
+Parametri suportati in grid:
+  speed_multiplier, spawn_x_offset, v2x_enabled — aplicati vehiculelor (toate sau `target`)
+  cooperation, semaphore                        — aplicati rularii
+
+Rulare:
+  python -m simulation.sweep --speed 0.5,1,1.5 --offset=-50,0,50 --cooperation on,off
+  python -m simulation.sweep intents multi --v2x on,off --semaphore on,off --vehicle B --json
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from scenarios import SCENARIOS
+
+VEHICLE_PARAMS = ('speed_multiplier', 'spawn_x_offset', 'v2x_enabled')
+RUN_PARAMS     = ('cooperation', 'semaphore')
+
+
+def build_jobs(scenarios: Iterable[str], grid: Dict[str, list],
+               target: Optional[str] = None, max_ticks: int = 3000) -> List[dict]:
+    """
+    Produsul cartezian scenarii × grid. Parametrii lipsa din grid raman
+    la valoarea din definitia scenariului.
+    """
+    unknown = set(grid) - set(VEHICLE_PARAMS) - set(RUN_PARAMS)
+    if unknown:
+        raise ValueError(f"parametri necunoscuti: {', '.join(sorted(unknown))}")
+    keys   = list(grid)
+    combos = list(itertools.product(*(grid[k] for k in keys)))
+    jobs = []
+    for name in scenarios:
+        for values in combos:
+            jobs.append({
+                'scenario':  name,
+                'params':    dict(zip(keys, values)),
+                'target':    target,
+                'max_ticks': max_ticks,
+            })
+    return jobs
+
+
+def _apply_params(defs: List[dict], params: dict, target: Optional[str]) -> List[dict]:
+    overrides = {k: v for k, v in params.items() if k in VEHICLE_PARAMS}
+    return [
+        {**d, **overrides} if target is None or d['id'] == target else dict(d)
+        for d in defs
+    ]
+
+
+def run_job(job: dict) -> dict:
+    """Ruleaza un singur job (in procesul worker) si returneaza rezumatul adnotat."""
+    from simulation.headless import run_scenario
+
+    name   = job['scenario']
+    params = job['params']
+    defs   = _apply_params(SCENARIOS[name], params, job.get('target'))
+    summary = run_scenario(
+        name,
+        cooperation=params.get('cooperation') is not False,
+        has_semaphore=params.get('semaphore'),
+        defs=defs,
+        max_ticks=job.get('max_ticks', 3000),
+    )
+    summary['params'] = params
+    summary['target'] = job.get('target')
+    return summary
+
+
+def iter_sweep(jobs: List[dict], max_workers: Optional[int] = None) -> Iterator[dict]:
+    """Distribuie joburile pe procese si livreaza rezultatele in ordinea terminarii."""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(run_job, job): job for job in jobs}
+        for fut in as_completed(futures):
+            try:
+                yield fut.result()
+            except Exception as e:
+                job = futures[fut]
+                yield {'scenario': job['scenario'], 'params': job['params'],
+                       'target': job.get('target'), 'error': repr(e)}
+
+
+class SweepAggregate:
+    """Agregare incrementala a rezultatelor, per scenariu."""
+
+    def __init__(self):
+        self.by_scenario: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, result: dict) -> None:
+        agg = self.by_scenario.setdefault(result['scenario'], {
+            'runs': 0, 'errors': 0, 'collision_runs': 0, 'collisions': 0,
+            'completed': 0, '_completion_sum': 0, 'decisions': {},
+        })
+        agg['runs'] += 1
+        if 'error' in result:
+            agg['errors'] += 1
+            return
+        agg['collisions'] += result['collision_count']
+        if result['collision_count']:
+            agg['collision_runs'] += 1
+        if result['completed']:
+            agg['completed'] += 1
+            agg['_completion_sum'] += result['completion_tick']
+        for action, n in result['decisions'].items():
+            agg['decisions'][action] = agg['decisions'].get(action, 0) + n
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for name, agg in self.by_scenario.items():
+            ok = agg['runs'] - agg['errors']
+            out[name] = {
+                'runs':                agg['runs'],
+                'errors':              agg['errors'],
+                'collision_runs':      agg['collision_runs'],
+                'collision_rate':      round(agg['collision_runs'] / ok, 3) if ok else None,
+                'collisions':          agg['collisions'],
+                'completed':           agg['completed'],
+                'mean_completion_tick': (round(agg['_completion_sum'] / agg['completed'], 1)
+                                         if agg['completed'] else None),
+                'decisions':           dict(agg['decisions']),
+            }
+        return out
+
+
+def _parse_list(raw: Optional[str], cast) -> Optional[list]:
+    if raw is None:
+        return None
+    return [cast(x.strip()) for x in raw.split(',') if x.strip()]
+
+
+def _on_off(x: str) -> Optional[bool]:
+    x = x.lower()
+    if x in ('on', 'true', '1', 'yes'):
+        return True
+    if x in ('off', 'false', '0', 'no'):
+        return False
+    if x in ('default', 'scenario'):
+        return None
+    raise argparse.ArgumentTypeError(f'valoare invalida: {x} (on/off)')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m simulation.sweep',
+                                     description='Sweep paralel de parametri peste scenariile V2X.')
+    parser.add_argument('scenarios', nargs='*', help='scenarii (implicit: toate)')
+    parser.add_argument('--speed', help='speed_multiplier, ex: 0.5,1,1.5')
+    parser.add_argument('--offset', help='spawn_x_offset (px), ex: --offset=-50,0,50')
+    parser.add_argument('--v2x', help='v2x_enabled, ex: on,off')
+    parser.add_argument('--cooperation', help='cooperare V2X, ex: on,off')
+    parser.add_argument('--semaphore', help='semafor, ex: on,off,default')
+    parser.add_argument('--vehicle', help='aplica parametrii de vehicul doar acestui id')
+    parser.add_argument('--ticks', type=int, default=3000, help='numar maxim de tick-uri per rulare')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='numar de procese')
+    parser.add_argument('--json', action='store_true', help='streaming JSON (un rezultat pe linie)')
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"scenarii necunoscute: {', '.join(unknown)}")
+
+    grid = {
+        'speed_multiplier': _parse_list(args.speed, float),
+        'spawn_x_offset':   _parse_list(args.offset, float),
+        'v2x_enabled':      _parse_list(args.v2x, _on_off),
+        'cooperation':      _parse_list(args.cooperation, _on_off),
+        'semaphore':        _parse_list(args.semaphore, _on_off),
+    }
+    grid = {k: v for k, v in grid.items() if v}
+    jobs = build_jobs(names, grid, target=args.vehicle, max_ticks=args.ticks)
+
+    agg = SweepAggregate()
+    for i, result in enumerate(iter_sweep(jobs, max_workers=args.workers), 1):
+        agg.add(result)
+        if args.json:
+            print(json.dumps(result), flush=True)
+        elif 'error' in result:
+            print(f"[{i}/{len(jobs)}] {result['scenario']} {result['params']} EROARE: {result['error']}", flush=True)
+        else:
+            print(f"[{i}/{len(jobs)}] {result['scenario']:<14} {result['params']} "
+                  f"sem={result['has_semaphore']} "
+                  f"coliziuni={result['collision_count']} finalizat={result['completion_tick']}", flush=True)
+
+    summary = agg.summary()
+    if args.json:
+        print(json.dumps({'aggregate': summary}))
+    else:
+        print('\n── Agregat ─────────────────────────────────────────────')
+        for name, s in summary.items():
+            print(f"{name:<14} rulari={s['runs']} coliziuni={s['collision_runs']} "
+                  f"(rata {s['collision_rate']}) finalizate={s['completed']} "
+                  f"tick mediu={s['mean_completion_tick']} erori={s['errors']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
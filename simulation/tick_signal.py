@@ -0,0 +1,43 @@
+"""
+simulation/tick_signal.py — Semnal "stare noua" emis de engine dupa _update_state()
+Consumatorii asincroni (hub-ul /ws) asteapta semnalul in loc sa doarma pe un ceas
+propriu: fiecare tick e publicat imediat ce starea e gata, o singura data.
+
+notify() e sincron si ieftin (apelat din _tick, inclusiv in rularile headless fara
+event loop): incrementeaza versiunea, retine tick-ul si momentul, si rezolva
+future-urile celor care asteapta. Versiunea creste si la schimbari fara tick nou
+(pauza, cooperare, clearance manual), ca frame-ul sa plece imediat si atunci.
+"""
+import asyncio
+import time
+from typing import List
+
+
+class TickSignal:
+    def __init__(self):
+        self.version = 0
+        self.tick    = 0
+        self.at      = 0.0   # time.perf_counter() la ultimul notify()
+        self._waiters: List[asyncio.Future] = []
+
+    def notify(self, tick: int) -> None:
+        self.version += 1
+        self.tick = tick
+        self.at   = time.perf_counter()
+        if self._waiters:
+            waiters, self._waiters = self._waiters, []
+            for fut in waiters:
+                if not fut.done():
+                    fut.set_result(self.version)
+
+    def waiter(self, seen: int) -> asyncio.Future:
+        """
+        Future rezolvat la urmatorul notify() de dupa versiunea `seen` (imediat, daca a
+        avut deja loc). Cel care asteapta il poate rezolva si singur (ex. client nou).
+        """
+        fut = asyncio.get_running_loop().create_future()
+        if self.version != seen:
+            fut.set_result(self.version)
+        else:
+            self._waiters.append(fut)
+        return fut
@@ -0,0 +1,47 @@
+"""
+utils/clock.py — Ceasul simularii (timp derivat din tick, nu din ceasul de perete)
+Tot ce ajunge in iesirea simularii (timestamp-ul vehiculelor, 'time' / 'timestamp' din
+evenimente, memoria agentilor, TTL-ul cache-ului LLM) citeste timpul de aici:
+
+  time()     = epoch + tick / fps          (secunde de simulare)
+  strftime() = time() formatat ca ora UTC  (implicit '%H:%M:%S' → '00:00:12')
+
+Fiecare SimulationEngine are propriul ceas, legat de tick_count (reporneste la
+reincarcarea scenariului), deci doua rulari ale aceluiasi scenariu produc exact
+aceeasi iesire. Componentele create in afara unui engine folosesc `default`,
+un ceas care avanseaza doar prin advance().
+"""
+import time as _time
+from typing import Callable, Optional
+
+FPS = 30
+
+
+class SimClock:
+    def __init__(self, ticks: Optional[Callable[[], int]] = None, fps: int = FPS, epoch: float = 0.0):
+        """
+        ticks: functia care da tick-ul curent (ex. lambda: engine.tick_count);
+               None = contor propriu, avansat cu advance().
+        epoch: timpul (s) corespunzator tick-ului 0.
+        """
+        self.fps    = fps
+        self.epoch  = epoch
+        self._ticks = ticks
+        self._tick  = 0
+
+    @property
+    def tick(self) -> int:
+        return self._ticks() if self._ticks is not None else self._tick
+
+    def advance(self, n: int = 1) -> None:
+        self._tick += n
+
+    def time(self) -> float:
+        return self.epoch + self.tick / self.fps
+
+    def strftime(self, fmt: str = '%H:%M:%S') -> str:
+        return _time.strftime(fmt, _time.gmtime(self.time()))
+
+
+# Ceasul componentelor fara engine (functiile de modul din logger, vehicule de test)
+default = SimClock()
@@ -0,0 +1,162 @@
+"""
+utils/journal.py — Jurnal append-only (JSONL) scris in fundal
+Inregistrarile sunt puse intr-o coada limitata si scrise de un thread separat,
+in loturi: un lot se scrie cand are `batch_size` intrari sau cand cea mai veche
+intrare asteapta de `flush_interval` secunde (latenta de flush limitata).
+Fisierul se roteste dupa dimensiune: decisions.jsonl → decisions.1.jsonl → ...
+write() nu blocheaza niciodata: daca coada e plina, intrarea e aruncata si numarata.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+_log = logging.getLogger("V2X.journal")
+
+MAX_BYTES      = 5 * 1024 * 1024   # rotatie la 5 MB
+BACKUPS        = 5                 # cate fisiere rotite se pastreaza
+FLUSH_INTERVAL = 0.25              # s — latenta maxima intre write() si scrierea pe disc
+BATCH_SIZE     = 256
+MAX_QUEUE      = 10_000
+
+
+class JournalWriter:
+    def __init__(self, path: Path, max_bytes: int = MAX_BYTES, backups: int = BACKUPS,
+                 flush_interval: float = FLUSH_INTERVAL, batch_size: int = BATCH_SIZE,
+                 max_queue: int = MAX_QUEUE):
+        self.path           = Path(path)
+        self.max_bytes      = max_bytes
+        self.backups        = backups
+        self.flush_interval = flush_interval
+        self.batch_size     = batch_size
+        self.max_queue      = max_queue
+        self.written = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # Procesele worker (sweep) pornesc cu coada goala si fara thread mostenit
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ── API (apelat din tick) ──────────────────────────────────────────
+
+    def write(self, entry: dict) -> bool:
+        """Pune intrarea in coada. Nu blocheaza; False daca a fost aruncata (coada plina)."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Asteapta pana cand tot ce e in coada a ajuns pe disc (nu se apeleaza din tick)."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 2.0) -> None:
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            'path':    str(self.path),
+            'queued':  self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+        }
+
+    # ── Thread-ul de scriere ───────────────────────────────────────────
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='decision-journal', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.flush_interval
+            item = first
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break   # flush() cerut — scriem imediat ce avem
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+            for w in waiters:
+                w.set()
+
+    def _write_batch(self, batch: list) -> None:
+        try:
+            lines = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in batch)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                size = f.tell()
+            self.written += len(batch)
+            if size >= self.max_bytes:
+                self._rotate()
+        except Exception as e:
+            # Nu oprim thread-ul (si nici simularea) daca discul refuza scrierea
+            self.dropped += len(batch)
+            _log.warning(f"Jurnalul de decizii nu poate fi scris ({self.path}): {e}")
+
+    def _backup_path(self, i: int) -> Path:
+        return self.path.with_name(f'{self.path.stem}.{i}{self.path.suffix}')
+
+    def _rotate(self) -> None:
+        if self.backups <= 0:
+            self.path.unlink(missing_ok=True)
+            return
+        self._backup_path(self.backups).unlink(missing_ok=True)
+        for i in range(self.backups - 1, 0, -1):
+            src = self._backup_path(i)
+            if src.exists():
+                src.replace(self._backup_path(i + 1))
+        self.path.replace(self._backup_path(1))
+
+
+def open_journal(path: Path, **kwargs) -> JournalWriter:
+    """Creeaza un jurnal si il goleste pe disc la iesirea procesului."""
+    journal = JournalWriter(path, **kwargs)
+    atexit.register(journal.close)
+    return journal
@@ -1,15 +1,15 @@
 """
 utils/logger.py — Logging structurat al deciziilor agentilor
-Format: {'time': '12:34:05', 'agent': 'B', 'action': 'BRAKE', 'ttc': 1.8}
-Salveaza in decisions.json si trimite prin WebSocket la frontend (EventLog).
+Format: {'time': '00:00:12', 'agent': 'B', 'action': 'BRAKE', 'ttc': 1.8} — 'time' / 'timestamp' = timpul simularii (utils/clock.py)
+Salveaza in decisions.jsonl (jurnal append-only, scris in fundal — utils/journal.py)
+si trimite prin WebSocket la frontend (EventLog).
 """
-import json
-import time
 import logging
-from datetime import datetime
 from pathlib import Path
-# Fisier de output
-DECISIONS_FILE = Path(__file__).parent.parent / "decisions.json"
+from utils import clock as sim_clock
+from utils.journal import open_journal
+# Fisier de output (JSONL, rotit dupa dimensiune: decisions.1.jsonl, ...)
+DECISIONS_FILE = Path(__file__).parent.parent / "decisions.jsonl"
 # Logger standard Python
 logging.basicConfig(
     level=logging.INFO,
@@ -17,82 +17,146 @@ logging.basicConfig(
     datefmt="%H:%M:%S",
 )
 _log = logging.getLogger("V2X")
-# Buffer in-memory (ultimele 100 decizii) — trimis la frontend
-_buffer: list[dict] = []
-def log_decision(agent_id: str, action: str, ttc: float, reason: str = "") -> dict:
+# Jurnalul e scris de un thread separat — log_*() nu atinge discul in tick
+_journal = open_journal(DECISIONS_FILE)
+# False = nu mai scrie in decisions.jsonl (rulari headless / batch)
+_persist: bool = True
+class DecisionLogger:
     """
-    Inregistreaza o decizie a unui agent.
-    Returneaza entry-ul pentru a fi trimis prin WebSocket.
+    Buffer-ul de evenimente al unei simulari (ultimele 100 decizii) + contoare per actiune.
+    Fiecare SimulationEngine are propriul DecisionLogger; jurnalul decisions.jsonl e comun.
+    Buffer-ul e un ring de capacitate fixa; fiecare intrare primeste un numar de
+    secventa 'seq' crescator (si peste clear()), astfel incat clientii pot cere
+    doar evenimentele noi: get_since(ultimul_seq_vazut).
     """
-    entry = {
-        "time": datetime.now().strftime("%H:%M:%S"),
-        "agent": agent_id,
-        "action": action,          # 'BRAKE' | 'YIELD' | 'GO'
-        "ttc": round(ttc, 2),
-        "reason": reason,
-        "timestamp": time.time(),
-    }
-    _buffer.append(entry)
-    if len(_buffer) > 100:
-        _buffer.pop(0)
-    # Log consola
-    level = logging.WARNING if action in ("BRAKE", "YIELD") else logging.INFO
-    _log.log(level, f"Agent {agent_id} → {action} | TTC={ttc:.2f}s | {reason}")
-    # Salveaza pe disc (append)
-    _save_to_file(entry)
-    return entry
+    def __init__(self, maxlen: int = 100, clock: sim_clock.SimClock = None):
+        self.maxlen = maxlen
+        # 'time' / 'timestamp' ale intrarilor = timpul simularii (utils/clock.py)
+        self.clock = clock if clock is not None else sim_clock.default
+        self._ring: list = [None] * maxlen
+        self._next_seq = 1        # seq-ul urmatoarei intrari
+        self._start_seq = 0       # ultimul seq dinaintea ultimului clear()
+        # Contor cumulativ per actiune (nu e limitat ca buffer-ul) — pentru rezumate headless
+        self._counts: dict[str, int] = {}
+    def log_decision(self, agent_id: str, action: str, ttc: float, reason: str = "") -> dict:
+        """
+        Inregistreaza o decizie a unui agent.
+        Returneaza entry-ul pentru a fi trimis prin WebSocket.
+        """
+        entry = {
+            "time": self.clock.strftime(),
+            "agent": agent_id,
+            "action": action,          # 'BRAKE' | 'YIELD' | 'GO'
+            "ttc": round(ttc, 2),
+            "reason": reason,
+            "timestamp": self.clock.time(),
+        }
+        self._append(entry)
+        # Log consola
+        level = logging.WARNING if action in ("BRAKE", "YIELD") else logging.INFO
+        _log.log(level, f"Agent {agent_id} → {action} | TTC={ttc:.2f}s | {reason}")
+        # Salveaza pe disc (append, in fundal)
+        _save_to_file(entry)
+        return entry
+    def log_collision(self, id1: str, id2: str) -> None:
+        """Inregistreaza o coliziune fizica."""
+        entry = {
+            "time": self.clock.strftime(),
+            "agent": f"{id1}+{id2}",
+            "action": "COLLISION",
+            "ttc": 0.0,
+            "reason": "No cooperation — physical collision",
+            "timestamp": self.clock.time(),
+        }
+        self._append(entry)
+        _log.error(f"COLIZIUNE! {id1} <-> {id2}")
+        _save_to_file(entry)
+    def log_info(self, msg: str) -> None:
+        _log.info(msg)
+    def log_v2i(self, vehicle_id: str, rec_type: str, reason: str, advisory_speed=None) -> dict:
+        """Inregistreaza o recomandare V2I (Infrastructura → Vehicul)."""
+        action_map = {"stop": "V2I_STOP", "reduce_speed": "V2I_REDUCE", "proceed": "V2I_GO"}
+        action = action_map.get(rec_type, "V2I")
+        detail = f"{reason} → {advisory_speed:.1f} px/tick" if advisory_speed is not None and rec_type == "reduce_speed" else reason
+        entry = {
+            "time":      self.clock.strftime(),
+            "agent":     vehicle_id,
+            "action":    action,
+            "ttc":       0.0,
+            "reason":    detail,
+            "timestamp": self.clock.time(),
+        }
+        self._append(entry)
+        _save_to_file(entry)
+        return entry
+    @property
+    def last_seq(self) -> int:
+        """Seq-ul ultimei intrari (0 daca nu s-a logat nimic)."""
+        return self._next_seq - 1
+    @property
+    def start_seq(self) -> int:
+        """Intrarile cu seq <= start_seq au fost sterse de clear() (reincarcare scenariu)."""
+        return self._start_seq
+    @property
+    def first_seq(self) -> int:
+        """Cel mai vechi seq inca disponibil in ring."""
+        return max(self._start_seq + 1, self._next_seq - self.maxlen)
+    def get_since(self, seq: int, limit: int = None) -> list[dict]:
+        """Intrarile cu seq > `seq`, in ordine (cele iesite din ring nu mai sunt disponibile)."""
+        start = max(seq + 1, self.first_seq)
+        stop = self._next_seq
+        if limit is not None:
+            stop = min(stop, start + limit)
+        ring, cap = self._ring, self.maxlen
+        return [ring[s % cap] for s in range(start, stop)]
+    def get_recent(self, n: int = 10) -> list[dict]:
+        """Returneaza ultimele n decizii — pentru frontend EventLog."""
+        return self.get_since(self._next_seq - 1 - n)
+    def get_all(self) -> list[dict]:
+        return self.get_since(0)
+    def get_counts(self) -> dict[str, int]:
+        """Numarul total de intrari per actiune de la ultimul clear()."""
+        return dict(self._counts)
+    def clear(self) -> None:
+        # Seq-ul continua sa creasca — cursorii clientilor raman valizi
+        self._start_seq = self._next_seq - 1
+        self._counts.clear()
+    def _append(self, entry: dict) -> None:
+        seq = self._next_seq
+        entry["seq"] = seq
+        self._ring[seq % self.maxlen] = entry
+        self._next_seq = seq + 1
+        action = entry["action"]
+        self._counts[action] = self._counts.get(action, 0) + 1
+# Logger-ul implicit — folosit de functiile de modul (compatibilitate)
+_default = DecisionLogger()
+def log_decision(agent_id: str, action: str, ttc: float, reason: str = "") -> dict:
+    return _default.log_decision(agent_id, action, ttc, reason)
 def log_collision(id1: str, id2: str) -> None:
-    """Inregistreaza o coliziune fizica."""
-    entry = {
-        "time": datetime.now().strftime("%H:%M:%S"),
-        "agent": f"{id1}+{id2}",
-        "action": "COLLISION",
-        "ttc": 0.0,
-        "reason": "No cooperation — physical collision",
-        "timestamp": time.time(),
-    }
-    _buffer.append(entry)
-    _log.error(f"COLIZIUNE! {id1} <-> {id2}")
-    _save_to_file(entry)
+    _default.log_collision(id1, id2)
 def log_info(msg: str) -> None:
     _log.info(msg)
 
 def log_v2i(vehicle_id: str, rec_type: str, reason: str, advisory_speed=None) -> dict:
-    """Inregistreaza o recomandare V2I (Infrastructura → Vehicul)."""
-    action_map = {"stop": "V2I_STOP", "reduce_speed": "V2I_REDUCE", "proceed": "V2I_GO"}
-    action = action_map.get(rec_type, "V2I")
-    detail = f"{reason} → {advisory_speed:.1f} px/tick" if advisory_speed is not None and rec_type == "reduce_speed" else reason
-    entry = {
-        "time":      datetime.now().strftime("%H:%M:%S"),
-        "agent":     vehicle_id,
-        "action":    action,
-        "ttc":       0.0,
-        "reason":    detail,
-        "timestamp": time.time(),
-    }
-    _buffer.append(entry)
-    if len(_buffer) > 100:
-        _buffer.pop(0)
-    _save_to_file(entry)
-    return entry
+    return _default.log_v2i(vehicle_id, rec_type, reason, advisory_speed)
 def get_recent(n: int = 10) -> list[dict]:
-    """Returneaza ultimele n decizii — pentru frontend EventLog."""
-    return list(_buffer[-n:])
+    return _default.get_recent(n)
+def get_since(seq: int, limit: int = None) -> list[dict]:
+    return _default.get_since(seq, limit)
 def get_all() -> list[dict]:
-    return list(_buffer)
+    return _default.get_all()
+def get_counts() -> dict[str, int]:
+    return _default.get_counts()
+def set_persist(enabled: bool) -> bool:
+    """Activeaza/dezactiveaza scrierea in decisions.jsonl. Returneaza valoarea anterioara."""
+    global _persist
+    prev = _persist
+    _persist = enabled
+    return prev
 def clear() -> None:
-    _buffer.clear()
+    _default.clear()
 def _save_to_file(entry: dict) -> None:
-    try:
-        existing = []
-        if DECISIONS_FILE.exists():
-            with open(DECISIONS_FILE, "r") as f:
-                existing = json.load(f)
-        existing.append(entry)
-        # Pastreaza ultimele 500 in fisier
-        if len(existing) > 500:
-            existing = existing[-500:]
-        with open(DECISIONS_FILE, "w") as f:
-            json.dump(existing, f, indent=2)
-    except Exception:
-        pass  # Nu blocam simularea daca scrierea esueaza
+    """Pune intrarea in coada jurnalului — nu blocheaza (vezi JournalWriter)."""
+    if not _persist:
+        return
+    _journal.write(entry)